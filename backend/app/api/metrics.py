@@ -0,0 +1,12 @@
+"""Prometheus scrape endpoint"""
+
+from fastapi import APIRouter, Response
+
+from ..services.metrics import CONTENT_TYPE, render_latest
+
+router = APIRouter(tags=["monitoring"])
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """All metrics of this process in the Prometheus text format"""
+    return Response(render_latest(), media_type=CONTENT_TYPE)
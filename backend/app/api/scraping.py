@@ -1,39 +1,127 @@
-﻿from fastapi import APIRouter, HTTPException, BackgroundTasks
+﻿from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, HttpUrl
-from typing import Dict, Any, Optional, List
-from ..scraping.selenium_scraper import SeleniumScraper
+from typing import Dict, Any, Iterator, Literal, Optional, List
+from ..services.browser_pool import SCRAPE_POOL_SIZE, BrowserPool
+from ..services.export import gzip_stream
+from ..utils.compression import decompress
+from ..core.middleware import accepts
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/scraping", tags=["scraping"])
 
+# Warm sessions for default requests (headless, no proxy); set by the app lifespan
+browser_pool: Optional[BrowserPool] = None
+
+async def _pooled_scraper():
+    from ..scraping.selenium_scraper import SeleniumScraper
+    
+    scraper = SeleniumScraper({'headless': True, 'proxy': None})
+    await scraper.setup_driver()
+    return scraper
+
+async def start_browser_pool(size: int = SCRAPE_POOL_SIZE) -> Optional[BrowserPool]:
+    """Open the warm session pool; without Selenium or Chrome, requests start their own browser"""
+    global browser_pool
+    if size <= 0:
+        return None
+    try:
+        import selenium  # noqa: F401 - only checking it is installed
+    except ImportError:
+        logger.warning("⚠️ Selenium not installed, browser pool disabled")
+        return None
+    pool = BrowserPool(_pooled_scraper, size=size, name="api")
+    try:
+        await pool.start()
+    except Exception as e:
+        logger.warning(f"⚠️ Browser pool unavailable, using one browser per request: {e}")
+        await pool.stop()
+        return None
+    browser_pool = pool
+    return pool
+
+async def stop_browser_pool():
+    global browser_pool
+    pool, browser_pool = browser_pool, None
+    if pool is not None:
+        await pool.stop()
+
 class ScrapeRequest(BaseModel):
     url: HttpUrl
     strategy: str = "selenium"  # selenium, playwright, requests
     headless: bool = True
     proxy: Optional[str] = None
     extract: Optional[Dict[str, Any]] = None
+    # full: everything the scraper returns, page_source included
+    # extract: only the extracted fields; needs extract rules
+    mode: Literal["full", "extract"] = "full"
+    # In extract mode, "store" keeps the page server-side behind a content-hash link
+    html: Literal["none", "store"] = "none"
 
 class ScrapeResponse(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]]
     error: Optional[str]
     session_id: str
+    # Time spent waiting for a pooled browser; None when the request started its own
+    pool_wait_ms: Optional[float] = None
+
+def get_blob_db():
+    '''Session for stored pages (html_blobs); connects only when used'''
+    from ..models.database import SessionLocal
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def _store_html(db, html: str) -> Dict[str, Any]:
+    from ..services.blob_store import HtmlBlobStore
+    digest = HtmlBlobStore().put(db, html)
+    db.commit()
+    return {"hash": digest, "size": len(html.encode("utf-8")), "href": f"{router.prefix}/html/{digest}"}
+
+async def _response_data(result: Dict[str, Any], request: ScrapeRequest, db) -> Dict[str, Any]:
+    '''The scraper result shaped for the requested mode'''
+    if request.mode == "full":
+        return result
+    html = result.pop("page_source", None)
+    if request.html == "store" and html:
+        result["html"] = await run_in_threadpool(_store_html, db, html)
+    return result
 
 @router.post("/scrape", response_model=ScrapeResponse)
-async def scrape_url(request: ScrapeRequest, background_tasks: BackgroundTasks):
+async def scrape_url(request: ScrapeRequest, background_tasks: BackgroundTasks, db=Depends(get_blob_db)):
     '''Scrape a single URL'''
+    # Bad requests are rejected before the handler below turns errors into success=False
+    if request.strategy != "selenium":
+        raise HTTPException(400, f"Strategy {request.strategy} not implemented yet")
+    if request.mode == "extract" and not request.extract:
+        raise HTTPException(400, "Extract mode needs extract rules")
+    
     try:
         config = {
             'headless': request.headless,
             'proxy': request.proxy
         }
         
-        # Initialize appropriate scraper
-        if request.strategy == "selenium":
-            scraper = SeleniumScraper(config)
-        else:
-            raise HTTPException(400, f"Strategy {request.strategy} not implemented yet")
+        # Default requests borrow a warm browser from the pool
+        pool = browser_pool
+        if pool is not None and request.headless and not request.proxy:
+            async with pool.session() as session:
+                result = await session.scraper.scrape(str(request.url), extract=request.extract)
+            return ScrapeResponse(
+                success=True,
+                data=await _response_data(result, request, db),
+                error=None,
+                session_id=session.scraper.session_id,
+                pool_wait_ms=round(session.wait_s * 1000, 1)
+            )
+        
+        from ..scraping.selenium_scraper import SeleniumScraper
+        scraper = SeleniumScraper(config)
             
         # Perform scraping
         result = await scraper.scrape(str(request.url), extract=request.extract)
@@ -43,7 +131,7 @@ async def scrape_url(request: ScrapeRequest, background_tasks: BackgroundTasks):
         
         return ScrapeResponse(
             success=True,
-            data=result,
+            data=await _response_data(result, request, db),
             error=None,
             session_id=scraper.session_id
         )
@@ -57,6 +145,40 @@ async def scrape_url(request: ScrapeRequest, background_tasks: BackgroundTasks):
             session_id="error"
         )
 
+def _chunks(data: bytes, size: int = 64 * 1024) -> Iterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+# Stored codec -> the HTTP content-coding with the same bytes on the wire
+_CONTENT_CODINGS = {"zstd": "zstd", "zlib": "deflate"}
+
+@router.get("/html/{digest}")
+def stored_html(digest: str, request: Request, db=Depends(get_blob_db)):
+    '''
+    A page stored by an extract-mode scrape. Sent as stored when the client
+    accepts that encoding, gzip-compressed while streaming otherwise.
+    '''
+    from ..models.database import HtmlBlob
+    blob = db.get(HtmlBlob, digest)
+    if blob is None:
+        raise HTTPException(404, "No stored page with that hash")
+    
+    # Content-addressed: the bytes behind a hash never change
+    headers = {"ETag": f'"{digest}"', "Cache-Control": "public, max-age=31536000, immutable",
+               "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    accept_encoding = request.headers.get("accept-encoding", "")
+    coding = _CONTENT_CODINGS.get(blob.codec)
+    if coding and accepts(accept_encoding, coding):
+        return Response(blob.data, media_type="text/html; charset=utf-8",
+                        headers={**headers, "Content-Encoding": coding})
+    html = decompress(blob.codec, blob.data)
+    if accepts(accept_encoding, "gzip"):
+        return StreamingResponse(gzip_stream(_chunks(html)), media_type="text/html; charset=utf-8",
+                                 headers={**headers, "Content-Encoding": "gzip"})
+    return Response(html, media_type="text/html; charset=utf-8", headers=headers)
+
 @router.get("/status")
 async def scraping_status():
     '''Get scraping service status'''
@@ -66,6 +188,7 @@ async def scraping_status():
         "features": {
             "anti_detection": True,
             "proxy_rotation": False,  # To be implemented
-            "concurrent_scraping": False  # To be implemented
-        }
+            "concurrent_scraping": browser_pool is not None
+        },
+        "browser_pool": browser_pool.stats() if browser_pool is not None else None
     }
@@ -1,8 +1,10 @@
 ﻿from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from ...database.database import get_db
+from starlette.concurrency import run_in_threadpool
+from ...database.database import get_async_db
 from ...schemas.user import User, UserCreate, Token
 from ...models.user import User as UserModel
 from ...core.security import verify_password, get_password_hash, create_access_token
@@ -11,28 +13,29 @@ from ...core.config import settings
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 @router.post("/register", response_model=User)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(UserModel).filter(
-        (UserModel.email == user.email) | (UserModel.username == user.username)
-    ).first()
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.scalar(
+        select(UserModel).where(or_(UserModel.email == user.email, UserModel.username == user.username)).limit(1)
+    )
     if db_user:
         raise HTTPException(status_code=400, detail="Email or username already registered")
     
-    hashed_password = get_password_hash(user.password)
+    # bcrypt is deliberately slow; keep it off the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, user.password)
     db_user = UserModel(
         email=user.email,
         username=user.username,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.post("/token", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(UserModel).filter(UserModel.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(UserModel).where(UserModel.username == form_data.username).limit(1))
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
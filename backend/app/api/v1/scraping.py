@@ -1,49 +1,76 @@
-﻿from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
-from ...database.database import get_db
+﻿from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from typing import Optional
+from ...database.database import AsyncSessionLocal, get_async_db
 from ...schemas.scraping_job import ScrapingJob, ScrapingJobCreate
 from ...models.scraping_job import ScrapingJob as ScrapingJobModel
+from ...utils.pagination import decode_cursor, encode_cursor, parse_fields, project
 
 router = APIRouter(prefix="/scraping", tags=["scraping"])
 
+# Listings leave out result_data unless asked for with fields=
+JOB_FIELDS = [column.name for column in ScrapingJobModel.__table__.columns]
+DEFAULT_JOB_FIELDS = [f for f in JOB_FIELDS if f != "result_data"]
+
 @router.post("/jobs", response_model=ScrapingJob)
-def create_scraping_job(
+async def create_scraping_job(
     job: ScrapingJobCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     db_job = ScrapingJobModel(url=str(job.url), selector=job.selector)
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
     
     # Add background task for scraping
     background_tasks.add_task(process_scraping_job, db_job.id)
     
     return db_job
 
-@router.get("/jobs", response_model=List[ScrapingJob])
-def list_jobs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    jobs = db.query(ScrapingJobModel).offset(skip).limit(limit).all()
-    return jobs
+@router.get("/jobs")
+async def list_jobs(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List jobs newest first by (created_at, id); the next page's cursor is in X-Next-Cursor"""
+    try:
+        before = decode_cursor(cursor) if cursor else None
+        selected = parse_fields(fields, JOB_FIELDS, DEFAULT_JOB_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Only the selected columns are loaded; the cursor needs created_at and id
+    columns = {f: getattr(ScrapingJobModel, f) for f in selected + ["created_at", "id"]}
+    query = select(ScrapingJobModel).options(load_only(*columns.values()))
+    if before:
+        query = query.where(
+            tuple_(ScrapingJobModel.created_at, ScrapingJobModel.id) < tuple_(*before)
+        )
+    query = query.order_by(ScrapingJobModel.created_at.desc(), ScrapingJobModel.id.desc()).limit(limit)
+    jobs = (await db.scalars(query)).all()
+    
+    if len(jobs) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(jobs[-1].created_at, jobs[-1].id)
+    return [project(job, selected) for job in jobs]
 
 @router.get("/jobs/{job_id}", response_model=ScrapingJob)
-def get_job(job_id: int, db: Session = Depends(get_db)):
-    job = db.query(ScrapingJobModel).filter(ScrapingJobModel.id == job_id).first()
+async def get_job(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    job = await db.get(ScrapingJobModel, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
-def process_scraping_job(job_id: int):
+async def process_scraping_job(job_id: int):
     # Simple placeholder for scraping logic
-    from ...database.database import SessionLocal
-    db = SessionLocal()
-    try:
-        job = db.query(ScrapingJobModel).filter(ScrapingJobModel.id == job_id).first()
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ScrapingJobModel, job_id)
         if job:
             job.status = "completed"
             job.result_data = {"message": "Scraping would happen here"}
-            db.commit()
-    finally:
-        db.close()
+            await db.commit()
@@ -0,0 +1,167 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+Brotli is preferred when the brotli package is installed and the client
+accepts it, gzip otherwise; q-values are honoured and q=0 refuses a coding.
+Responses smaller than RESPONSE_COMPRESS_MIN_BYTES go out as they are, as do
+responses that already carry a Content-Encoding (stored pages, gzipped
+exports) and media types that are already compressed. Streaming responses are
+compressed chunk by chunk, with each chunk flushed so clients see rows as
+they are produced.
+"""
+
+import os
+import zlib
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+# Quality 4 compresses JSON better than gzip -6 at a similar speed; 11 is for static files
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
+# Already compressed, or must not be buffered by a compressor
+INCOMPRESSIBLE_TYPES = (
+    "image/", "video/", "audio/", "application/zip", "application/gzip", "application/zstd",
+    "application/vnd.openxmlformats", "application/vnd.apache.parquet", "text/event-stream",
+)
+
+def available_encodings() -> tuple:
+    """Codings this server can produce, most preferred first"""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """coding -> q-value from an Accept-Encoding header"""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+def accepts(accept_encoding: str, coding: str) -> bool:
+    """True if an Accept-Encoding header allows coding (q=0 means refused)"""
+    accepted = accepted_encodings(accept_encoding)
+    return accepted.get(coding, accepted.get("*", 0.0)) > 0
+
+def negotiate_encoding(accept_encoding: str, available: Optional[Iterable[str]] = None) -> Optional[str]:
+    """The accepted coding with the highest q; ties go to the server's preference"""
+    accepted = accepted_encodings(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in available or available_encodings():
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+class _Compressor:
+    def __init__(self, coding: str, gzip_level: int, brotli_quality: int):
+        self.coding = coding
+        if coding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, finish: bool = False, flush: bool = False) -> bytes:
+        if self.coding == "br":
+            out = self._br.process(data)
+            if finish:
+                return out + self._br.finish()
+            return out + self._br.flush() if flush else out
+        out = self._zlib.compress(data)
+        if finish:
+            return out + self._zlib.flush()
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+class CompressionMiddleware:
+    """gzip/br response compression above a size threshold"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = RESPONSE_COMPRESS_MIN_BYTES,
+                 gzip_level: int = RESPONSE_GZIP_LEVEL, brotli_quality: int = RESPONSE_BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSender(self, coding, send))
+
+class _CompressingSender:
+    """Holds the response start until the first body chunk decides whether to compress"""
+
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send):
+        self.middleware = middleware
+        self.coding = coding
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        if self.start["status"] < 200 or self.start["status"] in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        if not content_type or content_type.startswith(INCOMPRESSIBLE_TYPES):
+            return False
+        length = headers.get("content-length")
+        return length is None or int(length) >= self.middleware.minimum_size
+
+    async def __call__(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            compressible = self._compressible(headers)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            if not compressible or (not more_body and len(body) < self.middleware.minimum_size):
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.coding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers["Content-Encoding"] = self.coding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.compressor.compress(body, finish=True)
+                headers["Content-Length"] = str(len(body))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            await self.send(self.start)
+
+        body = self.compressor.compress(body, finish=not more_body, flush=more_body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -17,47 +17,87 @@ from typing import Dict, List, Any, Optional
 import logging
 import os
 
+from .services.broadcast import SYSTEM_TOPIC, BroadcastHub, job_topic, topic_matches
+from .services.progress import ProgressAggregator
+from .services.redis_state import RedisEventBus, RedisJobState
+from .services.metrics import JOBS_COMPLETED, JOBS_CREATED
+from .api.metrics import router as metrics_router
+from .api import scraping as scraping_api
+from .core.middleware import CompressionMiddleware
+from .utils.fast_json import FastJSONResponse
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Global connection manager for WebSocket connections
-class ConnectionManager:
+class ConnectionManager(BroadcastHub):
+    """Broadcast hub plus the latest progress snapshot per task
+
+    Without Redis everything is process-local. With attach_redis(), job state
+    is mirrored to Redis and events go out over pub/sub, so any worker can
+    serve any job's status and stream its events.
+    """
+
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
+        super().__init__()
         self.progress_data: Dict[str, Dict] = {}
+        # Batches per-step updates onto a fixed tick (PROGRESS_TICK_HZ)
+        self.progress = ProgressAggregator(self._publish_progress)
+        self.job_state: Optional[RedisJobState] = None
+        self.bus: Optional[RedisEventBus] = None
     
-    async def connect(self, websocket: WebSocket, client_id: str):
-        await websocket.accept()
-        self.active_connections[client_id] = websocket
-        logger.info(f"Client {client_id} connected. Total connections: {len(self.active_connections)}")
+    async def attach_redis(self, client):
+        """Share job state and events with other workers through Redis"""
+        self.job_state = RedisJobState(client)
+        self.bus = RedisEventBus(client)
+        await self.bus.start(self._deliver)
     
-    def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
-            logger.info(f"Client {client_id} disconnected. Total connections: {len(self.active_connections)}")
+    async def detach_redis(self):
+        if self.bus is not None:
+            await self.bus.stop()
+        self.bus = None
+        self.job_state = None
     
-    async def send_personal_message(self, message: dict, client_id: str):
-        if client_id in self.active_connections:
-            try:
-                await self.active_connections[client_id].send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {e}")
-                self.disconnect(client_id)
+    async def publish(self, message: Dict, topic: Optional[str] = None):
+        """Broadcast to clients of every worker (just this one without Redis)"""
+        await self._fan_out({"kind": "message", "message": message, "topic": topic})
     
-    async def broadcast(self, message: dict):
-        """Send message to all connected clients"""
-        disconnected_clients = []
-        for client_id, connection in self.active_connections.items():
+    async def _fan_out(self, envelope: Dict):
+        if self.bus is not None:
             try:
-                await connection.send_text(json.dumps(message))
+                await self.bus.publish(envelope)
+                return
             except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
-                disconnected_clients.append(client_id)
-        
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            self.disconnect(client_id)
+                logger.warning(f"⚠️ Event bus publish failed, delivering locally: {e}")
+        await self._deliver(envelope)
+    
+    async def _deliver(self, envelope: Dict):
+        """Hand an event to this worker's own WebSocket clients"""
+        if envelope.get("kind") == "batch":
+            await self.broadcast_batch(envelope["message_type"], envelope["updates"],
+                                       lambda update: job_topic(update["task_id"]))
+        else:
+            await self.broadcast(envelope["message"], topic=envelope.get("topic"))
+    
+    async def get_progress_state(self, task_id: str) -> Optional[Dict]:
+        """Latest progress for a task, wherever it is running"""
+        if task_id in self.progress_data:
+            return self.progress_data[task_id]
+        if self.job_state is not None:
+            return await self.job_state.get(task_id)
+        return None
+    
+    async def get_progress_states(self, task_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Progress for several tasks; all known tasks if task_ids is None"""
+        if self.job_state is None:
+            ids = self.progress_data.keys() if task_ids is None else task_ids
+            return {t: self.progress_data[t] for t in ids if t in self.progress_data}
+        if task_ids is None:
+            task_ids = list(dict.fromkeys([*self.progress_data, *await self.job_state.recent_ids()]))
+        states = await self.job_state.get_many([t for t in task_ids if t not in self.progress_data])
+        states.update({t: self.progress_data[t] for t in task_ids if t in self.progress_data})
+        return {t: states[t] for t in task_ids if t in states}
     
     async def update_progress(self, task_id: str, progress: int, total: int, status: str = "processing"):
         """Update progress for a specific task"""
@@ -72,7 +112,24 @@ class ConnectionManager:
         }
         
         self.progress_data[task_id] = progress_data
-        await self.broadcast(progress_data)
+        await self.progress.update(task_id, progress_data)
+
+    async def _publish_progress(self, message: Dict):
+        """Route progress to subscribers of each job's topic"""
+        if message.get("type") == "progress_batch":
+            task_ids = [update["task_id"] for update in message["updates"]]
+            envelope = {"kind": "batch", "message_type": "progress_batch", "updates": message["updates"]}
+        else:
+            task_ids = [message["task_id"]]
+            envelope = {"kind": "message", "message": message, "topic": job_topic(message["task_id"])}
+        
+        # State is mirrored once per tick, not once per update
+        if self.job_state is not None:
+            try:
+                await self.job_state.set_many({t: self.progress_data[t] for t in task_ids if t in self.progress_data})
+            except Exception as e:
+                logger.warning(f"⚠️ Could not mirror job state to Redis: {e}")
+        await self._fan_out(envelope)
 
 # Global connection manager instance
 manager = ConnectionManager()
@@ -84,11 +141,54 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 MK Processor 4.2.1 Backend Starting...")
     logger.info("✅ Real-time WebSocket system initialized")
     logger.info("✅ Connection manager ready")
+    await manager.progress.start()
+    
+    # Multi-worker deployments share job state and events through Redis
+    redis_client = None
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        try:
+            import redis.asyncio as redis
+            redis_client = redis.from_url(redis_url, decode_responses=True)
+            await redis_client.ping()
+            await manager.attach_redis(redis_client)
+            logger.info("✅ Redis job state and event bus connected")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis unavailable, job state stays process-local: {e}")
+            redis_client = None
+    
+    # Compile extraction profiles up front so a broken one fails at startup
+    try:
+        from .scraping.profiles import load_all_profiles
+        profiles = load_all_profiles()
+        logger.info(f"✅ Extraction profiles compiled: {', '.join(profiles) or 'none'}")
+    except Exception as e:
+        logger.error(f"❌ Extraction profile failed to compile: {e}")
+    
+    # Warm browser sessions for /api/scraping/scrape
+    await scraping_api.start_browser_pool()
+    
+    # Table creation used to run on import of app.models.database
+    try:
+        from .models.database import init_db
+        await asyncio.to_thread(init_db)
+        logger.info("✅ Database tables ready")
+    except Exception as e:
+        logger.warning(f"⚠️ Database initialization skipped: {e}")
     
     yield
     
     # Shutdown
     logger.info("🔄 MK Processor Backend Shutting Down...")
+    await manager.progress.stop()
+    await manager.detach_redis()
+    if redis_client is not None:
+        await redis_client.close()
+    await manager.close_all()
+    await scraping_api.stop_browser_pool()
+    # The async engine only exists if an async route used it
+    from .database.database import dispose_async_engine
+    await dispose_async_engine()
 
 # Create FastAPI app with lifespan events
 app = FastAPI(
@@ -97,6 +197,7 @@ app = FastAPI(
     description="AI-Powered Intelligence Platform with Real-time Collaboration",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -115,6 +216,13 @@ app.add_middleware(
     allowed_hosts=["*"]  # In production, specify exact hosts
 )
 
+# gzip/br above RESPONSE_COMPRESS_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
+# Prometheus scrape target (see monitoring-config.yml)
+app.include_router(metrics_router)
+app.include_router(scraping_api.router)
+
 # ==================== CORE ENDPOINTS ====================
 
 @app.get("/")
@@ -151,7 +259,7 @@ async def health_check():
             "api": "healthy",
             "websocket": "healthy",
             "database": "pending",  # Will implement DB connection check
-            "redis": "pending",     # Will implement Redis connection check
+            "redis": "connected" if manager.bus is not None else "not configured",
             "ai_providers": "ready"
         },
         "active_connections": len(manager.active_connections),
@@ -162,8 +270,16 @@ async def health_check():
 
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
-    """Real-time WebSocket endpoint for progress updates and communication"""
-    await manager.connect(websocket, client_id)
+    """Real-time WebSocket endpoint for progress updates and communication
+
+    Topics ("job:<id>", "jobs", "system") can be given as ?topics=a,b and
+    changed with subscribe/unsubscribe messages; the default is everything.
+    """
+    topics = websocket.query_params.get("topics")
+    connection = await manager.connect(
+        websocket, client_id,
+        topics=[t.strip() for t in topics.split(",") if t.strip()] if topics else None
+    )
     
     # Send initial connection confirmation
     await manager.send_personal_message({
@@ -189,22 +305,45 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
             elif message.get("type") == "get_progress":
                 # Send current progress data
                 task_id = message.get("task_id")
-                if task_id and task_id in manager.progress_data:
-                    await manager.send_personal_message(
-                        manager.progress_data[task_id], 
-                        client_id
-                    )
+                if task_id:
+                    state = await manager.get_progress_state(task_id)
+                    if state:
+                        await manager.send_personal_message(state, client_id)
+                else:
+                    # Several tasks, or everything this client is subscribed to
+                    states = await manager.get_progress_states(message.get("task_ids"))
+                    await manager.send_personal_message({
+                        "type": "progress_snapshot",
+                        "tasks": [
+                            state for t, state in states.items()
+                            if message.get("task_ids") or topic_matches(connection.topics, job_topic(t))
+                        ],
+                        "timestamp": datetime.now().isoformat()
+                    }, client_id)
             
-            elif message.get("type") == "subscribe_updates":
-                # Client wants to receive all progress updates
+            elif message.get("type") in ("subscribe", "unsubscribe", "subscribe_updates"):
+                if message["type"] == "subscribe":
+                    topics = manager.subscribe(client_id, message.get("topics", []),
+                                               replace=message.get("replace", False))
+                elif message["type"] == "unsubscribe":
+                    topics = manager.unsubscribe(client_id, message.get("topics", []))
+                else:
+                    # Legacy: only that job (plus system stats) if task_id is given, otherwise all jobs.
+                    # Replacing matters: the default "jobs" topic would still match every job
+                    task_id = message.get("task_id")
+                    if task_id:
+                        topics = manager.subscribe(client_id, [job_topic(task_id), SYSTEM_TOPIC], replace=True)
+                    else:
+                        topics = manager.subscribe(client_id, ["jobs"])
                 await manager.send_personal_message({
                     "type": "subscription_confirmed",
                     "message": "Subscribed to real-time updates",
+                    "topics": sorted(topics),
                     "timestamp": datetime.now().isoformat()
                 }, client_id)
                 
     except WebSocketDisconnect:
-        manager.disconnect(client_id)
+        await manager.disconnect(client_id, close=False, connection=connection)
         logger.info(f"Client {client_id} disconnected")
 
 # ==================== API V1 ROUTES ====================
@@ -224,6 +363,7 @@ async def get_jobs():
 async def create_job(background_tasks: BackgroundTasks):
     """Create a new scraping job"""
     job_id = str(uuid.uuid4())
+    JOBS_CREATED.inc()
     
     # Start background task simulation
     background_tasks.add_task(simulate_job_progress, job_id)
@@ -238,8 +378,9 @@ async def create_job(background_tasks: BackgroundTasks):
 @app.get("/api/v1/jobs/{job_id}")
 async def get_job(job_id: str):
     """Get specific job details"""
-    if job_id in manager.progress_data:
-        return manager.progress_data[job_id]
+    state = await manager.get_progress_state(job_id)
+    if state:
+        return state
     else:
         return {
             "job_id": job_id,
@@ -309,12 +450,13 @@ async def simulate_job_progress(job_id: str):
         await asyncio.sleep(0.1)
     
     # Final completion message
-    await manager.broadcast({
+    JOBS_COMPLETED.inc()
+    await manager.publish({
         "type": "job_completed",
         "job_id": job_id,
         "message": f"Job {job_id} completed successfully",
         "timestamp": datetime.now().isoformat()
-    })
+    }, topic=job_topic(job_id))
 
 # ==================== DEVELOPMENT HELPERS ====================
 
@@ -338,6 +480,7 @@ async def get_connections():
     return {
         "active_connections": list(manager.active_connections.keys()),
         "total": len(manager.active_connections),
+        "connection_stats": manager.stats(),
         "progress_tasks": list(manager.progress_data.keys())
     }
 
@@ -360,7 +503,7 @@ async def not_found_handler(request, exc):
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "main:app", 
+        "app.main:app", 
         host="0.0.0.0", 
         port=8000, 
         reload=True,
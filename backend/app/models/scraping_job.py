@@ -1,4 +1,4 @@
-﻿from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+﻿from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
 from sqlalchemy.sql import func
 from ..database.database import Base
 
@@ -13,3 +13,8 @@ class ScrapingJob(Base):
     error_message = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True))
+    
+    # Backs keyset pagination ordered by (created_at, id)
+    __table_args__ = (
+        Index("ix_scraping_jobs_created_at_id", "created_at", "id"),
+    )
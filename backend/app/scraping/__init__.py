@@ -3,6 +3,8 @@ from typing import Dict, Any, Optional, List
 import logging
 from datetime import datetime
 
+from .profiles import ExtractionProfile, ProfileError, get_profile, load_all_profiles, resolve_profile
+
 logger = logging.getLogger(__name__)
 
 class BaseScraper(ABC):
@@ -12,6 +14,10 @@ class BaseScraper(ABC):
         self.config = config
         self.session_id = datetime.now().isoformat()
         self.results = []
+        # Extraction profile name (or inline spec) from the config, compiled once
+        self.profile: Optional[ExtractionProfile] = (
+            resolve_profile(config["profile"]) if config.get("profile") else None
+        )
         
     @abstractmethod
     async def scrape(self, url: str, **kwargs) -> Dict[str, Any]:
@@ -23,6 +29,13 @@ class BaseScraper(ABC):
         '''Setup the web driver with anti-detection measures'''
         pass
     
+    def extract(self, html: str, base_url: str = "", profile: Any = None) -> Dict[str, Any]:
+        '''Run an extraction profile (the configured one by default) over a page's HTML'''
+        plan = resolve_profile(profile) if profile is not None else self.profile
+        if plan is None:
+            raise ProfileError("No extraction profile configured")
+        return plan.extract(html, base_url)
+    
     async def cleanup(self) -> None:
         '''Cleanup resources after scraping'''
         logger.info(f"Cleaning up session {self.session_id}")
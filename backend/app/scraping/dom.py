@@ -0,0 +1,249 @@
+"""
+Lightweight DOM snapshot and CSS selectors on the standard library.
+
+parse_html() builds an element tree once with html.parser, and
+compile_selector() turns a selector such as "h1.product-name" or
+"source[type*='video']" into a matcher that is reused for every page. This is
+enough to extract product pages that do not need JavaScript without starting
+a browser. Like a browser, the tree builder closes elements whose end tags HTML
+lets authors omit (<p>, <li>, <td>, <tr>, <option>, ...).
+
+Supported: tag, *, #id, .class, [attr], [attr=v], [attr*=v], [attr^=v],
+[attr$=v], the descendant (space) and child (>) combinators, and comma groups.
+"""
+
+import re
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+
+# HTML's optional end tags: opening the key closes an open element of the first
+# set, unless an element of the second set (its container) is reached first
+_CLOSES_P = {
+    "address", "article", "aside", "blockquote", "details", "div", "dl", "fieldset", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hgroup", "hr", "main",
+    "menu", "nav", "ol", "p", "pre", "section", "table", "ul",
+}
+_P_SCOPE = {"button", "table", "td", "th", "caption", "object", "template"}
+_TABLE_SECTION = ({"thead", "tbody", "tfoot", "tr", "td", "th"}, {"table"})
+_IMPLIED_END = {
+    "li": ({"li"}, {"ul", "ol", "menu"}),
+    "dt": ({"dt", "dd"}, {"dl"}),
+    "dd": ({"dt", "dd"}, {"dl"}),
+    "option": ({"option"}, {"select", "datalist", "optgroup"}),
+    "optgroup": ({"option", "optgroup"}, {"select"}),
+    "tr": ({"tr", "td", "th"}, {"table", "thead", "tbody", "tfoot"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+    "thead": _TABLE_SECTION,
+    "tbody": _TABLE_SECTION,
+    "tfoot": _TABLE_SECTION,
+}
+
+# Text inside these never shows up in .text
+_HIDDEN_TEXT = {"script", "style", "template", "noscript"}
+
+class Element:
+    __slots__ = ("tag", "attrs", "children", "parent", "classes")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Element"] = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[Union["Element", str]] = []
+        self.parent = parent
+        self.classes = frozenset(attrs.get("class", "").split())
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.attrs.get(name, default)
+
+    def iter(self) -> Iterator["Element"]:
+        """Descendant elements in document order"""
+        stack = [c for c in reversed(self.children) if isinstance(c, Element)]
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(c for c in reversed(element.children) if isinstance(c, Element))
+
+    def _text_parts(self) -> Iterator[str]:
+        for child in self.children:
+            if isinstance(child, str):
+                yield child
+            elif child.tag not in _HIDDEN_TEXT:
+                yield from child._text_parts()
+                if child.tag in ("br", "p", "div", "li", "tr"):
+                    yield " "
+
+    @property
+    def text(self) -> str:
+        """Visible text with whitespace collapsed"""
+        return " ".join("".join(self._text_parts()).split())
+
+    def select(self, selector: Union[str, "Selector"]) -> List["Element"]:
+        matcher = compile_selector(selector) if isinstance(selector, str) else selector
+        return [element for element in self.iter() if matcher(element)]
+
+    def select_one(self, selector: Union[str, "Selector"]) -> Optional["Element"]:
+        matcher = compile_selector(selector) if isinstance(selector, str) else selector
+        return next((element for element in self.iter() if matcher(element)), None)
+
+    def __repr__(self) -> str:
+        return f"<Element {self.tag} {self.attrs}>"
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {})
+        self._stack = [self.root]
+
+    def _close_implied(self, closes, scope):
+        """Close the outermost open element in closes below the nearest scope element"""
+        cut = None
+        for index in range(len(self._stack) - 1, 0, -1):
+            tag = self._stack[index].tag
+            if tag in scope:
+                break
+            if tag in closes:
+                cut = index
+        if cut is not None:
+            del self._stack[cut:]
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _CLOSES_P:
+            self._close_implied({"p"}, _P_SCOPE)
+        if tag in _IMPLIED_END:
+            self._close_implied(*_IMPLIED_END[tag])
+        parent = self._stack[-1]
+        element = Element(tag, {k: v or "" for k, v in attrs}, parent)
+        parent.children.append(element)
+        if tag not in VOID_ELEMENTS:
+            self._stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _CLOSES_P:
+            self._close_implied({"p"}, _P_SCOPE)
+        parent = self._stack[-1]
+        parent.children.append(Element(tag, {k: v or "" for k, v in attrs}, parent))
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open tag; stray end tags are ignored
+        for index in range(len(self._stack) - 1, 0, -1):
+            if self._stack[index].tag == tag:
+                del self._stack[index:]
+                return
+
+    def handle_data(self, data):
+        self._stack[-1].children.append(data)
+
+def parse_html(html: str) -> Element:
+    """Parse a whole page into a document element"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+# ==================== SELECTORS ====================
+
+Predicate = Callable[[Element], bool]
+Selector = Callable[[Element], bool]
+
+_COMPOUND = re.compile(
+    r"(?P<tag>[a-zA-Z][\w-]*|\*)?"
+    r"(?P<rest>(?:#[\w-]+|\.[\w-]+|\[[^\]]+\])*)$"
+)
+_PART = re.compile(r"#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)|\[(?P<attr>[^\]]+)\]")
+_ATTR = re.compile(r"\s*(?P<name>[\w:-]+)\s*(?:(?P<op>[*^$]?=)\s*(?P<value>'[^']*'|\"[^\"]*\"|[^\s\]]+))?\s*$")
+
+def _attr_predicate(spec: str) -> Predicate:
+    match = _ATTR.match(spec)
+    if not match:
+        raise ValueError(f"Unsupported attribute selector: [{spec}]")
+    name, op, value = match.group("name"), match.group("op"), match.group("value")
+    if op is None:
+        return lambda e: name in e.attrs
+    value = value.strip("'\"")
+    if op == "=":
+        return lambda e: e.attrs.get(name) == value
+    if op == "*=":
+        return lambda e: value in e.attrs.get(name, "")
+    if op == "^=":
+        return lambda e: e.attrs.get(name, "").startswith(value)
+    return lambda e: e.attrs.get(name, "").endswith(value)
+
+def _compile_compound(text: str) -> Predicate:
+    match = _COMPOUND.match(text)
+    if not match or not text:
+        raise ValueError(f"Unsupported selector: {text!r}")
+    tag = match.group("tag")
+    checks: List[Predicate] = []
+    if tag and tag != "*":
+        tag = tag.lower()
+        checks.append(lambda e: e.tag == tag)
+    classes = set()
+    for part in _PART.finditer(match.group("rest")):
+        if part.group("id"):
+            element_id = part.group("id")
+            checks.append(lambda e: e.attrs.get("id") == element_id)
+        elif part.group("cls"):
+            classes.add(part.group("cls"))
+        else:
+            checks.append(_attr_predicate(part.group("attr")))
+    if classes:
+        wanted = frozenset(classes)
+        checks.append(lambda e: wanted <= e.classes)
+    return lambda e: all(check(e) for check in checks)
+
+def _split_outside_brackets(text: str, separators: str) -> List[Tuple[str, str]]:
+    """[(separator_before, token)] splitting on any of separators outside [...]"""
+    tokens, current, sep, depth = [], "", "", 0
+    for ch in text:
+        if ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+        if depth == 0 and ch in separators:
+            if current.strip():
+                tokens.append((sep, current.strip()))
+                current, sep = "", ""
+            if ch.strip():
+                sep = ch
+            elif not sep:
+                sep = " "
+            continue
+        current += ch
+    if current.strip():
+        tokens.append((sep, current.strip()))
+    return tokens
+
+def _compile_complex(text: str) -> Selector:
+    steps = [(sep or " ", _compile_compound(token)) for sep, token in _split_outside_brackets(text, " >\t\n")]
+
+    def matches(element: Optional[Element], index: int) -> bool:
+        combinator, predicate = steps[index]
+        if element is None or not predicate(element):
+            return False
+        if index == 0:
+            return True
+        if combinator == ">":
+            return matches(element.parent, index - 1)
+        ancestor = element.parent
+        while ancestor is not None:
+            if matches(ancestor, index - 1):
+                return True
+            ancestor = ancestor.parent
+        return False
+
+    last = len(steps) - 1
+    return lambda element: matches(element, last)
+
+@lru_cache(maxsize=None)
+def compile_selector(selector: str) -> Selector:
+    """Matcher for a selector group; compiled once per distinct selector string"""
+    groups = [_compile_complex(part) for _, part in _split_outside_brackets(selector, ",")]
+    if len(groups) == 1:
+        return groups[0]
+    return lambda element: any(group(element) for group in groups)
@@ -0,0 +1,50 @@
+"""
+KaTom product page extraction from raw HTML.
+
+The fields and selectors live in profiles/katom.json, compiled once at import;
+this module shapes the profile's output into the result KatomScraper returns,
+so a product page fetched over plain HTTP, or a browser's page_source, is
+extracted without querying the browser element by element.
+"""
+
+from typing import Any, Dict
+
+from .profiles import get_profile
+
+KATOM_PROFILE = get_profile("katom")
+
+MAX_ADDITIONAL_IMAGES = 5
+
+def specs_table_html(specs: Dict[str, str]) -> str:
+    """The spec table as the HTML table KatomScraper produces"""
+    if not specs:
+        return ""
+    html = '<table class="specs-table" style="border-collapse:collapse;"><tbody>'
+    for key, value in specs.items():
+        html += f'<tr><td style="padding:5px;border:1px solid #ddd;"><b>{key}</b></td>'
+        html += f'<td style="padding:5px;border:1px solid #ddd;">{value}</td></tr>'
+    return html + "</tbody></table>"
+
+def extract_product(html: str, base_url: str = "") -> Dict[str, Any]:
+    """
+    The product fields of a scrape_katom result; found is False without a title.
+    Image and video URLs are resolved against base_url, as a browser would.
+    """
+    product = KATOM_PROFILE.extract(html, base_url)
+    if not product["found"]:
+        return {"found": False}
+    result: Dict[str, Any] = {
+        "found": True,
+        "title": product["title"],
+        "price": product["price"],
+        "main_image": product["main_image"],
+    }
+    if product["description"]:
+        result["description"] = product["description"]
+    result["specs"] = product["specs"]
+    result["specs_html"] = specs_table_html(product["specs"])
+    result["additional_images"] = [
+        src for src in product["additional_images"] if src != product["main_image"]
+    ][:MAX_ADDITIONAL_IMAGES]
+    result["video_links"] = "".join(f"{src}\n" for src in product["video_links"])
+    return result
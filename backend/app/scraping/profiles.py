@@ -0,0 +1,290 @@
+"""
+Declarative extraction profiles.
+
+A profile describes what to pull out of a site's pages: a set of fields, each
+with an ordered list of CSS selectors and optional post-processors. It is
+written as JSON (or YAML when PyYAML is installed) and compiled once into an
+ExtractionProfile: selectors become matchers from dom.compile_selector and
+post-processor names become functions. extract() then runs the plan against
+one parsed DOM snapshot, so nothing is parsed or looked up per call. Adding a
+site or fixing a selector is an edit to a profile file.
+
+Field options:
+    selectors   ordered CSS selectors; the first that yields a value wins
+    attr        read this attribute instead of the element's text
+    many        collect every value from the first selector that yields any
+    limit       keep at most this many values (with many)
+    unique      drop repeated values (with many)
+    join        join the values of a many field into one string
+    post        post-processor names applied in order; None/"" drops a value
+    type        "value" (default), "table" (first two cells of each row as a
+                dict) or "items" (one dict per match, from nested "fields")
+    fallback    a field spec tried when this one finds nothing
+    default     value when nothing is found
+
+A profile's "required" fields decide "found": a page missing any of them
+yields {"found": False}. Profiles live in app/scraping/profiles/ (or
+SCRAPE_PROFILE_DIR) and are looked up by file name with get_profile().
+"""
+
+import json
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urljoin
+
+from .dom import Element, compile_selector, parse_html
+
+try:
+    import yaml
+except ImportError:  # optional; JSON profiles work without it
+    yaml = None
+
+PROFILE_DIR = os.getenv("SCRAPE_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+
+FIELD_TYPES = {"value", "table", "items"}
+
+PostProcessor = Callable[[Any, Dict[str, Any]], Any]
+
+class ProfileError(ValueError):
+    """A profile that cannot be compiled"""
+
+# ==================== POST-PROCESSORS ====================
+
+POST_PROCESSORS: Dict[str, PostProcessor] = {}
+
+def post_processor(name: str):
+    """Register fn(value, context) under name for use in profiles"""
+    def register(fn: PostProcessor) -> PostProcessor:
+        POST_PROCESSORS[name] = fn
+        return fn
+    return register
+
+def extract_numeric_price(price_text: Any) -> str:
+    """"1234.50" from "$1,234.50"; a whole number if there is no decimal price"""
+    if not price_text:
+        return ""
+    price_match = re.search(r'[\d,]+\.\d{2}', str(price_text)) or re.search(r'[\d,]+', str(price_text))
+    return price_match.group(0).replace(',', '') if price_match else ""
+
+def process_weight_value(value: Any) -> Any:
+    """Round a weight up and add 5 for packaging, keeping its units ("84.2 lbs" -> "90 lbs")"""
+    number_match = re.search(r'(\d+(\.\d+)?)', str(value))
+    if not number_match:
+        return value
+    final = math.ceil(float(number_match.group(1))) + 5
+    units_match = re.search(r'[^\d.]+$', str(value))
+    units = units_match.group(0).strip() if units_match else ""
+    return f"{final}{' ' + units if units else ''}"
+
+post_processor("extract_numeric_price")(lambda value, context: extract_numeric_price(value))
+post_processor("process_weight_value")(lambda value, context: process_weight_value(value))
+
+@post_processor("decimal_price")
+def _decimal_price(value, context):
+    match = re.search(r'[\d,]+\.\d{2}', str(value))
+    return match.group(0).replace(',', '') if match else None
+
+@post_processor("absolute_url")
+def _absolute_url(value, context):
+    return urljoin(context.get("base_url", ""), value) if value else value
+
+@post_processor("strip")
+def _strip(value, context):
+    return value.strip() if isinstance(value, str) else value
+
+@post_processor("paragraph")
+def _paragraph(value, context):
+    return f"<p>{value}</p>" if value else value
+
+@post_processor("skip_promotional")
+def _skip_promotional(value, context):
+    """Drops "*Free shipping..." notes and video captions from descriptions"""
+    text = str(value).lower()
+    return None if text.startswith("*free") or "video" in text else value
+
+# ==================== COMPILED PLAN ====================
+
+class FieldPlan:
+    __slots__ = ("name", "selectors", "matchers", "attr", "many", "limit", "unique", "join",
+                 "post", "type", "fallback", "default", "items")
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        if isinstance(spec.get("selectors"), str):
+            spec = {**spec, "selectors": [spec["selectors"]]}
+        self.name = name
+        self.selectors: List[str] = list(spec.get("selectors") or [])
+        if not self.selectors:
+            raise ProfileError(f"Field {name!r} has no selectors")
+        self.type = spec.get("type", "value")
+        if self.type not in FIELD_TYPES:
+            raise ProfileError(f"Field {name!r} has unknown type {self.type!r}")
+        try:
+            self.matchers = [compile_selector(s) for s in self.selectors]
+        except ValueError as e:
+            raise ProfileError(f"Field {name!r}: {e}") from e
+        self.attr: Optional[str] = spec.get("attr")
+        self.many = bool(spec.get("many"))
+        self.limit: Optional[int] = spec.get("limit")
+        self.unique = bool(spec.get("unique"))
+        self.join: Optional[str] = spec.get("join")
+        unknown = [p for p in spec.get("post", []) if p not in POST_PROCESSORS]
+        if unknown:
+            raise ProfileError(f"Field {name!r} uses unknown post-processor(s): {', '.join(unknown)}")
+        self.post = [POST_PROCESSORS[p] for p in spec.get("post", [])]
+        self.fallback = FieldPlan(name, spec["fallback"]) if spec.get("fallback") else None
+        self.default = spec.get("default")
+        self.items = Plan(spec.get("fields") or {}, spec.get("required", [])) if self.type == "items" else None
+
+    def _value(self, element: Element, context: Dict[str, Any]) -> Any:
+        value = element.get(self.attr) if self.attr else element.text
+        for post in self.post:
+            if value is None or value == "":
+                break
+            value = post(value, context)
+        return value
+
+    def _table(self, element: Element) -> Dict[str, str]:
+        table: Dict[str, str] = {}
+        for row in element.iter():
+            if row.tag != "tr":
+                continue
+            cells = [c for c in row.children if isinstance(c, Element) and c.tag == "td"]
+            if len(cells) >= 2 and cells[0].text and cells[1].text:
+                table[cells[0].text] = cells[1].text
+        return table
+
+    def extract(self, root: Element, context: Dict[str, Any]) -> Any:
+        value = self._extract(root, context)
+        if value in (None, "", [], {}) and self.fallback is not None:
+            value = self.fallback.extract(root, context)
+        return self.default if value in (None, "", [], {}) else value
+
+    def _extract(self, root: Element, context: Dict[str, Any]) -> Any:
+        for matcher in self.matchers:
+            elements = root.select(matcher)
+            if not elements:
+                continue
+            if self.type == "table":
+                return self._table(elements[0])
+            if self.type == "items":
+                items = [item for item in (self.items.run(e, context) for e in elements) if item is not None]
+                return items[:self.limit] if self.limit else items
+            if not self.many:
+                for element in elements:
+                    value = self._value(element, context)
+                    if value not in (None, ""):
+                        return value
+                continue
+            values = []
+            for element in elements:
+                value = self._value(element, context)
+                if value in (None, "") or (self.unique and value in values):
+                    continue
+                values.append(value)
+                if self.limit and len(values) >= self.limit:
+                    break
+            if values:
+                return self.join.join(values) if self.join is not None else values
+        return None
+
+class Plan:
+    """Compiled fields plus the ones a match must have"""
+
+    def __init__(self, fields: Dict[str, Any], required: List[str]):
+        self.fields = [FieldPlan(name, spec) for name, spec in fields.items()]
+        self.required = set(required)
+        missing = self.required - set(fields)
+        if missing:
+            raise ProfileError(f"Required field(s) not defined: {', '.join(sorted(missing))}")
+
+    def run(self, root: Element, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Field values, or None when a required field is missing"""
+        result: Dict[str, Any] = {}
+        for field in self.fields:
+            value = field.extract(root, context)
+            if value is None and field.name in self.required:
+                return None
+            result[field.name] = value
+        return result
+
+class ExtractionProfile:
+    """A compiled profile; extract() is safe to call from many threads"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec.get("name", "")
+        self.url_template: Optional[str] = spec.get("url")
+        self.plan = Plan(spec.get("fields") or {}, spec.get("required", []))
+
+    def field(self, name: str) -> FieldPlan:
+        for field in self.plan.fields:
+            if field.name == name:
+                return field
+        raise KeyError(name)
+
+    def selectors(self, name: str) -> List[str]:
+        """A field's selector strings, for callers that query a live browser"""
+        return list(self.field(name).selectors)
+
+    def url(self, **values: Any) -> str:
+        if not self.url_template:
+            raise ProfileError(f"Profile {self.name!r} has no url template")
+        return self.url_template.format(**values)
+
+    def extract(self, page: Union[str, Element], base_url: str = "") -> Dict[str, Any]:
+        """Field values plus "found" for a page's HTML or an already parsed DOM"""
+        root = parse_html(page) if isinstance(page, str) else page
+        result = self.plan.run(root, {"base_url": base_url})
+        if result is None:
+            return {"found": False}
+        return {"found": True, **result}
+
+    def __repr__(self) -> str:
+        return f"<ExtractionProfile {self.name} ({len(self.plan.fields)} fields)>"
+
+# ==================== LOADING ====================
+
+def load_profile(path: str) -> ExtractionProfile:
+    """Compile a .json, .yaml or .yml profile file"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ProfileError(f"{path} is YAML; install PyYAML or use a JSON profile")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    spec.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    return ExtractionProfile(spec)
+
+@lru_cache(maxsize=None)
+def get_profile(name: str) -> ExtractionProfile:
+    """The compiled profile named name from PROFILE_DIR, compiled on first use"""
+    for extension in (".json", ".yaml", ".yml"):
+        path = os.path.join(PROFILE_DIR, name + extension)
+        if os.path.exists(path):
+            return load_profile(path)
+    raise ProfileError(f"No extraction profile named {name!r} in {PROFILE_DIR}")
+
+def available_profiles() -> List[str]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted({os.path.splitext(f)[0] for f in os.listdir(PROFILE_DIR)
+                   if f.endswith((".json", ".yaml", ".yml"))})
+
+def load_all_profiles() -> Dict[str, ExtractionProfile]:
+    """Compile every profile up front, e.g. at startup, so a broken one fails early"""
+    return {name: get_profile(name) for name in available_profiles()}
+
+def resolve_profile(profile: Union[str, Dict[str, Any], ExtractionProfile]) -> ExtractionProfile:
+    """A profile from a name, {"profile": name}, an inline spec or a compiled profile"""
+    if isinstance(profile, ExtractionProfile):
+        return profile
+    if isinstance(profile, str):
+        return get_profile(profile)
+    if isinstance(profile, dict) and set(profile) == {"profile"}:
+        return get_profile(profile["profile"])
+    if isinstance(profile, dict):
+        return ExtractionProfile(profile)
+    raise ProfileError(f"Not an extraction profile: {profile!r}")
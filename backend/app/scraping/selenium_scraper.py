@@ -8,6 +8,7 @@ import undetected_chromedriver as uc
 from selenium_stealth import stealth
 from fake_useragent import UserAgent
 import logging
+from datetime import datetime
 from typing import Dict, Any, Optional
 from . import BaseScraper
 
@@ -23,6 +24,11 @@ class SeleniumScraper(BaseScraper):
         
     async def setup_driver(self) -> None:
         '''Setup Chrome driver with stealth mode'''
+        # Chrome takes seconds to start; keep the event loop free meanwhile
+        await asyncio.get_event_loop().run_in_executor(None, self._create_driver)
+        logger.info("Selenium driver initialized with anti-detection")
+        
+    def _create_driver(self) -> None:
         options = uc.ChromeOptions()
         
         # Anti-detection measures
@@ -52,7 +58,35 @@ class SeleniumScraper(BaseScraper):
                 renderer="Intel Iris OpenGL Engine",
                 fix_hairline=True)
         
-        logger.info("Selenium driver initialized with anti-detection")
+    async def is_healthy(self) -> bool:
+        '''True if the browser still answers; used by the session pool'''
+        if not self.driver:
+            return False
+        try:
+            await asyncio.get_event_loop().run_in_executor(None, lambda: self.driver.current_url)
+            return True
+        except Exception:
+            return False
+        
+    def _clear_state(self):
+        # Storage is per origin, so it is cleared while the last page is still open
+        try:
+            self.driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            pass
+        # delete_all_cookies() only covers the current domain; CDP clears them all
+        self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        self.driver.get("about:blank")
+        
+    async def reset(self) -> None:
+        '''Drop cookies, storage and the open page; used by the session pool between borrowers'''
+        if self.driver:
+            await asyncio.get_event_loop().run_in_executor(None, self._clear_state)
+        
+    def _load(self, url: str):
+        self.driver.get(url)
+        WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        return self.driver.title, self.driver.page_source
         
     async def scrape(self, url: str, **kwargs) -> Dict[str, Any]:
         '''Scrape a URL using Selenium'''
@@ -62,28 +96,24 @@ class SeleniumScraper(BaseScraper):
                 
             logger.info(f"Scraping {url}")
             
-            # Navigate to URL
-            await asyncio.get_event_loop().run_in_executor(
-                None, self.driver.get, url
-            )
-            
-            # Wait for page load
-            wait = WebDriverWait(self.driver, 10)
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            # Navigate, wait for the page and snapshot it off the event loop,
+            # which pooled sessions share with every other request
+            title, page_source = await asyncio.get_event_loop().run_in_executor(None, self._load, url)
             
             # Extract data
             result = {
                 'url': url,
-                'title': self.driver.title,
-                'page_source': self.driver.page_source,
+                'title': title,
+                'page_source': page_source,
                 'timestamp': datetime.now().isoformat(),
                 'session_id': self.session_id
             }
             
-            # Custom extraction logic if provided
-            if 'extract' in kwargs:
-                extracted = await self._extract_data(kwargs['extract'])
-                result['extracted_data'] = extracted
+            # Profile extraction: a profile name, {"profile": name}, an inline
+            # profile, or the one from the config
+            extract = kwargs.get('extract')
+            if extract or self.profile:
+                result['extracted_data'] = self.extract(result['page_source'], url, extract)
                 
             return result
             
@@ -94,5 +124,6 @@ class SeleniumScraper(BaseScraper):
     async def cleanup(self) -> None:
         '''Close the driver and cleanup'''
         if self.driver:
-            self.driver.quit()
+            driver, self.driver = self.driver, None
+            await asyncio.get_event_loop().run_in_executor(None, driver.quit)
         await super().cleanup()
@@ -0,0 +1,80 @@
+"""
+Content-addressed store for scraped page HTML.
+
+Each distinct page is stored once in html_blobs, compressed (zstd when
+available) and keyed by the SHA-256 of its bytes; ScrapedData rows reference
+the hash. Re-scraping a page that has not changed adds a 64-character
+reference rather than another copy, and reading a ScrapedData row only
+fetches and decompresses the blob when raw_html is asked for.
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from ..models.database import HtmlBlob, ScrapedData
+from ..utils.compression import compress
+from .metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+class HtmlBlobStore:
+    """put/get raw HTML by content hash through a SQLAlchemy session"""
+
+    def __init__(self, codec: Optional[str] = None):
+        self.codec = codec
+
+    def put(self, session: Session, html: str) -> str:
+        """Store html unless an identical page is already stored; returns its hash"""
+        data = html.encode("utf-8")
+        digest = content_hash(data)
+        stored = session.get(HtmlBlob, digest) is not None
+        record_cache("html_blob", stored)
+        if stored:
+            return digest
+        codec, compressed = compress(data, self.codec)
+        values = {"hash": digest, "codec": codec, "size": len(data), "data": compressed}
+        if session.get_bind().dialect.name == "postgresql":
+            # Another worker may store the same page between the check and the insert
+            from sqlalchemy.dialects.postgresql import insert
+            session.execute(insert(HtmlBlob).values(**values).on_conflict_do_nothing(index_elements=["hash"]))
+        else:
+            session.add(HtmlBlob(**values))
+            session.flush()
+        return digest
+
+    def get(self, session: Session, digest: str) -> Optional[str]:
+        blob = session.get(HtmlBlob, digest)
+        return blob.text if blob is not None else None
+
+    def attach(self, session: Session, record: ScrapedData, html: Optional[str]) -> ScrapedData:
+        """Point a ScrapedData row at the stored copy of html"""
+        record.raw_html_hash = self.put(session, html) if html else None
+        return record
+
+    def migrate_inline(self, session: Session, batch_size: int = 500) -> int:
+        """
+        Move one batch of pre-blob rows' inline raw_html into the store and
+        clear the inline copy. Returns the number of rows moved; call until 0.
+        """
+        rows = session.execute(
+            select(ScrapedData.id, ScrapedData.legacy_raw_html)
+            .where(ScrapedData.raw_html_hash.is_(None), ScrapedData.legacy_raw_html.is_not(None))
+            .limit(batch_size)
+        ).all()
+        for row_id, html in rows:
+            session.execute(
+                update(ScrapedData)
+                .where(ScrapedData.id == row_id)
+                .values(raw_html_hash=self.put(session, html), legacy_raw_html=None)
+            )
+        session.commit()
+        if rows:
+            logger.info(f"📦 Moved {len(rows)} inline raw_html rows into html_blobs")
+        return len(rows)
@@ -0,0 +1,276 @@
+"""
+WebSocket broadcast hub.
+
+Every message is encoded once and handed to each connection's bounded outbound
+queue. A per-connection sender task drains the queue, so a slow dashboard only
+delays itself: when its queue is full the oldest message is dropped, messages
+sharing a coalesce key are replaced by the newest one, and connections whose
+sends stall are disconnected.
+
+Messages are encoded with the fast JSON encoder; callers that already hold
+an encoded message (str or UTF-8 bytes) pass it through untouched, so a
+payload built once is shared by every connection.
+
+Connections subscribe to topics: "job:<id>" for a single job, "jobs" for every
+job, and "system" for system stats. Messages published with a topic only reach
+matching connections; messages without one go to everybody.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Union
+
+from fastapi import WebSocket
+
+from ..utils.fast_json import dumps_str
+from .metrics import BROADCAST_LATENCY_SECONDS, register_hub
+
+logger = logging.getLogger(__name__)
+
+Message = Union[Dict[str, Any], str, bytes]
+
+ALL_JOBS_TOPIC = "jobs"
+SYSTEM_TOPIC = "system"
+DEFAULT_TOPICS = frozenset({ALL_JOBS_TOPIC, SYSTEM_TOPIC})
+
+def job_topic(job_id: str) -> str:
+    return f"job:{job_id}"
+
+def topic_matches(subscriptions: Iterable[str], topic: Optional[str]) -> bool:
+    """Untopiced messages match everyone; "jobs" matches every job:<id> topic"""
+    if topic is None or topic in subscriptions:
+        return True
+    return topic.startswith("job:") and ALL_JOBS_TOPIC in subscriptions
+
+def encode_message(message: Message) -> str:
+    """Serialize a message for the wire (pre-encoded messages pass through)"""
+    if isinstance(message, str):
+        return message
+    if isinstance(message, (bytes, bytearray)):
+        # WebSocket text frames carry str; decoded once, not per connection
+        return message.decode("utf-8")
+    return dumps_str(message)
+
+class Connection:
+    """One WebSocket plus its outbound queue and sender task"""
+
+    def __init__(self, hub: "BroadcastHub", websocket: WebSocket, client_id: str,
+                 topics: Iterable[str] = DEFAULT_TOPICS):
+        self.hub = hub
+        self.websocket = websocket
+        self.client_id = client_id
+        self.topics: Set[str] = set(topics)
+        self.connected_at = time.monotonic()
+
+        # key -> (payload, enqueued_at); unkeyed messages get a unique key
+        self._pending: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._seq = itertools.count()
+        self._sender: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+    def start(self):
+        self._sender = asyncio.create_task(self._run(), name=f"ws-sender-{self.client_id}")
+
+    def enqueue(self, payload: str, key: Optional[Hashable] = None):
+        now = time.monotonic()
+        if key is None:
+            key = ("_seq", next(self._seq))
+        elif key in self._pending:
+            # Latest wins: the stale copy is never sent
+            del self._pending[key]
+            self.coalesced += 1
+
+        self._pending[key] = (payload, now)
+        while len(self._pending) > self.hub.queue_size:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._wakeup.set()
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending)
+
+    @property
+    def lag(self) -> float:
+        """Age in seconds of the oldest message still waiting to be sent"""
+        if not self._pending:
+            return 0.0
+        _, enqueued_at = next(iter(self._pending.values()))
+        return time.monotonic() - enqueued_at
+
+    async def _run(self):
+        try:
+            # Checked as well as relying on cancel(): wait_for() can swallow a
+            # cancellation that lands just as the send completes
+            while not self._closed:
+                if not self._pending:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                _, (payload, enqueued_at) = self._pending.popitem(last=False)
+                await asyncio.wait_for(self.websocket.send_text(payload), timeout=self.hub.send_timeout)
+                self.sent += 1
+                self.last_latency = time.monotonic() - enqueued_at
+                self.max_latency = max(self.max_latency, self.last_latency)
+                BROADCAST_LATENCY_SECONDS.observe(self.last_latency)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ Client {self.client_id} stalled for {self.hub.send_timeout}s, disconnecting")
+            await self.hub.disconnect(self.client_id, code=1011, connection=self)
+        except Exception as e:
+            logger.error(f"Error sending to {self.client_id}: {e}")
+            await self.hub.disconnect(self.client_id, close=False, connection=self)
+
+    async def stop(self):
+        self._closed = True
+        self._wakeup.set()
+        if self._sender is not None and self._sender is not asyncio.current_task():
+            self._sender.cancel()
+            try:
+                await self._sender
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "lag_ms": round(self.lag * 1000, 1),
+            "last_latency_ms": round(self.last_latency * 1000, 1),
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "topics": sorted(self.topics),
+            "connected_for_s": round(time.monotonic() - self.connected_at, 1),
+        }
+
+class BroadcastHub:
+    """Fan-out of messages to WebSocket connections with slow-consumer isolation
+
+    broadcast() only enqueues and never yields, so queue_size must cover a burst
+    of messages published back to back; only connections that stay behind for
+    longer than a burst start dropping.
+    """
+
+    def __init__(self, queue_size: int = 256, send_timeout: float = 10.0, max_lag: float = 30.0):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.max_lag = max_lag
+        self.active_connections: Dict[str, Connection] = {}
+        register_hub(self)
+
+    async def connect(self, websocket: WebSocket, client_id: Optional[str] = None,
+                      topics: Optional[Iterable[str]] = None) -> Connection:
+        await websocket.accept()
+        client_id = client_id or uuid.uuid4().hex
+        previous = self.active_connections.get(client_id)
+        if previous is not None:
+            # Same client reconnecting; retire the old sender
+            await self.disconnect(client_id, connection=previous)
+        connection = Connection(self, websocket, client_id, DEFAULT_TOPICS if topics is None else topics)
+        self.active_connections[client_id] = connection
+        connection.start()
+        logger.info(f"Client {client_id} connected. Total connections: {len(self.active_connections)}")
+        return connection
+
+    async def disconnect(self, client_id: str, code: int = 1000, close: bool = True,
+                         connection: Optional[Connection] = None):
+        """Remove a client; pass `connection` so a stale handler can't evict a reconnected client"""
+        current = self.active_connections.get(client_id)
+        if current is None or (connection is not None and current is not connection):
+            return
+        del self.active_connections[client_id]
+        connection = current
+        await connection.stop()
+        if close:
+            try:
+                await connection.websocket.close(code=code)
+            except Exception:
+                pass
+        logger.info(f"Client {client_id} disconnected. Total connections: {len(self.active_connections)}")
+
+    async def send_personal_message(self, message: Message, client_id: str, key: Optional[Hashable] = None):
+        connection = self.active_connections.get(client_id)
+        if connection is not None:
+            connection.enqueue(encode_message(message), key)
+
+    def subscribe(self, client_id: str, topics: Iterable[str], replace: bool = False) -> Set[str]:
+        connection = self.active_connections.get(client_id)
+        if connection is None:
+            return set()
+        if replace:
+            connection.topics = set(topics)
+        else:
+            connection.topics.update(topics)
+        return connection.topics
+
+    def unsubscribe(self, client_id: str, topics: Iterable[str]) -> Set[str]:
+        connection = self.active_connections.get(client_id)
+        if connection is None:
+            return set()
+        connection.topics.difference_update(topics)
+        return connection.topics
+
+    async def broadcast(self, message: Message, key: Optional[Hashable] = None,
+                        topic: Optional[str] = None) -> int:
+        """Encode once and queue for every subscribed connection; returns the number of recipients"""
+        recipients = [c for c in self.active_connections.values() if topic_matches(c.topics, topic)]
+        if not recipients:
+            return 0
+        payload = encode_message(message)
+        for connection in recipients:
+            connection.enqueue(payload, key)
+        await self._drop_stalled(recipients)
+        return len(recipients)
+
+    async def broadcast_batch(self, message_type: str, items: List[Dict[str, Any]],
+                              topic_of: Callable[[Dict[str, Any]], Optional[str]]) -> int:
+        """Send each connection only the items of a batch it subscribes to.
+
+        Connections that match the same subset share one encoded payload.
+        """
+        if not self.active_connections or not items:
+            return 0
+        topics = [topic_of(item) for item in items]
+
+        groups: Dict[tuple, List[Connection]] = {}
+        for connection in self.active_connections.values():
+            selected = tuple(i for i, topic in enumerate(topics) if topic_matches(connection.topics, topic))
+            if selected:
+                groups.setdefault(selected, []).append(connection)
+
+        recipients = []
+        for selected, connections in groups.items():
+            payload = encode_message({"type": message_type, "updates": [items[i] for i in selected]})
+            for connection in connections:
+                connection.enqueue(payload)
+            recipients.extend(connections)
+        await self._drop_stalled(recipients)
+        return len(recipients)
+
+    async def _drop_stalled(self, connections: List[Connection]):
+        for connection in connections:
+            if connection.lag > self.max_lag:
+                logger.warning(f"⚠️ Client {connection.client_id} is {self.max_lag}s behind, disconnecting")
+                await self.disconnect(connection.client_id, code=1011, connection=connection)
+
+    async def close_all(self):
+        for client_id in list(self.active_connections):
+            await self.disconnect(client_id, code=1001)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-connection queue depth, lag and delivery counters"""
+        return {client_id: connection.stats() for client_id, connection in self.active_connections.items()}
@@ -0,0 +1,228 @@
+"""
+Warm pool of browser sessions.
+
+Starting a stealth Chrome takes seconds, so instead of one browser per
+request the pool opens SCRAPE_POOL_SIZE sessions when the app starts and
+lends them out. A session is health-checked before it is handed over and
+replaced if the check fails, and it is retired and replaced in the background
+after SCRAPE_POOL_MAX_PAGES pages so long-lived browsers do not accumulate
+memory and state. Borrowers wait at most SCRAPE_POOL_ACQUIRE_TIMEOUT seconds;
+the wait is recorded per borrow and in mk_driver_pool_wait_seconds.
+
+The pool does not know about Selenium: factory() returns a ready scraper, and
+the scraper's optional is_healthy(), reset() and cleanup() coroutines are used
+for health checks, clearing one borrower's cookies and page before the next,
+and shutdown. A session whose reset fails is retired rather than reused.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+from .metrics import DRIVER_POOL_IN_USE, DRIVER_POOL_SIZE, DRIVER_POOL_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_POOL_SIZE = int(os.getenv("SCRAPE_POOL_SIZE", "2"))
+SCRAPE_POOL_MAX_PAGES = int(os.getenv("SCRAPE_POOL_MAX_PAGES", "50"))
+SCRAPE_POOL_ACQUIRE_TIMEOUT = float(os.getenv("SCRAPE_POOL_ACQUIRE_TIMEOUT", "30"))
+SCRAPE_POOL_HEALTH_TIMEOUT = float(os.getenv("SCRAPE_POOL_HEALTH_TIMEOUT", "5"))
+
+class PoolTimeout(Exception):
+    """No session became free within the acquire timeout"""
+
+class PooledSession:
+    """A scraper on loan from the pool"""
+
+    __slots__ = ("id", "scraper", "pages", "created_at", "wait_s")
+
+    def __init__(self, session_id: int, scraper: Any):
+        self.id = session_id
+        self.scraper = scraper
+        self.pages = 0
+        self.created_at = time.time()
+        # How long the current borrower waited for this session
+        self.wait_s = 0.0
+
+class BrowserPool:
+    def __init__(self, factory: Callable[[], Awaitable[Any]], size: int = SCRAPE_POOL_SIZE,
+                 max_pages: int = SCRAPE_POOL_MAX_PAGES, acquire_timeout: float = SCRAPE_POOL_ACQUIRE_TIMEOUT,
+                 health_timeout: float = SCRAPE_POOL_HEALTH_TIMEOUT, name: str = "browser"):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+        self.health_timeout = health_timeout
+        self.name = name
+
+        self._idle: "asyncio.Queue[PooledSession]" = asyncio.Queue()
+        self._sessions: Set[PooledSession] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._ids = itertools.count(1)
+        self._closed = False
+
+        self.in_use = 0
+        self.created = 0
+        self.recycled = 0
+        self.unhealthy = 0
+
+    # ==================== LIFECYCLE ====================
+
+    async def start(self):
+        """Open every session up front; raises if none could be opened"""
+        results = await asyncio.gather(*(self._create() for _ in range(self.size)), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if len(errors) == self.size and self.size:
+            raise errors[0]
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"⚠️ Browser session failed to start, retrying in the background: {result}")
+                self._spawn(self._replace())
+            else:
+                self._idle.put_nowait(result)
+        DRIVER_POOL_SIZE.labels(pool=self.name).set(self.size)
+        logger.info(f"✅ Browser pool '{self.name}' warm with {self._idle.qsize()}/{self.size} sessions")
+
+    async def stop(self):
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.gather(*(self._close(s) for s in list(self._sessions)), return_exceptions=True)
+        DRIVER_POOL_SIZE.labels(pool=self.name).set(0)
+        logger.info(f"🔄 Browser pool '{self.name}' closed")
+
+    # ==================== BORROWING ====================
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[PooledSession]:
+        """Borrow a healthy session; session.wait_s says how long that took"""
+        if self._closed:
+            raise RuntimeError(f"Browser pool '{self.name}' is closed")
+        started = time.monotonic()
+        while True:
+            remaining = self.acquire_timeout - (time.monotonic() - started)
+            try:
+                session = await asyncio.wait_for(self._idle.get(), timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                raise PoolTimeout(f"No browser session free within {self.acquire_timeout:.0f}s") from None
+            if await self._healthy(session):
+                break
+            self.unhealthy += 1
+            logger.warning(f"⚠️ Browser session {session.id} failed its health check, replacing it")
+            self._retire(session)
+
+        session.wait_s = time.monotonic() - started
+        DRIVER_POOL_WAIT_SECONDS.labels(pool=self.name).observe(session.wait_s)
+        self.in_use += 1
+        DRIVER_POOL_IN_USE.labels(pool=self.name).inc()
+        try:
+            yield session
+        finally:
+            self.in_use -= 1
+            DRIVER_POOL_IN_USE.labels(pool=self.name).dec()
+            session.pages += 1
+            if self._closed or session.pages >= self.max_pages:
+                self._retire(session)
+            else:
+                await self._release(session)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "in_use": self.in_use,
+            "created": self.created,
+            "recycled": self.recycled,
+            "unhealthy": self.unhealthy,
+            "max_pages": self.max_pages,
+        }
+
+    # ==================== SESSIONS ====================
+
+    async def _create(self) -> PooledSession:
+        scraper = await self.factory()
+        session = PooledSession(next(self._ids), scraper)
+        self._sessions.add(session)
+        self.created += 1
+        return session
+
+    async def _healthy(self, session: PooledSession) -> bool:
+        check = getattr(session.scraper, "is_healthy", None)
+        if check is None:
+            return True
+        try:
+            return bool(await asyncio.wait_for(check(), timeout=self.health_timeout))
+        except Exception:
+            return False
+
+    async def _reset(self, session: PooledSession) -> bool:
+        reset = getattr(session.scraper, "reset", None)
+        if reset is None:
+            return True
+        try:
+            await asyncio.wait_for(reset(), timeout=self.health_timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Browser session {session.id} could not be reset ({e}), replacing it")
+            return False
+
+    async def _release(self, session: PooledSession):
+        """Back to the idle queue once the last borrower's state is gone"""
+        try:
+            clean = await self._reset(session)
+        except asyncio.CancelledError:
+            self._retire(session)
+            raise
+        if clean:
+            self._idle.put_nowait(session)
+        else:
+            self.unhealthy += 1
+            self._retire(session)
+
+    async def _close(self, session: PooledSession):
+        self._sessions.discard(session)
+        cleanup = getattr(session.scraper, "cleanup", None)
+        if cleanup is None:
+            return
+        try:
+            await cleanup()
+        except Exception as e:
+            logger.warning(f"⚠️ Error closing browser session {session.id}: {e}")
+
+    def _retire(self, session: PooledSession):
+        """Close a session and open its replacement, off the request path"""
+        self.recycled += 1
+        self._spawn(self._recycle(session))
+
+    async def _recycle(self, session: PooledSession):
+        await self._close(session)
+        if not self._closed:
+            await self._replace()
+
+    async def _replace(self):
+        for attempt in itertools.count():
+            if self._closed:
+                return
+            try:
+                session = await self._create()
+            except Exception as e:
+                delay = min(60.0, 2.0 ** attempt)
+                logger.error(f"❌ Could not open a browser session ({e}), retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                continue
+            if self._closed:
+                await self._close(session)
+            else:
+                self._idle.put_nowait(session)
+            return
+
+    def _spawn(self, coro: Awaitable[Any]):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,114 @@
+"""
+Indexed in-memory job store.
+
+Jobs are kept by id for O(1) lookup, with per-status counters and secondary
+indexes by status and created_at that are maintained on every write. Records
+can be plain dicts or attribute objects (pydantic models); status changes must
+go through update() so the indexes stay in step.
+"""
+
+import bisect
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+def _status_key(status: Any) -> str:
+    """Enum statuses are indexed by their value"""
+    return getattr(status, "value", status)
+
+class JobStore:
+    """Jobs by id plus status and created_at indexes"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Any] = {}
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        self._created: List[Tuple[Any, str]] = []
+
+    @staticmethod
+    def _field(job: Any, name: str, default: Any = None) -> Any:
+        if isinstance(job, dict):
+            return job.get(name, default)
+        return getattr(job, name, default)
+
+    @staticmethod
+    def _set_field(job: Any, name: str, value: Any):
+        if isinstance(job, dict):
+            job[name] = value
+        else:
+            setattr(job, name, value)
+
+    def add(self, job: Any) -> Any:
+        job_id = self._field(job, "id")
+        if job_id in self._jobs:
+            raise ValueError(f"Duplicate job id: {job_id}")
+        self._jobs[job_id] = job
+        self._by_status.setdefault(_status_key(self._field(job, "status")), {})[job_id] = None
+        # Jobs normally arrive in creation order, so this is an append
+        bisect.insort(self._created, (self._field(job, "created_at"), job_id))
+        return job
+
+    def get(self, job_id: str) -> Optional[Any]:
+        return self._jobs.get(job_id)
+
+    def update(self, job_id: str, **fields) -> Optional[Any]:
+        """Set fields on a job, re-indexing it if its status changes"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if "status" in fields:
+            old = _status_key(self._field(job, "status"))
+            new = _status_key(fields["status"])
+            if old != new:
+                del self._by_status[old][job_id]
+                self._by_status.setdefault(new, {})[job_id] = None
+        for name, value in fields.items():
+            self._set_field(job, name, value)
+        return job
+
+    def remove(self, job_id: str) -> Optional[Any]:
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return None
+        del self._by_status[_status_key(self._field(job, "status"))][job_id]
+        key = (self._field(job, "created_at"), job_id)
+        index = bisect.bisect_left(self._created, key)
+        if index < len(self._created) and self._created[index] == key:
+            del self._created[index]
+        return job
+
+    def count(self, status: Optional[Any] = None) -> int:
+        if status is None:
+            return len(self._jobs)
+        return len(self._by_status.get(_status_key(status), ()))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        return {status: len(ids) for status, ids in self._by_status.items() if ids}
+
+    def by_status(self, status: Any) -> List[Any]:
+        return [self._jobs[job_id] for job_id in self._by_status.get(_status_key(status), ())]
+
+    def created_between(self, start: Any = None, end: Any = None) -> List[Any]:
+        """Jobs with start <= created_at < end, oldest first"""
+        lo = 0 if start is None else bisect.bisect_left(self._created, (start,))
+        hi = len(self._created) if end is None else bisect.bisect_left(self._created, (end,))
+        return [self._jobs[job_id] for _, job_id in self._created[lo:hi]]
+
+    def page(self, limit: int, before: Optional[Tuple[Any, str]] = None) -> List[Any]:
+        """Up to limit jobs older than the (created_at, id) key, newest first"""
+        hi = len(self._created) if before is None else bisect.bisect_left(self._created, tuple(before))
+        return [self._jobs[job_id] for _, job_id in reversed(self._created[max(0, hi - limit):hi])]
+
+    def recent(self, limit: int) -> List[Any]:
+        """The newest jobs, newest first"""
+        return [self._jobs[job_id] for _, job_id in reversed(self._created[-limit:])] if limit > 0 else []
+
+    def values(self) -> List[Any]:
+        return list(self._jobs.values())
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._jobs.values()))
@@ -0,0 +1,78 @@
+"""
+Prometheus metrics for the backend, built on prometheus_client.
+
+Counters, gauges and histograms are registered in prometheus_client's default
+registry and exposed by GET /metrics with generate_latest(). Values that
+already live elsewhere (WebSocket connections, broadcast lag) are read by a
+collector at scrape time instead of being updated on every change. Metrics
+are per process; with several workers, Prometheus scrapes each one.
+"""
+
+import weakref
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Seconds; spans a cache hit up to a slow page load through Selenium
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# ==================== SCRAPE PIPELINE ====================
+
+JOBS_CREATED = Counter("mk_jobs_created_total", "Scraping jobs created")
+JOBS_COMPLETED = Counter("mk_jobs_completed_total", "Scraping jobs completed")
+JOBS_FAILED = Counter("mk_jobs_failed_total", "Scraping jobs failed")
+MODELS_SCRAPED = Counter("mk_models_scraped_total", "Models scraped, by outcome", ["result"])
+SCRAPE_STAGE_SECONDS = Histogram("mk_scrape_stage_seconds", "Time spent per scrape stage", ["stage"],
+                                 buckets=DEFAULT_BUCKETS)
+DRIVER_POOL_SIZE = Gauge("mk_driver_pool_size", "Browser/worker slots in a scrape pool", ["pool"])
+DRIVER_POOL_IN_USE = Gauge("mk_driver_pool_in_use", "Browser/worker slots currently busy", ["pool"])
+DRIVER_POOL_WAIT_SECONDS = Histogram("mk_driver_pool_wait_seconds", "Time spent waiting to borrow a pooled browser",
+                                     ["pool"], buckets=DEFAULT_BUCKETS)
+CACHE_REQUESTS = Counter("mk_cache_requests_total", "Cache lookups, by cache and result", ["cache", "result"])
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+# ==================== WEBSOCKETS ====================
+
+BROADCAST_LATENCY_SECONDS = Histogram(
+    "mk_websocket_broadcast_latency_seconds", "Time from enqueue to send per WebSocket message",
+    buckets=DEFAULT_BUCKETS
+)
+
+_hubs: "weakref.WeakSet" = weakref.WeakSet()
+
+def register_hub(hub):
+    """Report a BroadcastHub's connections and lag at scrape time"""
+    _hubs.add(hub)
+
+class _HubCollector:
+    """WebSocket totals across every registered hub, computed at scrape time"""
+
+    def collect(self):
+        connections = queued = dropped = 0
+        max_lag = 0.0
+        for hub in list(_hubs):
+            for stats in hub.stats().values():
+                connections += 1
+                queued += stats["queued"]
+                dropped += stats["dropped"]
+                max_lag = max(max_lag, stats["lag_ms"] / 1000)
+        yield GaugeMetricFamily("mk_websocket_connections", "Open WebSocket connections", value=connections)
+        yield GaugeMetricFamily("mk_websocket_queued_messages", "Messages waiting in per-connection send queues",
+                                value=queued)
+        yield GaugeMetricFamily("mk_websocket_dropped_messages",
+                                "Messages dropped from full queues on open connections", value=dropped)
+        yield GaugeMetricFamily("mk_websocket_broadcast_lag_seconds",
+                                "Age of the oldest unsent message across connections", value=max_lag)
+
+REGISTRY.register(_HubCollector())
+
+def render_latest() -> bytes:
+    return generate_latest(REGISTRY)
+
+def sample(name: str, **labels) -> float:
+    """Current value of one sample, 0 if it has not been recorded yet"""
+    return REGISTRY.get_sample_value(name, labels) or 0
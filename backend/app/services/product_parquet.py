@@ -0,0 +1,197 @@
+"""
+Columnar (Parquet) output for scraped product rows.
+
+The scraper's flat output rows ("Mfr Model", "Price", "Additional Image 1..5",
+"Weight", ...) are stored with real types instead of text: prices and weights
+as float64 (weights converted to pounds; a price like "Call for Price" becomes
+null), numbered image/video columns folded into one list<string> column each,
+and everything else as strings. Rows are buffered and written as a new row
+group every PARQUET_ROW_GROUP_ROWS rows, so a long job appends as it goes
+instead of rewriting the whole file. parquet_to_excel() rebuilds the familiar
+spreadsheet layout from the Parquet file afterwards.
+
+Needs pyarrow.
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional; only the Parquet output mode needs it
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+PARQUET_ROW_GROUP_ROWS = int(os.getenv("PARQUET_ROW_GROUP_ROWS", "500"))
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+
+PRICE_COLUMNS = {"Price"}
+WEIGHT_COLUMNS = {"Weight", "Shipping Weight"}
+# Numbered column stem -> list column that replaces the numbered columns
+LIST_GROUPS = {"Additional Image": "Additional Images", "Video Link": "Video Links"}
+
+# Metadata key on list fields naming the spreadsheet columns they came from
+EXPAND_KEY = b"columns"
+
+PRICE_RE = re.compile(r"\d[\d,]*(?:\.\d+)?|\.\d+")
+WEIGHT_RE = re.compile(r"(\d[\d,]*(?:\.\d+)?|\.\d+)\s*(lbs?|pounds?|kgs?|kilograms?|oz|ounces?|g|grams?)?\b", re.I)
+POUNDS_PER_UNIT = {"lb": 1.0, "pound": 1.0, "kg": 2.20462, "kilogram": 2.20462, "oz": 1 / 16,
+                   "ounce": 1 / 16, "g": 0.00220462, "gram": 0.00220462}
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet output needs the pyarrow package")
+
+def parse_price(value: Any) -> Optional[float]:
+    """1234.5 from "$1,234.50"; None for text without a number"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value == value else None
+    match = PRICE_RE.search(str(value))
+    return float(match.group(0).replace(",", "")) if match else None
+
+def parse_weight_lb(value: Any) -> Optional[float]:
+    """Weight in pounds from "85 lbs", "38.5 kg", "12 oz"; a bare number is pounds"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value == value else None
+    match = WEIGHT_RE.search(str(value))
+    if not match:
+        return None
+    unit = (match.group(2) or "lb").lower().rstrip("s")
+    return round(float(match.group(1).replace(",", "")) * POUNDS_PER_UNIT[unit], 3)
+
+def _list_group(column: str) -> Optional[str]:
+    stem, _, number = column.rpartition(" ")
+    return stem if stem in LIST_GROUPS and number.isdigit() else None
+
+def product_schema(columns: Sequence[str]):
+    """Typed schema for rows with these spreadsheet columns, in the same order"""
+    _require_pyarrow()
+    fields, groups = [], {}
+    for column in columns:
+        stem = _list_group(column)
+        if stem:
+            if stem not in groups:
+                groups[stem] = []
+                fields.append(stem)
+            groups[stem].append(column)
+        else:
+            fields.append(column)
+    schema = []
+    for name in fields:
+        if name in groups:
+            metadata = {EXPAND_KEY: json.dumps(groups[name]).encode()}
+            schema.append(pa.field(LIST_GROUPS[name], pa.list_(pa.string()), metadata=metadata))
+        elif name in PRICE_COLUMNS or name in WEIGHT_COLUMNS:
+            schema.append(pa.field(name, pa.float64()))
+        else:
+            schema.append(pa.field(name, pa.string()))
+    return pa.schema(schema)
+
+def _text(value: Any) -> Optional[str]:
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    return str(value)
+
+class ProductParquetWriter:
+    """Appends product rows to a Parquet file, one row group per batch"""
+
+    def __init__(self, path: str, columns: Sequence[str], row_group_rows: int = PARQUET_ROW_GROUP_ROWS,
+                 compression: str = PARQUET_COMPRESSION):
+        self.path = path
+        self.schema = product_schema(columns)
+        self.row_group_rows = row_group_rows
+        self.rows_written = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._converters = [self._converter(field) for field in self.schema]
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+
+    @staticmethod
+    def _converter(field):
+        if field.metadata and EXPAND_KEY in field.metadata:
+            members = json.loads(field.metadata[EXPAND_KEY])
+            return field.name, lambda row: [v for v in (_text(row.get(c)) for c in members) if v]
+        if field.name in WEIGHT_COLUMNS:
+            return field.name, lambda row: parse_weight_lb(row.get(field.name))
+        if field.name in PRICE_COLUMNS:
+            return field.name, lambda row: parse_price(row.get(field.name))
+        return field.name, lambda row: _text(row.get(field.name))
+
+    def append(self, row: Dict[str, Any]):
+        """Add one spreadsheet-shaped row; a row group is written once enough are buffered"""
+        self._buffer.append({name: convert(row) for name, convert in self._converters})
+        if len(self._buffer) >= self.row_group_rows:
+            self.flush()
+
+    def extend(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.append(row)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self._writer.write_table(pa.Table.from_pylist(self._buffer, schema=self.schema))
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        """Write buffered rows and the file footer; the file is readable from here on"""
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+        self._writer = None
+        logger.info(f"📦 Wrote {self.rows_written} rows to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_products(path: str, columns: Optional[List[str]] = None):
+    """Parquet product file as a DataFrame with its typed columns"""
+    _require_pyarrow()
+    return pq.read_table(path, columns=columns).to_pandas()
+
+def expand_lists(table):
+    """DataFrame in the original spreadsheet layout: list columns back to numbered columns"""
+    import pandas as pd
+
+    df = table.to_pandas()
+    for field in table.schema:
+        if not (field.metadata and EXPAND_KEY in field.metadata):
+            continue
+        members = json.loads(field.metadata[EXPAND_KEY])
+        values = [list(v[:len(members)]) if v is not None else [] for v in df[field.name]]
+        expanded = pd.DataFrame([v + [None] * (len(members) - len(v)) for v in values], columns=members,
+                                index=df.index)
+        position = df.columns.get_loc(field.name)
+        df = df.drop(columns=field.name)
+        for offset, member in enumerate(members):
+            df.insert(position + offset, member, expanded[member])
+    return df
+
+def parquet_to_excel(parquet_path: str, xlsx_path: str, fill: Optional[Dict[str, Any]] = None, **excel_options) -> int:
+    """
+    Write the Parquet product file as XLSX in the spreadsheet layout; fill
+    gives values for nulls per column (e.g. {"Price": "Call for Price"}).
+    Returns the number of rows written.
+    """
+    _require_pyarrow()
+    from ..utils.excel import write_excel
+
+    df = expand_lists(pq.read_table(parquet_path))
+    for column, value in (fill or {}).items():
+        if column in df.columns:
+            df[column] = df[column].astype(object).where(df[column].notna(), value)
+    write_excel(df, xlsx_path, **excel_options)
+    return len(df)
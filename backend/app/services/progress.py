@@ -0,0 +1,94 @@
+"""
+Coalesced progress updates.
+
+Progress is recorded latest-wins per job and flushed to subscribers as one
+batched message per tick, containing only the fields that changed since the
+previous flush. Terminal updates (completed/failed/cancelled) bypass the tick
+and are published immediately.
+
+Wire format: ticks go out as {"type": "progress_batch", "updates": [...]},
+each update a task_id plus the changed fields, so clients merge them into
+the task's last known state. Terminal updates keep the full
+{"type": "progress_update", ...} message.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_TICK_HZ = float(os.getenv("PROGRESS_TICK_HZ", "4"))
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+Publisher = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+class ProgressAggregator:
+    """Latest-wins progress state per job, flushed on a fixed tick"""
+
+    def __init__(self, publish: Publisher, tick_hz: float = PROGRESS_TICK_HZ):
+        self.publish = publish
+        self.interval = 1.0 / tick_hz
+        self._dirty: Dict[str, Dict[str, Any]] = {}
+        self._last_sent: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.updates_received = 0
+        self.batches_sent = 0
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="progress-aggregator")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Don't lose whatever arrived after the last tick
+        await self.flush()
+
+    async def update(self, job_id: str, state: Dict[str, Any]):
+        """Record the latest state for a job; terminal states are published right away"""
+        self.updates_received += 1
+        if state.get("status") in TERMINAL_STATUSES:
+            self._dirty.pop(job_id, None)
+            self._last_sent.pop(job_id, None)
+            await self.publish(state)
+            return
+        self._dirty.setdefault(job_id, {}).update(state)
+
+    async def flush(self) -> int:
+        """Publish one batch with the changed fields of every dirty job"""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+
+        updates = []
+        for job_id, state in dirty.items():
+            last = self._last_sent.setdefault(job_id, {})
+            delta = {k: v for k, v in state.items() if last.get(k) != v}
+            if not delta:
+                continue
+            last.update(delta)
+            delta["task_id"] = job_id
+            updates.append(delta)
+
+        if not updates:
+            return 0
+        await self.publish({"type": "progress_batch", "updates": updates})
+        self.batches_sent += 1
+        return len(updates)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing progress batch: {e}")
@@ -0,0 +1,163 @@
+"""
+Redis-backed shared job state and event bus.
+
+With several uvicorn workers or replicas, a job runs in one process while its
+dashboard may be connected to another. RedisJobState keeps the latest state of
+every job where any process can read it, and RedisEventBus fans events out
+over pub/sub so every process delivers them to its own WebSocket clients.
+Both take an existing redis.asyncio client created with decode_responses=True.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "mk")
+JOB_STATE_TTL = int(os.getenv("JOB_STATE_TTL", str(7 * 24 * 3600)))
+
+class RedisJobState:
+    """Latest state per job as JSON, plus a status index and a recency index
+
+    State keys expire ttl seconds after a job's last update. The recency index
+    is scored by that same last update, so every write also drops the ids
+    whose state has expired from the recency index and the status sets.
+    """
+
+    def __init__(self, client, prefix: str = REDIS_KEY_PREFIX, ttl: int = JOB_STATE_TTL):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def _status_key(self, status: str) -> str:
+        return f"{self.prefix}:jobs:status:{status}"
+
+    @property
+    def _index_key(self) -> str:
+        return f"{self.prefix}:jobs"
+
+    @property
+    def _statuses_key(self) -> str:
+        # Every status that has a status set, so expired ids can be removed from all of them
+        return f"{self.prefix}:jobs:statuses"
+
+    async def set(self, job_id: str, state: Dict[str, Any]):
+        await self.set_many({job_id: state})
+
+    async def set_many(self, states: Dict[str, Dict[str, Any]]):
+        """Write several job states in one round trip"""
+        if not states:
+            return
+        now = time.time()
+        # SET ... GET hands back the previous state so the status index can follow
+        pipe = self.client.pipeline(transaction=False)
+        for job_id, state in states.items():
+            pipe.set(self._key(job_id), json.dumps(state, default=str), ex=self.ttl, get=True)
+        # Ids not updated within ttl have no state left
+        pipe.zrangebyscore(self._index_key, "-inf", now - self.ttl)
+        pipe.smembers(self._statuses_key)
+        *previous, expired, statuses = await pipe.execute()
+
+        pipe = self.client.pipeline(transaction=False)
+        for (job_id, state), old in zip(states.items(), previous):
+            old_status = json.loads(old).get("status") if old else None
+            new_status = state.get("status")
+            if old_status != new_status:
+                if old_status:
+                    pipe.srem(self._status_key(old_status), job_id)
+                if new_status:
+                    pipe.sadd(self._status_key(new_status), job_id)
+                    pipe.sadd(self._statuses_key, new_status)
+            pipe.zadd(self._index_key, {job_id: now})
+        expired = [job_id for job_id in expired if job_id not in states]
+        if expired:
+            pipe.zrem(self._index_key, *expired)
+            for status in statuses:
+                pipe.srem(self._status_key(status), *expired)
+        await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.get(self._key(job_id))
+        return json.loads(raw) if raw else None
+
+    async def get_many(self, job_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        values = await self.client.mget([self._key(job_id) for job_id in job_ids])
+        return {job_id: json.loads(raw) for job_id, raw in zip(job_ids, values) if raw}
+
+    async def recent_ids(self, limit: int = 1000) -> List[str]:
+        """Most recently updated job ids, newest first"""
+        return await self.client.zrevrange(self._index_key, 0, limit - 1)
+
+    async def counts(self, statuses: Iterable[str]) -> Dict[str, int]:
+        pipe = self.client.pipeline(transaction=False)
+        statuses = list(statuses)
+        for status in statuses:
+            pipe.scard(self._status_key(status))
+        return dict(zip(statuses, await pipe.execute()))
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+class RedisEventBus:
+    """Pub/sub fan-out of JSON envelopes to every API process"""
+
+    def __init__(self, client, channel: Optional[str] = None):
+        self.client = client
+        self.channel = channel or f"{REDIS_KEY_PREFIX}:events"
+        self.origin = uuid.uuid4().hex
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.published = 0
+        self.received = 0
+
+    async def start(self, handler: Handler):
+        """Subscribe and hand every envelope, including our own, to handler"""
+        if self._task is not None:
+            return
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        self._task = asyncio.create_task(self._run(handler), name="redis-event-bus")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            await self._pubsub.close()
+            self._pubsub = None
+
+    async def publish(self, envelope: Dict[str, Any]) -> int:
+        """Returns the number of subscribed processes"""
+        payload = json.dumps({**envelope, "origin": self.origin}, default=str)
+        self.published += 1
+        return await self.client.publish(self.channel, payload)
+
+    async def _run(self, handler: Handler):
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+                self.received += 1
+                await handler(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Event bus delivery failed: {e}")
+                await asyncio.sleep(0.5)
@@ -0,0 +1,121 @@
+"""
+Batched result ingestion into Postgres.
+
+Scraped records are buffered in a bounded queue and written with asyncpg's
+COPY (copy_records_to_table) in batches bounded by size and time. When the
+database lags the queue fills up and put() waits, so producers slow down
+instead of growing memory. flush() drains everything queued so far and is
+called when a job finishes.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESULT_BATCH_SIZE = int(os.getenv("RESULT_BATCH_SIZE", "500"))
+RESULT_FLUSH_INTERVAL = float(os.getenv("RESULT_FLUSH_INTERVAL", "1.0"))
+RESULT_MAX_PENDING = int(os.getenv("RESULT_MAX_PENDING", "10000"))
+
+RESULT_COLUMNS = ("job_id", "model", "data", "scraped_at")
+
+class ResultSink:
+    """Buffers result rows and COPYs them into scraping_results in batches"""
+
+    def __init__(self, pool, table: str = "scraping_results",
+                 columns: Sequence[str] = RESULT_COLUMNS,
+                 batch_size: int = RESULT_BATCH_SIZE,
+                 flush_interval: float = RESULT_FLUSH_INTERVAL,
+                 max_pending: int = RESULT_MAX_PENDING):
+        self.pool = pool
+        self.table = table
+        self.columns = tuple(columns)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        # A failed batch is retried ahead of anything still queued
+        self._retry: List[Tuple] = []
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.rows_written = 0
+        self.batches_written = 0
+        self.failed_batches = 0
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="result-sink")
+
+    async def stop(self):
+        # Let an in-flight COPY finish rather than cancelling it mid-batch
+        self._closed = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def put(self, job_id: str, model: str, data: Any, scraped_at: Optional[datetime] = None):
+        """Queue one result row; waits while the queue is full"""
+        record = (job_id, model, json.dumps(data, default=str), scraped_at or datetime.utcnow())
+        await self._queue.put(record)
+        if self._queue.qsize() >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        return self._queue.qsize() + len(self._retry)
+
+    async def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows written"""
+        written = 0
+        async with self._lock:
+            # Bounded by what is pending now, so busy producers can't keep us here
+            remaining = self.pending()
+            while remaining > 0 and (self._retry or not self._queue.empty()):
+                batch, self._retry = self._retry, []
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                try:
+                    await self._copy(batch)
+                except asyncio.CancelledError:
+                    self._retry = batch
+                    raise
+                except Exception:
+                    self.failed_batches += 1
+                    self._retry = batch
+                    raise
+                written += len(batch)
+                remaining -= len(batch)
+        return written
+
+    async def _copy(self, batch: List[Tuple]):
+        async with self.pool.acquire() as conn:
+            await conn.copy_records_to_table(self.table, records=batch, columns=self.columns)
+        self.rows_written += len(batch)
+        self.batches_written += 1
+
+    async def _run(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ Result flush failed, {self.pending()} rows pending: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending(),
+            "rows_written": self.rows_written,
+            "batches_written": self.batches_written,
+            "failed_batches": self.failed_batches,
+        }
@@ -0,0 +1,244 @@
+"""
+Incremental Google Sheets sync.
+
+SheetSync remembers what the sheet holds (row number and values per row key)
+and on every sync appends only new rows and rewrites only changed ones,
+grouped into batch_update requests, instead of clearing and rewriting the
+whole sheet. Calls are spaced to stay under the Sheets quota and retried with
+exponential backoff on 429/5xx. SheetSyncWorker runs syncs on a background
+thread and coalesces snapshots, so callers never block on Sheets.
+
+Works with a gspread Worksheet or anything with the same get_all_values,
+batch_update and append_rows methods.
+"""
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+SHEETS_CHUNK_ROWS = int(os.getenv("SHEETS_CHUNK_ROWS", "500"))
+# Sheets allows 60 write requests per minute per user by default
+SHEETS_MIN_INTERVAL = float(os.getenv("SHEETS_MIN_INTERVAL", "1.0"))
+SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "5"))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+Row = List[str]
+KeyFn = Callable[[Row], Any]
+
+def column_letter(index: int) -> str:
+    """1 -> A, 27 -> AA"""
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+def _cell(value: Any) -> str:
+    # Sheets hands every value back as a string; compare in that form
+    return "" if value is None else str(value)
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, "response", None)
+    code = getattr(response, "status_code", None) or getattr(error, "code", None)
+    return code if isinstance(code, int) else None
+
+class SheetSync:
+    """Diff-based writer for one worksheet whose first row is a header"""
+
+    def __init__(self, worksheet, header: Sequence[str], key: KeyFn,
+                 chunk_rows: int = SHEETS_CHUNK_ROWS, min_interval: float = SHEETS_MIN_INTERVAL,
+                 max_retries: int = SHEETS_MAX_RETRIES, sleep: Callable[[float], None] = time.sleep):
+        self.worksheet = worksheet
+        self.header = [_cell(h) for h in header]
+        self.key = key
+        self.chunk_rows = chunk_rows
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self._sleep = sleep
+        self._last_call = 0.0
+
+        # key -> (row number, values) as last written or read
+        self.rows: Dict[Any, Tuple[int, Row]] = {}
+        self.next_row = 2
+        self.loaded = False
+        self.requests = 0
+
+    # ==================== API CALLS ====================
+
+    def _call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Rate-limited call with exponential backoff on quota and server errors"""
+        for attempt in range(self.max_retries + 1):
+            wait = self._last_call + self.min_interval - time.monotonic()
+            if wait > 0:
+                self._sleep(wait)
+            self._last_call = time.monotonic()
+            self.requests += 1
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if _status_code(e) not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    raise
+                delay = min(64.0, 2 ** attempt) + random.uniform(0, 1)
+                logger.warning(f"⚠️ Sheets returned {_status_code(e)}, retrying in {delay:.1f}s")
+                self._sleep(delay)
+
+    def load(self):
+        """Read the sheet once to learn its current rows"""
+        values = self._call(self.worksheet.get_all_values)
+        self.rows.clear()
+        if not values or not any(values[0]):
+            header_range = f"A1:{column_letter(len(self.header))}1"
+            self._call(self.worksheet.batch_update, [{"range": header_range, "values": [self.header]}],
+                       value_input_option="RAW")
+            values = [self.header]
+        for number, row in enumerate(values[1:], start=2):
+            row = [_cell(v) for v in row] + [""] * (len(self.header) - len(row))
+            if any(row):
+                self.rows[self.key(row)] = (number, row[:len(self.header)])
+        self.next_row = len(values) + 1
+        self.loaded = True
+
+    # ==================== DIFF ====================
+
+    def diff(self, rows: Sequence[Sequence[Any]]) -> Tuple[List[Tuple[int, Row]], List[Row]]:
+        """(changed rows with their row numbers, new rows) against the last known state"""
+        latest: Dict[Any, Row] = {}
+        for row in rows:
+            row = [_cell(v) for v in row]
+            latest[self.key(row)] = row
+        updates, appends = [], []
+        for key, row in latest.items():
+            known = self.rows.get(key)
+            if known is None:
+                appends.append(row)
+            elif known[1] != row:
+                updates.append((known[0], row))
+        return sorted(updates), appends
+
+    def _ranges(self, updates: List[Tuple[int, Row]]) -> List[Dict[str, Any]]:
+        """Consecutive row numbers merged into one A1 range each"""
+        last_column = column_letter(len(self.header))
+        ranges, block = [], []
+        for number, row in updates:
+            if block and number != block[-1][0] + 1:
+                ranges.append(block)
+                block = []
+            block.append((number, row))
+        if block:
+            ranges.append(block)
+        return [
+            {"range": f"A{b[0][0]}:{last_column}{b[-1][0]}", "values": [row for _, row in b]}
+            for b in ranges
+        ]
+
+    # ==================== SYNC ====================
+
+    def sync(self, rows: Sequence[Sequence[Any]]) -> Dict[str, int]:
+        """Bring the sheet in line with rows; rows missing from the input are left alone"""
+        requests_before = self.requests
+        if not self.loaded:
+            self.load()
+        updates, appends = self.diff(rows)
+        keys = {self.key([_cell(v) for v in row]) for row in rows}
+
+        for start in range(0, len(updates), self.chunk_rows):
+            chunk = updates[start:start + self.chunk_rows]
+            # RAW: scraped text such as "=..." or "1-2" is stored as-is, not parsed as formulas or dates
+            self._call(self.worksheet.batch_update, self._ranges(chunk), value_input_option="RAW")
+            for number, row in chunk:
+                self.rows[self.key(row)] = (number, row)
+
+        for start in range(0, len(appends), self.chunk_rows):
+            chunk = appends[start:start + self.chunk_rows]
+            response = self._call(self.worksheet.append_rows, chunk, value_input_option="RAW",
+                                  table_range="A1")
+            first = self._appended_at(response)
+            for offset, row in enumerate(chunk):
+                self.rows[self.key(row)] = (first + offset, row)
+            self.next_row = first + len(chunk)
+
+        return {
+            "updated": len(updates),
+            "appended": len(appends),
+            "unchanged": len(keys) - len(updates) - len(appends),
+            "requests": self.requests - requests_before,
+        }
+
+    def _appended_at(self, response: Any) -> int:
+        """First row number of an append, from the API response when it says"""
+        updated_range = ((response or {}).get("updates") or {}).get("updatedRange", "") if isinstance(response, dict) else ""
+        match = re.search(r"![A-Z]+(\d+)", updated_range)
+        return int(match.group(1)) if match else self.next_row
+
+class SheetSyncWorker:
+    """Runs SheetSync on a background thread; only the newest snapshot is written"""
+
+    def __init__(self, open_sync: Callable[[], SheetSync], name: str = "sheets-sync"):
+        self._open_sync = open_sync
+        self._sync: Optional[SheetSync] = None
+        self._pending: Optional[List[Row]] = None
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+        self.syncs = 0
+        self.last_result: Optional[Dict[str, int]] = None
+        self.last_error: Optional[str] = None
+
+    def submit(self, rows: Sequence[Sequence[Any]]):
+        """Queue a full snapshot; a snapshot still waiting is replaced"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Sheet sync worker is stopped")
+            self._pending = [list(r) for r in rows]
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every submitted snapshot is written; False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Write what is pending, then end the thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    @property
+    def sheet(self) -> Optional[SheetSync]:
+        return self._sync
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                rows, self._pending, self._busy = self._pending, None, True
+            try:
+                if self._sync is None:
+                    self._sync = self._open_sync()
+                self.last_result = self._sync.sync(rows)
+                self.last_error = None
+                self.syncs += 1
+                logger.info(f"📄 Sheets sync: {self.last_result}")
+            except Exception as e:
+                self.last_error = str(e)
+                # Re-read the sheet next time; our view of it may be stale
+                if self._sync is not None:
+                    self._sync.loaded = False
+                logger.error(f"❌ Sheets sync failed: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
@@ -0,0 +1,77 @@
+"""
+Shared snapshot push loop.
+
+One producer per process builds a snapshot, encodes it once and broadcasts it
+to every subscribed connection, either on a fixed interval or as soon as
+notify() reports a state change. Per-connection polling loops are replaced by
+a single computation per tick.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from ..utils.fast_json import dumps
+from .broadcast import BroadcastHub, SYSTEM_TOPIC
+
+logger = logging.getLogger(__name__)
+
+class SnapshotPublisher:
+    """Builds a snapshot once per tick and pushes it to all connections"""
+
+    def __init__(self, hub: BroadcastHub, build: Callable[[], Dict[str, Any]],
+                 interval: float = 5.0, message_type: str = "progress_update",
+                 topic: Optional[str] = SYSTEM_TOPIC):
+        self.hub = hub
+        self.build = build
+        self.interval = interval
+        self.message_type = message_type
+        self.topic = topic
+        self.latest: Optional[Dict[str, Any]] = None
+        self.snapshots_built = 0
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def notify(self):
+        """State changed; push without waiting for the next tick"""
+        self._changed.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = self.build()
+        data["timestamp"] = datetime.now().isoformat()
+        self.latest = data
+        self.snapshots_built += 1
+        return data
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"snapshot-{self.message_type}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def publish(self) -> int:
+        if not self.hub.active_connections:
+            return 0
+        payload = dumps({"type": self.message_type, "data": self.snapshot()})
+        # Keyed so a lagging client only ever holds the newest snapshot
+        return await self.hub.broadcast(payload, key=self.message_type, topic=self.topic)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            try:
+                await self.publish()
+            except Exception as e:
+                logger.error(f"Error publishing {self.message_type} snapshot: {e}")
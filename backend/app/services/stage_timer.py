@@ -0,0 +1,86 @@
+"""
+Per-stage timings for a single scrape and percentile summaries per job.
+
+A StageTimer lives for one record. lap() charges the time since the previous
+lap to a stage, which lets a long sequential scrape be instrumented without
+restructuring it; stage() and wrap() time a nested piece (such as image
+probing inside the image stages) without affecting the laps. Every timing is
+also observed into the mk_scrape_stage_seconds histogram.
+
+Records carry their timings as {stage: milliseconds} plus "total"; jobs
+summarize them with summarize_timings().
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .metrics import SCRAPE_STAGE_SECONDS
+
+class StageTimer:
+    """Accumulated wall-clock seconds per named stage"""
+
+    def __init__(self, observe: bool = True):
+        self.observe = observe
+        self.stages: Dict[str, float] = {}
+        self._started = self._last = time.perf_counter()
+
+    def add(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        if self.observe:
+            SCRAPE_STAGE_SECONDS.labels(stage=name).observe(seconds)
+
+    def lap(self, name: str):
+        """Charge the time since the previous lap (or creation) to name"""
+        now = time.perf_counter()
+        self.add(name, now - self._last)
+        self._last = now
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def wrap(self, name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """fn, with every call timed as stage name"""
+        def timed(*args, **kwargs):
+            with self.stage(name):
+                return fn(*args, **kwargs)
+        return timed
+
+    def as_dict(self) -> Dict[str, float]:
+        """Milliseconds per stage, plus the total since the timer was created"""
+        timings = {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+        timings["total"] = round((time.perf_counter() - self._started) * 1000, 1)
+        return timings
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    index = max(0, math.ceil(q / 100 * len(values)) - 1)
+    return values[min(index, len(values) - 1)]
+
+def summarize_timings(records: Iterable[Optional[Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """count/p50/p95/max in milliseconds per stage across a job's records"""
+    samples: Dict[str, List[float]] = {}
+    for timings in records:
+        for name, ms in (timings or {}).items():
+            samples.setdefault(name, []).append(ms)
+    summary = {}
+    for name, values in samples.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": values[-1],
+        }
+    return summary
+
+def format_summary(summary: Dict[str, Dict[str, float]]) -> str:
+    """One log line, most expensive stage (by p95) first"""
+    ordered = sorted(summary.items(), key=lambda item: item[1]["p95"], reverse=True)
+    return ", ".join(f"{name} p50={s['p50']:.0f}ms p95={s['p95']:.0f}ms" for name, s in ordered)
@@ -0,0 +1,43 @@
+"""
+Blob compression with the codec recorded alongside the data.
+
+zstd is used when the zstandard package is installed and zlib otherwise;
+decompress() accepts either, so blobs written on one host read back on any
+other that has the codec they were written with.
+"""
+
+import os
+import zlib
+from typing import Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional; zlib keeps everything working without it
+    zstandard = None
+
+ZSTD_LEVEL = int(os.getenv("HTML_ZSTD_LEVEL", "10"))
+ZLIB_LEVEL = 6
+
+def default_codec() -> str:
+    return "zstd" if zstandard is not None else "zlib"
+
+def compress(data: bytes, codec: str = None) -> Tuple[str, bytes]:
+    """(codec, compressed bytes)"""
+    codec = codec or default_codec()
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression needs the zstandard package")
+        # Compressor objects are not thread-safe; they are cheap to create
+        return codec, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if codec == "zlib":
+        return codec, zlib.compress(data, ZLIB_LEVEL)
+    raise ValueError(f"Unknown codec: {codec}")
+
+def decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
@@ -0,0 +1,117 @@
+"""
+Excel output from a DataFrame in one pass.
+
+Column widths are computed from the DataFrame with vectorized string lengths
+before anything is written, and column formats and row heights are declared
+up front, so the workbook never has to be walked cell by cell or reopened
+after it is saved. xlsxwriter is used when installed; otherwise openpyxl's
+write-only mode streams rows with their styles attached.
+
+Formats use xlsxwriter's format properties; the openpyxl path understands
+the subset in OPENPYXL_FORMAT_KEYS.
+"""
+
+from typing import Any, Dict, List, Optional
+
+try:
+    import xlsxwriter
+except ImportError:  # optional; openpyxl is the fallback writer
+    xlsxwriter = None
+
+MAX_COLUMN_WIDTH = 50
+WIDTH_PADDING = 2
+
+OPENPYXL_FORMAT_KEYS = {"text_wrap", "valign", "align", "bold", "num_format"}
+
+def excel_engine() -> str:
+    return "xlsxwriter" if xlsxwriter is not None else "openpyxl"
+
+def column_widths(df, padding: int = WIDTH_PADDING, max_width: int = MAX_COLUMN_WIDTH) -> List[int]:
+    """Width per column: longest of header and values as text, padded and capped"""
+    # astype("string") keeps missing values as <NA>, which str.len() skips
+    longest = df.astype("string").apply(lambda s: s.str.len().max()).fillna(0) if len(df) else None
+    widths = []
+    for i, column in enumerate(df.columns):
+        length = max(len(str(column)), int(longest.iloc[i]) if longest is not None else 0)
+        widths.append(min(length + padding, max_width))
+    return widths
+
+def write_excel(df, path: str, sheet_name: str = "Sheet1", formats: Optional[Dict[str, Dict[str, Any]]] = None,
+                row_height: Optional[float] = None, max_width: int = MAX_COLUMN_WIDTH):
+    """
+    Write df to path with autosized columns. formats maps column names to
+    format properties applied to that column's data cells, e.g.
+    {"Description": {"text_wrap": True}}; row_height sets every row's height.
+    """
+    widths = column_widths(df, max_width=max_width)
+    formats = formats or {}
+    if xlsxwriter is not None:
+        _write_xlsxwriter(df, path, sheet_name, widths, formats, row_height)
+    else:
+        _write_openpyxl(df, path, sheet_name, widths, formats, row_height)
+
+def _write_xlsxwriter(df, path, sheet_name, widths, formats, row_height):
+    import pandas as pd
+
+    # Product URLs stay plain strings; as hyperlinks they hit Excel's per-sheet link limit
+    with pd.ExcelWriter(path, engine="xlsxwriter", engine_kwargs={"options": {"strings_to_urls": False}}) as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+        book, worksheet = writer.book, writer.sheets[sheet_name]
+        # Column settings are stored and emitted when the file is closed
+        for i, column in enumerate(df.columns):
+            fmt = book.add_format(formats[column]) if column in formats else None
+            worksheet.set_column(i, i, widths[i], fmt)
+        if row_height:
+            worksheet.set_default_row(row_height)
+
+def _openpyxl_style(properties: Dict[str, Any]) -> Dict[str, Any]:
+    from openpyxl.styles import Alignment, Font
+
+    style: Dict[str, Any] = {}
+    if any(k in properties for k in ("text_wrap", "valign", "align")):
+        style["alignment"] = Alignment(wrap_text=properties.get("text_wrap"), vertical=properties.get("valign"),
+                                       horizontal=properties.get("align"))
+    if properties.get("bold"):
+        style["font"] = Font(bold=True)
+    if "num_format" in properties:
+        style["number_format"] = properties["num_format"]
+    return style
+
+def _write_openpyxl(df, path, sheet_name, widths, formats, row_height):
+    import pandas as pd
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    # Write-only sheets take dimensions before the first row
+    for i, width in enumerate(widths, start=1):
+        worksheet.column_dimensions[get_column_letter(i)].width = width
+    if row_height:
+        worksheet.sheet_format.defaultRowHeight = row_height
+        worksheet.sheet_format.customHeight = True
+
+    header_font = Font(bold=True)
+    header = []
+    for column in df.columns:
+        cell = WriteOnlyCell(worksheet, value=str(column))
+        cell.font = header_font
+        header.append(cell)
+    worksheet.append(header)
+
+    styles = {i: _openpyxl_style(formats[c]) for i, c in enumerate(df.columns) if c in formats}
+    for values in df.itertuples(index=False, name=None):
+        row = []
+        for i, value in enumerate(values):
+            if value is not None and not isinstance(value, (list, dict)) and pd.isna(value):
+                value = None
+            if i in styles:
+                cell = WriteOnlyCell(worksheet, value=value)
+                for attr, style in styles[i].items():
+                    setattr(cell, attr, style)
+                value = cell
+            row.append(value)
+        worksheet.append(row)
+    workbook.save(path)
@@ -0,0 +1,70 @@
+"""
+Fast JSON encoding for responses and WebSocket messages.
+
+orjson is used when installed (several times faster than json.dumps on large
+job payloads, and it writes UTF-8 bytes directly); otherwise the stdlib
+encoder produces the same compact output. Both handle datetimes, enums,
+UUIDs and pydantic models, and fall back to str() for anything else, the way
+the rest of the backend calls json.dumps(..., default=str).
+
+FastJSONResponse is meant as an app's default_response_class. Endpoints that
+return a payload they built themselves (job results, downloads) should return
+FastJSONResponse(content) directly, which also skips FastAPI's
+jsonable_encoder walk over the whole payload.
+"""
+
+import datetime
+import enum
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is the fallback
+    orjson = None
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the stdlib encoder accepts
+            pass
+    return _stdlib_dumps(obj)
+
+def dumps_str(obj: Any) -> str:
+    """dumps() as text, for WebSocket text frames"""
+    return dumps(obj).decode("utf-8")
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_engine() -> str:
+    return "orjson" if orjson is not None else "json"
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
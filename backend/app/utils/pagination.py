@@ -0,0 +1,47 @@
+"""
+Keyset pagination and field projection helpers.
+
+Listings are ordered newest first by (created_at, id). The cursor is the key of
+the last row on a page, so fetching the next page is an index range scan that
+costs the same at any depth, unlike OFFSET.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+def encode_cursor(created_at: Any, row_id: Any) -> str:
+    """Opaque cursor for the row at (created_at, id)"""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, as_datetime: bool = True) -> Tuple[Any, Any]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        if as_datetime:
+            created_at = datetime.fromisoformat(created_at)
+        return created_at, row_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], default: Iterable[str]) -> List[str]:
+    """Turn a comma-separated fields= value into a list of known field names"""
+    allowed = list(allowed)
+    if not fields:
+        return [f for f in allowed if f in set(default)]
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def project(record: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    """Pick fields from a dict or attribute object"""
+    if isinstance(record, dict):
+        return {f: record.get(f) for f in fields}
+    return {f: getattr(record, f, None) for f in fields}
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Response encoding benchmark on representative job payloads.
+
+Builds job documents shaped like main_backup's completed jobs (per-model
+product data with descriptions, spec tables and image lists) at several
+sizes and reports, per size:
+
+    encode      starlette JSONResponse vs FastJSONResponse rendering, and the
+                full FastAPI path for a returned dict (jsonable_encoder first)
+    compress    gzip and brotli (when installed) time and compressed size
+    broadcast   one job_update sent to --connections sockets: encoded per
+                socket (send_json) vs encoded once and shared
+
+    cd backend
+    python -m benchmarks.encoding
+    python -m benchmarks.encoding --models 100 1000 5000 --connections 50 --output encoding.json
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core import middleware
+from app.utils.fast_json import FastJSONResponse, dumps_str, json_engine
+
+def job_payload(models: int) -> Dict:
+    """A completed job with `models` scraped products"""
+    data = {}
+    for i in range(models):
+        model = f"MDL-{i:05d}"
+        data[model] = {
+            "title": f"Commercial Gas Fryer {model} - 40 lb Capacity, Stainless Steel",
+            "price": round(1000 + i * 1.37, 2),
+            "main_image": f"https://www.katom.com/images/{model}/main.jpg",
+            "additional_images": [f"https://www.katom.com/images/{model}/{n}.jpg" for n in range(5)],
+            "description": "<p>" + " ".join(["Heavy-duty fryer with millivolt controls and a cool zone."] * 12) + "</p>",
+            "specs": {f"Spec {n}": f"{n * 3} in." for n in range(15)},
+            "weight": f"{80 + i % 40} lbs",
+            "in_stock": i % 7 != 0,
+            "url": f"https://www.katom.com/{model}.html",
+        }
+    failed = [{"model": f"MISSING-{i}", "error": "Product not found"} for i in range(max(1, models // 20))]
+    return {
+        "id": "job_20240101_000000_abcdef12",
+        "name": "Benchmark job",
+        "models": list(data) + [f["model"] for f in failed],
+        "prefix": "",
+        "status": "completed",
+        "progress": 100,
+        "created_at": "2024-01-01T00:00:00",
+        "completed_at": "2024-01-01T00:42:00",
+        "results": {"successful": list(data), "failed": failed, "data": data},
+        "error": None,
+        "total_models": models + len(failed),
+    }
+
+def timed(fn: Callable[[], object], repeat: int) -> Dict:
+    """Median and best wall time in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": round(statistics.median(samples), 3), "best_ms": round(min(samples), 3)}
+
+def bench_encode(job: Dict, repeat: int) -> Dict:
+    stdlib = timed(lambda: JSONResponse(job), repeat)
+    fast = timed(lambda: FastJSONResponse(job), repeat)
+    return {
+        "bytes": len(FastJSONResponse(job).body),
+        "starlette_json": stdlib,
+        "fast_json": fast,
+        "speedup": round(stdlib["median_ms"] / fast["median_ms"], 2),
+        # What a plain `return job` costs with and without the fast default class
+        "returned_dict_stdlib": timed(lambda: JSONResponse(jsonable_encoder(job)), repeat),
+        "returned_dict_fast": timed(lambda: FastJSONResponse(jsonable_encoder(job)), repeat),
+    }
+
+def bench_compress(body: bytes, repeat: int) -> Dict:
+    codecs = {"gzip": lambda: gzip.compress(body, middleware.RESPONSE_GZIP_LEVEL)}
+    if middleware.brotli is not None:
+        codecs["br"] = lambda: middleware.brotli.compress(body, quality=middleware.RESPONSE_BROTLI_QUALITY)
+    report = {}
+    for name, compress in codecs.items():
+        size = len(compress())
+        report[name] = {**timed(compress, repeat), "bytes": size, "ratio": round(len(body) / size, 2)}
+    return report
+
+def bench_broadcast(job: Dict, connections: int, repeat: int) -> Dict:
+    message = {"type": "job_update", "job": job, "timestamp": "2024-01-01T00:42:00"}
+    # send_json runs json.dumps for every socket it is called on
+    per_socket = timed(lambda: [json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+                                for _ in range(connections)], repeat)
+    once = timed(lambda: [dumps_str(message)] * connections, repeat)
+    return {
+        "connections": connections,
+        "encode_per_socket": per_socket,
+        "encode_once": once,
+        "speedup": round(per_socket["median_ms"] / once["median_ms"], 2),
+    }
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding and compression of job payloads")
+    parser.add_argument("--models", type=int, nargs="+", default=[100, 1000, 5000],
+                        help="Job sizes in scraped models")
+    parser.add_argument("--connections", type=int, default=20, help="WebSocket clients for the broadcast case")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    sizes = {}
+    for models in args.models:
+        print(f"Benchmarking {models} models...", file=sys.stderr)
+        job = job_payload(models)
+        body = FastJSONResponse(job).body
+        sizes[str(models)] = {
+            "encode": bench_encode(job, args.repeat),
+            "compress": bench_compress(body, args.repeat),
+            "broadcast": bench_broadcast(job, args.connections, args.repeat),
+        }
+
+    report = {
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "json_engine": json_engine(),
+        "encodings": list(middleware.available_encodings()),
+        "sizes": sizes,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for katom.com used by the scrape benchmarks.
+
+Serves KaTom-style product pages at /<prefix>-<MODEL>.html, a 404 page for
+unknown products, and PNG images of a requested size at
+/images/<name>-<W>x<H>.png, each with configurable latency. Pages come from a
+directory of saved pages (named like the URL, e.g. "bench-ABC123.html") or,
+without one, are generated per model. Generated models starting with
+MISSING return 404.
+
+    cd backend
+    python -m benchmarks.fixture_server --port 8765 --latency-ms 300
+    KATOM_BASE_URL=http://127.0.0.1:8765 python -m benchmarks.scrape ...
+"""
+
+import argparse
+import os
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+PAGE_RE = re.compile(r"^/(?P<slug>[^/]+)\.html$")
+IMAGE_RE = re.compile(r"^/images/(?P<name>[\w-]+?)-(?P<w>\d+)x(?P<h>\d+)\.png$")
+
+NOT_FOUND_PAGE = (
+    "<!DOCTYPE html><html><head><title>404 Not Found | KaTom Restaurant Supply</title></head>"
+    "<body><h2>Sorry, we couldn't find that page.</h2></body></html>"
+)
+
+@lru_cache(maxsize=64)
+def png_bytes(width: int, height: int) -> bytes:
+    """A flat grey RGB PNG of the given size"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = (b"\x00" + b"\x80\x80\x80" * width) * height
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows, 9))
+        + chunk(b"IEND", b"")
+    )
+
+def product_page(slug: str, page_kb: int = 200) -> str:
+    """A generated product page using the markup the scrapers select on"""
+    model = slug.split("-", 1)[-1]
+    rng = random.Random(slug)
+    price = f"{rng.randint(100, 9999):,}.{rng.randint(0, 99):02d}"
+    specs = [("Manufacturer", "Bench Co"), ("Voltage", f"{rng.choice([115, 208, 240])}v"),
+             ("Phase", "1"), ("Weight", f"{rng.randint(20, 400)} lbs"), ("Sku", model)]
+    specs += [(f"Feature {i}", f"Value {rng.randint(1, 999)}") for i in range(15)]
+    spec_rows = "".join(f"<tr><td>{k}</td><td>{v}</td></tr>" for k, v in specs)
+    thumbs = "".join(
+        f'<img class="thumb-image" src="/images/{model}-{i}-{size}x{size}.png">'
+        for i, size in enumerate([800, 600, 150, 1000], start=1)
+    )
+    paragraphs = "".join(
+        f"<p>{model} paragraph {i}: commercial grade, {rng.randint(1, 99)}&frac12; in. wide, built for "
+        f"high-volume kitchens.</p>" for i in range(4)
+    )
+    body = f"""<!DOCTYPE html>
+<html><head><title>{model} | KaTom Restaurant Supply</title>
+<meta name="description" content="{model}"></head>
+<body>
+<header><nav>{"".join(f'<a href="/c/{i}">Category {i}</a>' for i in range(40))}</nav></header>
+<main>
+<h1 class="product-name mb-0">Bench Co {model} Commercial Fryer</h1>
+<p class="product-price-text m-0"><span class="price-now">${price}</span></p>
+<div class="product-img main-image"><img src="/images/{model}-main-800x800.png" itemprop="image"></div>
+<div class="additional-images">{thumbs}</div>
+<div class="tab-content">{paragraphs}<p>*Free shipping on this item</p><p>Watch the video below</p></div>
+<table class="table table-condensed specs-table"><tbody>{spec_rows}</tbody></table>
+<video><source src="/videos/{model}.mp4" type="video/mp4"></video>
+</main>
+"""
+    # Real pages are mostly scripts and tracking markup; pad to a realistic size
+    filler = "<script>window.__STATE__ = " + "{\"k\": \"" + "x" * 1000 + "\"}" + ";</script>\n"
+    padding = filler * max(0, -(-(page_kb * 1024 - len(body)) // len(filler)))
+    return body + padding + "</body></html>"
+
+class FixtureServer:
+    """Threaded HTTP server for product pages, 404s and images"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, page_latency: float = 0.0,
+                 image_latency: float = 0.0, jitter: float = 0.0, corpus_dir: Optional[str] = None,
+                 page_kb: int = 200, seed: int = 0):
+        self.page_latency = page_latency
+        self.image_latency = image_latency
+        self.jitter = jitter
+        self.corpus_dir = corpus_dir
+        self.page_kb = page_kb
+        self.requests: Dict[str, int] = {"page": 0, "not_found": 0, "image": 0, "other": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve in the calling thread until interrupted"""
+        try:
+            self._httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self.requests)
+        return {
+            "base_url": self.base_url,
+            "page_latency_ms": self.page_latency * 1000,
+            "image_latency_ms": self.image_latency * 1000,
+            "jitter_ms": self.jitter * 1000,
+            "corpus_dir": self.corpus_dir,
+            "page_kb": self.page_kb,
+            "requests": counts,
+        }
+
+    def _delay(self, base: float):
+        with self._lock:
+            offset = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        if base + offset > 0:
+            time.sleep(base + offset)
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def _page(self, slug: str) -> Optional[str]:
+        if self.corpus_dir:
+            for name in (f"{slug}.html", f"{slug.lower()}.html"):
+                path = os.path.join(self.corpus_dir, name)
+                if os.path.isfile(path):
+                    with open(path, encoding="utf-8", errors="replace") as f:
+                        return f.read()
+            return None
+        if slug.split("-", 1)[-1].upper().startswith("MISSING"):
+            return None
+        return product_page(slug, self.page_kb)
+
+    def resolve(self, path: str) -> Tuple[int, str, bytes, float]:
+        """(status, content type, body, latency) for a request path"""
+        path = path.split("?", 1)[0]
+        image = IMAGE_RE.match(path)
+        if image:
+            self._count("image")
+            return 200, "image/png", png_bytes(int(image["w"]), int(image["h"])), self.image_latency
+        page = PAGE_RE.match(path)
+        html = self._page(page["slug"]) if page else None
+        if html is None:
+            self._count("not_found" if page else "other")
+            return 404, "text/html; charset=utf-8", NOT_FOUND_PAGE.encode(), self.page_latency
+        self._count("page")
+        return 200, "text/html; charset=utf-8", html.encode(), self.page_latency
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, content_type, body, latency = server.resolve(self.path)
+                server._delay(latency)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Serve KaTom-style fixture pages locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay before each page or 404")
+    parser.add_argument("--image-latency-ms", type=float, default=0, help="Delay before each image")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Uniform +/- jitter on every delay")
+    parser.add_argument("--corpus", help="Directory of saved pages named <prefix>-<MODEL>.html")
+    parser.add_argument("--page-kb", type=int, default=200, help="Approximate size of generated pages")
+    args = parser.parse_args(argv)
+
+    server = FixtureServer(args.host, args.port, args.latency_ms / 1000, args.image_latency_ms / 1000,
+                           args.jitter_ms / 1000, args.corpus, args.page_kb)
+    print(f"Serving fixtures on {server.base_url}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
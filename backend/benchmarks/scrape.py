@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Offline scrape throughput benchmark.
+
+Starts a local fixture server (benchmarks/fixture_server.py) and scrapes the
+same model list once per mode, each in a fresh interpreter pointed at the
+server through KATOM_BASE_URL, so nothing touches katom.com and modes do not
+share caches or memory. Reports models/minute, per-model latency p50/p95,
+CPU time and peak RSS (the scraper process plus its browsers) per mode, and
+per-stage timings from the scraper itself.
+
+Modes:
+    per_model_driver  scrape_katom, a new Chrome per model, one at a time
+    pooled_drivers    scrape_katom on --workers long-lived Chrome instances
+    http_first        scrape_katom_http: plain HTTP, browser only as a fallback
+    concurrent        scrape_katom, a new Chrome per model, --workers at a time
+
+    cd backend
+    python -m benchmarks.scrape --models 40 --latency-ms 300 --output scrape.json
+    python -m benchmarks.scrape http_first --baseline scrape.json
+
+With --baseline, modes whose throughput dropped or whose p95 rose by more
+than --tolerance are listed under "regressions" and the exit status is 1.
+"""
+
+import argparse
+import json
+import os
+import queue
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from app.services.stage_timer import percentile, summarize_timings
+from benchmarks.fixture_server import FixtureServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = ["per_model_driver", "pooled_drivers", "http_first", "concurrent"]
+
+# ==================== RESOURCE SAMPLING ====================
+
+def _proc_children() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name can contain spaces; fields resume after ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+def _proc_usage(pid: int) -> Optional[tuple]:
+    """(cpu seconds, rss bytes) for one process"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+    return cpu, rss
+
+class TreeSampler:
+    """Peak RSS and CPU time of this process and every descendant (Linux /proc)"""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.available = os.path.isdir("/proc/self")
+        self.peak_rss = 0
+        self._cpu: Dict[int, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self):
+        children = _proc_children()
+        pending, total_rss = [os.getpid()], 0
+        while pending:
+            pid = pending.pop()
+            pending.extend(children.get(pid, ()))
+            usage = _proc_usage(pid)
+            if usage:
+                # Exited browsers keep the last CPU time we saw for them
+                self._cpu[pid] = max(self._cpu.get(pid, 0.0), usage[0])
+                total_rss += usage[1]
+        self.peak_rss = max(self.peak_rss, total_rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self._baseline = 0.0
+        if self.available:
+            self.sample()
+            self._baseline = sum(self._cpu.values())
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> Dict:
+        if not self.available:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            children = resource.getrusage(resource.RUSAGE_CHILDREN)
+            # ru_maxrss is KiB on Linux and is only a lower bound for the tree
+            return {
+                "cpu_s": round(usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime, 3),
+                "peak_rss_mb": round(max(usage.ru_maxrss, children.ru_maxrss) / 1024, 1),
+            }
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        return {
+            "cpu_s": round(sum(self._cpu.values()) - self._baseline, 3),
+            "peak_rss_mb": round(self.peak_rss / 2**20, 1),
+        }
+
+# ==================== MODES (child process) ====================
+
+def _runner(mode: str, scraper, workers: int):
+    """(scrape(model) function, worker count, setup seconds, cleanup)"""
+    if mode == "per_model_driver":
+        return scraper.scrape_katom, 1, 0.0, lambda: None
+    if mode == "concurrent":
+        return scraper.scrape_katom, workers, 0.0, lambda: None
+    if mode == "http_first":
+        return scraper.scrape_katom_http, 1, 0.0, lambda: None
+    if mode == "pooled_drivers":
+        start = time.perf_counter()
+        drivers = [scraper.create_driver() for _ in range(workers)]
+        setup_s = time.perf_counter() - start
+        pool: "queue.Queue" = queue.Queue()
+        for driver in drivers:
+            pool.put(driver)
+
+        def scrape(model, prefix):
+            driver = pool.get()
+            try:
+                return scraper.scrape_katom(model, prefix, driver=driver)
+            finally:
+                pool.put(driver)
+
+        def cleanup():
+            for driver in drivers:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+
+        return scrape, workers, setup_s, cleanup
+    raise ValueError(f"Unknown mode: {mode}")
+
+def run_mode(mode: str, models: List[str], prefix: str, workers: int) -> Dict:
+    """Runs inside the child interpreter"""
+    from scraper_wrapper import KatomScraper
+
+    scraper = KatomScraper()
+    sampler = TreeSampler()
+    sampler.start()
+    start = time.perf_counter()
+    scrape, workers, setup_s, cleanup = _runner(mode, scraper, workers)
+
+    def one(model: str) -> Dict:
+        began = time.perf_counter()
+        try:
+            result = scrape(model, prefix)
+        except Exception as e:
+            result = {"found": False, "error": str(e), "timings": {}}
+        result["latency_s"] = time.perf_counter() - began
+        return result
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(one, models))
+    finally:
+        cleanup()
+    wall_s = time.perf_counter() - start
+    usage = sampler.stop()
+
+    latencies = sorted(r["latency_s"] for r in results)
+    return {
+        "workers": workers,
+        "models": len(models),
+        "found": sum(1 for r in results if r.get("found")),
+        "not_found": sum(1 for r in results if r.get("error") == "Product not found"),
+        "errors": sum(1 for r in results if r.get("error") and r.get("error") != "Product not found"),
+        "wall_s": round(wall_s, 3),
+        "setup_s": round(setup_s, 3),
+        "models_per_minute": round(len(models) / wall_s * 60, 2) if wall_s else None,
+        "latency_p50_s": round(percentile(latencies, 50), 3) if latencies else None,
+        "latency_p95_s": round(percentile(latencies, 95), 3) if latencies else None,
+        **usage,
+        "stages": summarize_timings(r.get("timings") for r in results),
+    }
+
+def run_mode_subprocess(mode: str, models: List[str], prefix: str, workers: int,
+                        base_url: str, timeout: float) -> Dict:
+    cmd = [sys.executable, "-m", "benchmarks.scrape", "--child", mode, "--prefix", prefix,
+           "--workers", str(workers), "--model-list", ",".join(models)]
+    env = {**os.environ, "KATOM_BASE_URL": base_url}
+    try:
+        proc = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout:.0f}s"}
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else "failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+# ==================== REPORT ====================
+
+def model_list(count: int, missing_every: int) -> List[str]:
+    """BENCH0001... with every missing_every-th model a 404"""
+    return [
+        f"MISSING{i:04d}" if missing_every and i % missing_every == 0 else f"BENCH{i:04d}"
+        for i in range(1, count + 1)
+    ]
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """Modes that got slower than the baseline by more than tolerance"""
+    regressions = []
+    for mode, current in report["modes"].items():
+        previous = baseline.get("modes", {}).get(mode)
+        if not previous or "error" in current or "error" in previous:
+            continue
+        checks = [
+            ("models_per_minute", lambda old, new: new < old * (1 - tolerance)),
+            ("latency_p95_s", lambda old, new: new > old * (1 + tolerance)),
+        ]
+        for metric, worse in checks:
+            old, new = previous.get(metric), current.get(metric)
+            if old and new is not None and worse(old, new):
+                regressions.append({"mode": mode, "metric": metric, "baseline": old, "current": new,
+                                    "change_pct": round((new - old) / old * 100, 1)})
+    return regressions
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark scraping modes against a local fixture server")
+    parser.add_argument("modes", nargs="*", default=MODES, help=f"Any of {', '.join(MODES)}")
+    parser.add_argument("--models", type=int, default=20, help="Number of models to scrape per mode")
+    parser.add_argument("--missing-every", type=int, default=10, help="Every Nth model is a 404 (0 = none)")
+    parser.add_argument("--prefix", default="bench")
+    parser.add_argument("--workers", type=int, default=4, help="Drivers/threads for pooled and concurrent modes")
+    parser.add_argument("--latency-ms", type=float, default=200, help="Fixture server page latency")
+    parser.add_argument("--image-latency-ms", type=float, default=50, help="Fixture server image latency")
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--page-kb", type=int, default=200, help="Size of generated pages")
+    parser.add_argument("--corpus", help="Serve saved pages from this directory instead of generated ones")
+    parser.add_argument("--timeout", type=float, default=1800, help="Per-mode timeout in seconds")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed slowdown vs. baseline (0.10 = 10%%)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--model-list", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        # Keep the scraper's own output off stdout, which carries the result
+        sys.stdout, real_stdout = sys.stderr, sys.stdout
+        result = run_mode(args.child, args.model_list.split(","), args.prefix, args.workers)
+        real_stdout.write(json.dumps(result) + "\n")
+        return 0
+
+    unknown = [m for m in args.modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+
+    models = model_list(args.models, args.missing_every)
+    server = FixtureServer(page_latency=args.latency_ms / 1000, image_latency=args.image_latency_ms / 1000,
+                           jitter=args.jitter_ms / 1000, corpus_dir=args.corpus, page_kb=args.page_kb)
+    with server:
+        modes = {}
+        for mode in args.modes:
+            print(f"Running {mode}...", file=sys.stderr)
+            modes[mode] = run_mode_subprocess(mode, models, args.prefix, args.workers,
+                                              server.base_url, args.timeout)
+        server_stats = server.stats()
+
+    report = {
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cpu_count": os.cpu_count(),
+        "server": server_stats,
+        "models": len(models),
+        "modes": modes,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 1 if report.get("regressions") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
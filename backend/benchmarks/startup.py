@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the FastAPI backends.
+
+Each target is measured in a fresh interpreter so nothing is cached between
+runs. Reports import time, lifespan startup time, first-request latency and
+which heavy scraper dependencies ended up loaded.
+
+    cd backend
+    python -m benchmarks.startup                      # default targets
+    python -m benchmarks.startup main_fixed app.main  # specific modules
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = ["main", "main_fixed", "main_backup", "main_stable", "app.main"]
+
+# Modules that should only be imported when a scrape actually runs
+HEAVY_MODULES = ["PyQt5", "selenium", "pandas", "gspread", "PIL", "openpyxl"]
+
+def _measure(module_name: str, path: str) -> Dict:
+    """Runs inside the child interpreter"""
+    import importlib
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    import_s = time.perf_counter() - start
+    app = module.app
+
+    from starlette.testclient import TestClient
+
+    start = time.perf_counter()
+    with TestClient(app) as client:
+        startup_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = client.get(path)
+        first_request_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        client.get(path)
+        warm_request_s = time.perf_counter() - start
+
+    return {
+        "import_s": round(import_s, 4),
+        "startup_s": round(startup_s, 4),
+        "first_request_s": round(first_request_s, 4),
+        "warm_request_s": round(warm_request_s, 4),
+        "status_code": response.status_code,
+        "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+    }
+
+def run_target(module_name: str, path: str = "/", timeout: float = 120) -> Dict:
+    """Measure one target in a fresh subprocess"""
+    cmd = [sys.executable, "-m", "benchmarks.startup", "--child", module_name, "--path", path]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=BACKEND_DIR, capture_output=True, text=True, timeout=timeout)
+    wall_s = time.perf_counter() - start
+
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed",
+                "wall_s": round(wall_s, 4)}
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["wall_s"] = round(wall_s, 4)
+    return result
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure backend cold-start latency")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--path", default="/", help="Path for the first request")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if args.child:
+        sys.path.insert(0, BACKEND_DIR)
+        # Keep the app's own log output off stdout, which carries the result
+        sys.stdout, real_stdout = sys.stderr, sys.stdout
+        result = _measure(args.child, args.path)
+        real_stdout.write(json.dumps(result) + "\n")
+        return
+
+    report = {
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "targets": {target: run_target(target, args.path) for target in args.targets},
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
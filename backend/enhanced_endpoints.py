@@ -73,7 +73,7 @@ async def get_progress():
     # 3. Number of HTML files
     
     file_count = len([f for f in os.listdir(".") if f.endswith(('.py', '.html', '.js'))])
-    job_count = len([j for j in jobs_db if j.get("status") == "completed"])
+    job_count = jobs_db.count("completed")
     
     # Rough calculation
     completed_tasks = min(total_tasks, file_count + (job_count * 5))
@@ -1,13 +1,23 @@
 # backend/jobs.py
-from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Response
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import Awaitable, Callable, List, Dict, Optional
 from datetime import datetime
 import asyncio
+import logging
 import uuid
 from enum import Enum
 
-router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+from app.services.job_store import JobStore
+from app.services.result_sink import ResultSink
+from app.utils.pagination import decode_cursor, encode_cursor, parse_fields, project
+from app.services.metrics import JOBS_COMPLETED, JOBS_CREATED, JOBS_FAILED
+from app.utils.fast_json import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Job results can run to megabytes; FastJSONResponse encodes them with orjson
+router = APIRouter(prefix="/api/jobs", tags=["jobs"], default_response_class=FastJSONResponse)
 
 # Job Status Enum
 class JobStatus(str, Enum):
@@ -39,12 +49,30 @@ class Job(BaseModel):
     results: Optional[Dict] = None
     error: Optional[str] = None
 
+# Listings leave out heavy payloads unless asked for with fields=
+JOB_FIELDS = list(Job.model_fields)
+DEFAULT_JOB_FIELDS = [f for f in JOB_FIELDS if f != "results"]
+
 # In-memory job storage
-jobs_store: Dict[str, Job] = {}
+jobs_store = JobStore()
 
 # WebSocket connections
 active_connections = []
 
+# Optional Postgres persistence, wired up by main_with_db's lifespan
+result_sink: Optional[ResultSink] = None
+job_writer: Optional[Callable[[Job], Awaitable[None]]] = None
+
+def configure_persistence(sink: Optional[ResultSink], save_job: Optional[Callable[[Job], Awaitable[None]]]):
+    """Route per-model results into a batched sink and job rows into save_job"""
+    global result_sink, job_writer
+    result_sink = sink
+    job_writer = save_job
+
+async def _save_job(job: Job):
+    if job_writer is not None:
+        await job_writer(job)
+
 @router.post("/", response_model=Job)
 async def create_job(job_data: JobCreate, background_tasks: BackgroundTasks):
     """Create a new scraping job"""
@@ -60,30 +88,47 @@ async def create_job(job_data: JobCreate, background_tasks: BackgroundTasks):
         created_at=datetime.utcnow()
     )
     
-    jobs_store[job_id] = job
+    jobs_store.add(job)
+    JOBS_CREATED.inc()
     background_tasks.add_task(run_scraping_job, job_id)
     
     return job
 
-@router.get("/", response_model=List[Job])
-async def get_all_jobs():
-    """Get all jobs"""
-    return list(jobs_store.values())
+@router.get("/")
+async def get_all_jobs(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """List jobs newest first; the next page's cursor is in X-Next-Cursor"""
+    try:
+        before = decode_cursor(cursor) if cursor else None
+        selected = parse_fields(fields, JOB_FIELDS, DEFAULT_JOB_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    jobs = jobs_store.page(limit, before=before)
+    if len(jobs) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(jobs[-1].created_at, jobs[-1].id)
+    return [project(job, selected) for job in jobs]
 
 @router.get("/{job_id}", response_model=Job)
 async def get_job(job_id: str):
     """Get specific job details"""
-    if job_id not in jobs_store:
+    job = jobs_store.get(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Job not found")
-    return jobs_store[job_id]
+    return job
 
 async def run_scraping_job(job_id: str):
     """Background task to run scraping"""
-    job = jobs_store[job_id]
+    job = jobs_store.get(job_id)
     
     try:
-        job.status = JobStatus.RUNNING
-        job.started_at = datetime.utcnow()
+        jobs_store.update(job_id, status=JobStatus.RUNNING, started_at=datetime.utcnow())
+        # The job row must exist before its results reference it
+        await _save_job(job)
         
         for i, model in enumerate(job.models):
             job.current_model = model
@@ -91,11 +136,28 @@ async def run_scraping_job(job_id: str):
             
             # Simulate scraping
             await asyncio.sleep(2)
+            if result_sink is not None:
+                await result_sink.put(job_id, model, {"model": model, "prefix": job.prefix})
         
-        job.status = JobStatus.COMPLETED
-        job.progress = 100
-        job.completed_at = datetime.utcnow()
+        # Results are written before the job reports completed
+        if result_sink is not None:
+            await result_sink.flush()
+        
+        jobs_store.update(
+            job_id,
+            status=JobStatus.COMPLETED,
+            progress=100,
+            completed_at=datetime.utcnow()
+        )
         
     except Exception as e:
-        job.status = JobStatus.FAILED
-        job.error = str(e)
+        jobs_store.update(job_id, status=JobStatus.FAILED, error=str(e))
+    
+    try:
+        await _save_job(job)
+    except Exception as e:
+        # A job whose final row was never written is not reported as completed
+        logger.error(f"❌ Could not save job {job_id}: {e}")
+        jobs_store.update(job_id, status=JobStatus.FAILED, error=f"Could not save job: {e}")
+    
+    (JOBS_COMPLETED if job.status == JobStatus.COMPLETED else JOBS_FAILED).inc()
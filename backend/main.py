@@ -7,7 +7,6 @@ Real-time progress tracking with WebSocket support
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
-import json
 import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
@@ -16,6 +15,12 @@ from dataclasses import dataclass
 from enum import Enum
 import uvicorn
 
+from app.services.broadcast import BroadcastHub
+from app.services.snapshot import SnapshotPublisher
+from app.api.metrics import router as metrics_router
+from app.core.middleware import CompressionMiddleware
+from app.utils.fast_json import FastJSONResponse
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,7 +51,8 @@ class Task:
 app = FastAPI(
     title="MK Processor 4.2.1 Enhanced API",
     description="Smart AI-Powered Multi-LLM Development Platform with Real-time Progress",
-    version="4.2.1"
+    version="4.2.1",
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -58,13 +64,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/br above RESPONSE_COMPRESS_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
+# Prometheus scrape target (see monitoring-config.yml)
+app.include_router(metrics_router)
+
 # Global state management
 class ProjectManager:
-    def __init__(self):
-        self.tasks = self._initialize_tasks()
+    def __init__(self, tasks: Optional[Dict[str, Task]] = None):
+        self.tasks: Dict[str, Task] = {}
         self.start_time = datetime.now()
         self.current_working_task = None
         
+        # Aggregates kept in step with every status/progress change so reads are O(1)
+        self._status_counts: Dict[TaskStatus, int] = {status: 0 for status in TaskStatus}
+        self._phase_totals: Dict[int, int] = {}
+        self._phase_completed: Dict[int, int] = {}
+        self._in_progress_sum = 0
+        # Not-started task ids in insertion order; the head is the next available task
+        self._ready: Dict[str, None] = {}
+        
+        for task in (tasks if tasks is not None else self._initialize_tasks()).values():
+            self.add_task(task)
+        
+    def add_task(self, task: Task):
+        """Register a task and fold it into the aggregates"""
+        if task.id in self.tasks:
+            raise ValueError(f"Duplicate task id: {task.id}")
+        self.tasks[task.id] = task
+        self._status_counts[task.status] += 1
+        self._phase_totals[task.phase] = self._phase_totals.get(task.phase, 0) + 1
+        self._phase_completed.setdefault(task.phase, 0)
+        if task.status == TaskStatus.COMPLETED:
+            self._phase_completed[task.phase] += 1
+        elif task.status == TaskStatus.IN_PROGRESS:
+            self._in_progress_sum += task.progress
+        else:
+            self._ready[task.id] = None
+    
+    def _set_status(self, task: Task, status: TaskStatus):
+        """Move a task to a new status, updating counters and the ready queue"""
+        old = task.status
+        if old == status:
+            return
+        self._status_counts[old] -= 1
+        self._status_counts[status] += 1
+        
+        if old == TaskStatus.NOT_STARTED:
+            self._ready.pop(task.id, None)
+        elif old == TaskStatus.IN_PROGRESS:
+            self._in_progress_sum -= task.progress
+        elif old == TaskStatus.COMPLETED:
+            self._phase_completed[task.phase] -= 1
+        
+        if status == TaskStatus.NOT_STARTED:
+            self._ready[task.id] = None
+        elif status == TaskStatus.IN_PROGRESS:
+            self._in_progress_sum += task.progress
+        elif status == TaskStatus.COMPLETED:
+            self._phase_completed[task.phase] += 1
+        task.status = status
+    
+    def _set_progress(self, task: Task, progress: int):
+        """Update task progress, keeping the in-progress total in step"""
+        if task.status == TaskStatus.IN_PROGRESS:
+            self._in_progress_sum += progress - task.progress
+        task.progress = progress
+        
     def _initialize_tasks(self) -> Dict[str, Task]:
         """Initialize the project tasks"""
         tasks = {}
@@ -156,32 +223,26 @@ class ProjectManager:
     
     def get_overall_progress(self) -> int:
         """Calculate overall project progress"""
-        completed = sum(1 for task in self.tasks.values() if task.status == TaskStatus.COMPLETED)
-        in_progress = sum(task.progress for task in self.tasks.values() if task.status == TaskStatus.IN_PROGRESS) / 100
-        total_completed = completed + in_progress
+        if not self.tasks:
+            return 0
+        total_completed = self._status_counts[TaskStatus.COMPLETED] + self._in_progress_sum / 100
         return min(100, int((total_completed / len(self.tasks)) * 100))
     
     def get_completed_tasks_count(self) -> int:
         """Get number of completed tasks"""
-        return sum(1 for task in self.tasks.values() if task.status == TaskStatus.COMPLETED)
+        return self._status_counts[TaskStatus.COMPLETED]
+    
+    def get_status_counts(self) -> Dict[str, int]:
+        """Number of tasks in each status"""
+        return {status.value: count for status, count in self._status_counts.items()}
     
     def get_current_phase(self) -> int:
-        """Determine current active phase"""
-        phase1_tasks = [t for t in self.tasks.values() if t.phase == 1]
-        phase1_completed = sum(1 for t in phase1_tasks if t.status == TaskStatus.COMPLETED)
-        phase1_progress = (phase1_completed / len(phase1_tasks)) * 100 if phase1_tasks else 0
-        
-        if phase1_progress < 100:
-            return 1
-        
-        phase2_tasks = [t for t in self.tasks.values() if t.phase == 2]
-        phase2_completed = sum(1 for t in phase2_tasks if t.status == TaskStatus.COMPLETED)
-        phase2_progress = (phase2_completed / len(phase2_tasks)) * 100 if phase2_tasks else 0
-        
-        if phase2_progress < 100:
-            return 2
-        else:
-            return 3
+        """Determine current active phase: the first one with unfinished tasks"""
+        phases = sorted(self._phase_totals)
+        for phase in phases[:-1]:
+            if self._phase_completed[phase] < self._phase_totals[phase]:
+                return phase
+        return phases[-1] if phases else 1
     
     def get_team_velocity(self) -> float:
         """Calculate team velocity (tasks per week)"""
@@ -191,17 +252,15 @@ class ProjectManager:
     
     def get_next_available_task(self) -> Optional[Task]:
         """Get next task that can be started"""
-        for task in self.tasks.values():
-            if task.status == TaskStatus.NOT_STARTED:
-                return task
-        return None
+        task_id = next(iter(self._ready), None)
+        return self.tasks[task_id] if task_id is not None else None
     
     def start_task(self, task_id: str) -> bool:
         """Start working on a task"""
         if task_id in self.tasks:
             task = self.tasks[task_id]
             if task.status == TaskStatus.NOT_STARTED:
-                task.status = TaskStatus.IN_PROGRESS
+                self._set_status(task, TaskStatus.IN_PROGRESS)
                 self.current_working_task = task_id
                 logger.info(f"Started task: {task.name}")
                 return True
@@ -212,8 +271,8 @@ class ProjectManager:
         if task_id in self.tasks:
             task = self.tasks[task_id]
             if task.status == TaskStatus.IN_PROGRESS:
-                task.status = TaskStatus.COMPLETED
-                task.progress = 100
+                self._set_progress(task, 100)
+                self._set_status(task, TaskStatus.COMPLETED)
                 self.current_working_task = None
                 logger.info(f"Completed task: {task.name}")
                 return True
@@ -235,7 +294,7 @@ class ProjectManager:
             if task.status == TaskStatus.IN_PROGRESS:
                 # Simulate 15-30% progress increment
                 increment = random.randint(15, 30)
-                task.progress = min(100, task.progress + increment)
+                self._set_progress(task, min(100, task.progress + increment))
                 
                 if task.progress >= 100:
                     self.complete_task(task_id)
@@ -246,34 +305,9 @@ class ProjectManager:
 # Global project manager
 project_manager = ProjectManager()
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"Client connected. Total connections: {len(self.active_connections)}")
-
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        logger.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
-
-    async def broadcast(self, message: str):
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except:
-                disconnected.append(connection)
-        
-        # Remove disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn)
-
-manager = ConnectionManager()
+# WebSocket connection manager: messages are encoded once and each client
+# is drained by its own sender task, so one slow dashboard can't stall others
+manager = BroadcastHub()
 
 # API Endpoints
 @app.get("/")
@@ -301,9 +335,8 @@ async def health_check():
         }
     }
 
-@app.get("/api/progress")
-async def get_progress():
-    """Get current project progress"""
+def build_progress_snapshot() -> Dict:
+    """Current project progress; computed once per tick and shared by every dashboard"""
     return {
         "overall_progress": project_manager.get_overall_progress(),
         "completed_tasks": project_manager.get_completed_tasks_count(),
@@ -311,9 +344,16 @@ async def get_progress():
         "current_phase": project_manager.get_current_phase(),
         "team_velocity": project_manager.get_team_velocity(),
         "current_working_task": project_manager.current_working_task,
-        "timestamp": datetime.now().isoformat()
     }
 
+# One producer per process pushes progress to all /ws/progress clients
+progress_publisher = SnapshotPublisher(manager, build_progress_snapshot, interval=5.0)
+
+@app.get("/api/progress")
+async def get_progress():
+    """Get current project progress"""
+    return {**build_progress_snapshot(), "timestamp": datetime.now().isoformat()}
+
 @app.get("/api/tasks")
 async def get_tasks():
     """Get all tasks with current status"""
@@ -335,13 +375,14 @@ async def get_tasks():
 async def start_task(task_id: str):
     """Start a specific task"""
     if project_manager.start_task(task_id):
+        progress_publisher.notify()
         # Broadcast update to all connected clients
-        await manager.broadcast(json.dumps({
+        await manager.broadcast({
             "type": "task_started",
             "task_id": task_id,
             "task_name": project_manager.tasks[task_id].name,
             "timestamp": datetime.now().isoformat()
-        }))
+        })
         return {"message": f"Task {task_id} started successfully"}
     else:
         raise HTTPException(status_code=400, detail="Could not start task")
@@ -350,13 +391,14 @@ async def start_task(task_id: str):
 async def complete_task(task_id: str):
     """Complete a specific task"""
     if project_manager.complete_task(task_id):
+        progress_publisher.notify()
         # Broadcast update to all connected clients
-        await manager.broadcast(json.dumps({
+        await manager.broadcast({
             "type": "task_completed",
             "task_id": task_id,
             "task_name": project_manager.tasks[task_id].name,
             "timestamp": datetime.now().isoformat()
-        }))
+        })
         return {"message": f"Task {task_id} completed successfully"}
     else:
         raise HTTPException(status_code=400, detail="Could not complete task")
@@ -366,59 +408,57 @@ async def simulate_progress():
     """Simulate progress for demo purposes"""
     success = project_manager.simulate_progress()
     if success:
+        progress_publisher.notify()
         return {"message": "Progress simulated successfully", "current_task": project_manager.current_working_task}
     else:
         return {"message": "No tasks available for simulation"}
 
+@app.get("/api/connections")
+async def get_connections():
+    """Per-connection queue depth and lag for WebSocket clients"""
+    return {
+        "total": len(manager.active_connections),
+        "snapshots_built": progress_publisher.snapshots_built,
+        "connections": manager.stats()
+    }
+
 # WebSocket endpoint for real-time updates
 @app.websocket("/ws/progress")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    connection = await manager.connect(websocket)
+    client_id = connection.client_id
     
     try:
-        # Send initial data immediately
+        # Send initial data immediately; periodic updates come from progress_publisher
         initial_data = {
             "type": "initial_connection",
-            "data": {
-                "overall_progress": project_manager.get_overall_progress(),
-                "completed_tasks": project_manager.get_completed_tasks_count(),
-                "total_tasks": len(project_manager.tasks),
-                "current_phase": project_manager.get_current_phase(),
-                "team_velocity": project_manager.get_team_velocity(),
-                "current_working_task": project_manager.current_working_task,
-                "timestamp": datetime.now().isoformat()
-            }
+            "data": progress_publisher.snapshot()
         }
-        await websocket.send_text(json.dumps(initial_data))
+        await manager.send_personal_message(initial_data, client_id)
         
+        # Reading is what notices the client going away
         while True:
-            # Send updated progress data every 5 seconds
-            progress_data = {
-                "type": "progress_update",
-                "data": {
-                    "overall_progress": project_manager.get_overall_progress(),
-                    "completed_tasks": project_manager.get_completed_tasks_count(),
-                    "total_tasks": len(project_manager.tasks),
-                    "current_phase": project_manager.get_current_phase(),
-                    "team_velocity": project_manager.get_team_velocity(),
-                    "current_working_task": project_manager.current_working_task,
-                    "timestamp": datetime.now().isoformat()
-                }
-            }
-            
-            await websocket.send_text(json.dumps(progress_data))
-            await asyncio.sleep(5)  # Update every 5 seconds
+            await websocket.receive_text()
             
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        await manager.disconnect(client_id, close=False, connection=connection)
 
 # Background task to simulate automatic progress
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks"""
     logger.info("🚀 MK Processor 4.2.1 Enhanced Backend Starting...")
+    await progress_publisher.start()
     asyncio.create_task(simulate_automatic_progress())
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the snapshot producer and close client sockets"""
+    await progress_publisher.stop()
+    await manager.close_all()
+
 async def simulate_automatic_progress():
     """Simulate automatic progress every 60 seconds for demo"""
     await asyncio.sleep(15)  # Wait 15 seconds after startup
@@ -431,11 +471,12 @@ async def simulate_automatic_progress():
             success = project_manager.simulate_progress()
             if success:
                 # Broadcast the update
-                await manager.broadcast(json.dumps({
+                progress_publisher.notify()
+                await manager.broadcast({
                     "type": "automatic_progress",
                     "message": f"Auto-progress on task: {project_manager.current_working_task}",
                     "timestamp": datetime.now().isoformat()
-                }))
+                })
                 logger.info(f"Auto-progress simulated")
 
 if __name__ == "__main__":
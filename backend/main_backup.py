@@ -1,6 +1,6 @@
-from fastapi import FastAPI, WebSocket, BackgroundTasks, HTTPException, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket, BackgroundTasks, HTTPException, WebSocketDisconnect, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from datetime import datetime
@@ -10,6 +10,13 @@ import asyncio
 import sys
 import logging
 
+from app.services.job_store import JobStore
+from app.services.export import EXPORT_FORMATS, export_stream, gzip_stream, iter_result_rows
+from app.services.metrics import JOBS_COMPLETED, JOBS_CREATED, JOBS_FAILED, MODELS_SCRAPED, SCRAPE_STAGE_SECONDS
+from app.api.metrics import router as metrics_router
+from app.core.middleware import CompressionMiddleware
+from app.utils.fast_json import FastJSONResponse, dumps_str
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,7 +37,8 @@ except ImportError as e:
 app = FastAPI(
     title="MK Processor Backend", 
     version="4.2.0",
-    description="ULTRATHINK Scraping System"
+    description="ULTRATHINK Scraping System",
+    default_response_class=FastJSONResponse
 )
 
 # Enable CORS
@@ -42,8 +50,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/br above RESPONSE_COMPRESS_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
+
+# Prometheus scrape target (see monitoring-config.yml)
+app.include_router(metrics_router)
+
 # In-memory storage (will be replaced with PostgreSQL later)
-jobs_db = []
+jobs_db = JobStore()
 active_websockets = []
 
 # Pydantic models
@@ -78,6 +92,7 @@ def root():
             "list_jobs": "GET /jobs",
             "job_details": "GET /jobs/{job_id}",
             "download_results": "GET /jobs/{job_id}/download",
+            "export_results": "GET /jobs/{job_id}/export?format=ndjson|csv|xlsx",
             "websocket": "WS /ws",
             "stats": "GET /api/stats"
         }
@@ -91,7 +106,7 @@ async def health_check():
         "timestamp": datetime.now().isoformat(),
         "database": "in-memory",
         "jobs_count": len(jobs_db),
-        "active_jobs": sum(1 for j in jobs_db if j["status"] == "running"),
+        "active_jobs": jobs_db.count("running"),
         "scraper_available": MKWebScraper is not None
     }
 
@@ -115,7 +130,8 @@ async def create_job(job: JobCreate, background_tasks: BackgroundTasks):
         "total_models": len(job.models)
     }
     
-    jobs_db.append(job_data)
+    jobs_db.add(job_data)
+    JOBS_CREATED.inc()
     logger.info(f"📋 Created job {job_id} with {len(job.models)} models")
     
     # Start scraping in background
@@ -133,47 +149,69 @@ async def get_jobs():
 @app.get("/jobs/{job_id}", response_model=JobResponse)
 async def get_job(job_id: str):
     """Get specific job details"""
-    for job in jobs_db:
-        if job["id"] == job_id:
-            return JobResponse(**job)
-    raise HTTPException(status_code=404, detail="Job not found")
+    job = jobs_db.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job)
 
 # Download job results
 @app.get("/jobs/{job_id}/download")
 async def download_job_results(job_id: str):
     """Download job results as JSON"""
-    for job in jobs_db:
-        if job["id"] == job_id:
-            if job["status"] != "completed":
-                raise HTTPException(status_code=400, detail="Job not completed")
-            
-            return JSONResponse(
-                content={
-                    "job_id": job_id,
-                    "results": job["results"],
-                    "metadata": {
-                        "models": job["models"],
-                        "prefix": job["prefix"],
-                        "created_at": job["created_at"],
-                        "completed_at": job["completed_at"]
-                    }
-                },
-                headers={
-                    "Content-Disposition": f"attachment; filename=job_{job_id}_results.json"
-                }
-            )
-    raise HTTPException(status_code=404, detail="Job not found")
+    job = jobs_db.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=400, detail="Job not completed")
+    
+    # Returned directly, so the results skip jsonable_encoder and go straight to orjson
+    return FastJSONResponse(
+        content={
+            "job_id": job_id,
+            "results": job["results"],
+            "metadata": {
+                "models": job["models"],
+                "prefix": job["prefix"],
+                "created_at": job["created_at"],
+                "completed_at": job["completed_at"]
+            }
+        },
+        headers={
+            "Content-Disposition": f"attachment; filename=job_{job_id}_results.json"
+        }
+    )
+
+# Stream job results without building the whole export in memory
+@app.get("/jobs/{job_id}/export")
+async def export_job_results(job_id: str, request: Request, format: str = Query("ndjson")):
+    """Stream job results as NDJSON, CSV or XLSX; gzip when the client accepts it"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    job = jobs_db.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=400, detail="Job not completed")
+    
+    body = export_stream(format, lambda: iter_result_rows(job["results"]))
+    headers = {"Content-Disposition": f"attachment; filename=job_{job_id}_results.{format}"}
+    # XLSX is already a zip, so compressing it again buys nothing
+    if format != "xlsx" and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[format], headers=headers)
 
 # Stats endpoint (for compatibility with existing code)
 @app.get("/api/stats")
 def get_stats():
-    jobs = jobs_db
     return {
-        "total_jobs": len(jobs),
-        "running_jobs": len([j for j in jobs if j["status"] == "running"]),
-        "completed_jobs": len([j for j in jobs if j["status"] == "completed"]),
-        "failed_jobs": len([j for j in jobs if j["status"] == "failed"]),
-        "pending_jobs": len([j for j in jobs if j["status"] == "pending"]),
+        "total_jobs": jobs_db.count(),
+        "running_jobs": jobs_db.count("running"),
+        "completed_jobs": jobs_db.count("completed"),
+        "failed_jobs": jobs_db.count("failed"),
+        "pending_jobs": jobs_db.count("pending"),
         "active_connections": len(active_websockets),
         "scraper_available": MKWebScraper is not None
     }
@@ -191,12 +229,12 @@ async def websocket_endpoint(websocket: WebSocket):
             # Send current jobs status
             data = {
                 "type": "status",
-                "jobs": len(jobs_db),
-                "active": sum(1 for j in jobs_db if j["status"] == "running"),
-                "completed": sum(1 for j in jobs_db if j["status"] == "completed"),
+                "jobs": jobs_db.count(),
+                "active": jobs_db.count("running"),
+                "completed": jobs_db.count("completed"),
                 "timestamp": datetime.now().isoformat()
             }
-            await websocket.send_json(data)
+            await websocket.send_text(dumps_str(data))
             await asyncio.sleep(1)
     except WebSocketDisconnect:
         active_websockets.remove(websocket)
@@ -205,16 +243,17 @@ async def websocket_endpoint(websocket: WebSocket):
 # Broadcast updates to all connected websockets
 async def broadcast_job_update(job_data):
     """Broadcast job updates to all connected websockets"""
-    message = {
+    # Encoded once for every socket; a completed job carries all of its results
+    message = dumps_str({
         "type": "job_update",
         "job": job_data,
         "timestamp": datetime.now().isoformat()
-    }
+    })
     
     disconnected = []
     for websocket in active_websockets:
         try:
-            await websocket.send_json(message)
+            await websocket.send_text(message)
         except:
             disconnected.append(websocket)
     
@@ -228,11 +267,9 @@ async def run_scraper_job(job_id: str, models: List[str], prefix: str):
     logger.info(f"🚀 Starting job {job_id}")
     
     # Update job status to running
-    for job in jobs_db:
-        if job["id"] == job_id:
-            job["status"] = "running"
-            await broadcast_job_update(job)
-            break
+    job = jobs_db.update(job_id, status="running")
+    if job is not None:
+        await broadcast_job_update(job)
     
     try:
         # Initialize results
@@ -254,11 +291,9 @@ async def run_scraper_job(job_id: str, models: List[str], prefix: str):
                     try:
                         # Update progress
                         progress = int((i / len(models)) * 100)
-                        for job in jobs_db:
-                            if job["id"] == job_id:
-                                job["progress"] = progress
-                                await broadcast_job_update(job)
-                                break
+                        job = jobs_db.update(job_id, progress=progress)
+                        if job is not None:
+                            await broadcast_job_update(job)
                         
                         # Prepare model number with prefix
                         full_model = f"{prefix}{model}" if prefix else model
@@ -266,17 +301,20 @@ async def run_scraper_job(job_id: str, models: List[str], prefix: str):
                         
                         # Call the scraper
                         # Adjust method name based on your scraper's actual method
-                        scraped_data = await asyncio.to_thread(
-                            scraper.scrape_katom,  # or scraper.scrape, scraper.process_model, etc.
-                            full_model
-                        )
+                        with SCRAPE_STAGE_SECONDS.labels(stage="model").time():
+                            scraped_data = await asyncio.to_thread(
+                                scraper.scrape_katom,  # or scraper.scrape, scraper.process_model, etc.
+                                full_model
+                            )
                         
+                        MODELS_SCRAPED.labels(result="success").inc()
                         results["successful"].append(model)
                         results["data"][model] = scraped_data
                         logger.info(f"✅ Successfully scraped: {full_model}")
                         
                     except Exception as e:
                         logger.error(f"❌ Error scraping {model}: {e}")
+                        MODELS_SCRAPED.labels(result="failed").inc()
                         results["failed"].append({
                             "model": model,
                             "error": str(e)
@@ -295,14 +333,13 @@ async def run_scraper_job(job_id: str, models: List[str], prefix: str):
                 
                 # Update progress
                 progress = int(((i + 1) / len(models)) * 100)
-                for job in jobs_db:
-                    if job["id"] == job_id:
-                        job["progress"] = progress
-                        await broadcast_job_update(job)
-                        break
+                job = jobs_db.update(job_id, progress=progress)
+                if job is not None:
+                    await broadcast_job_update(job)
                 
                 # Mock data
                 full_model = f"{prefix}{model}" if prefix else model
+                MODELS_SCRAPED.labels(result="success").inc()
                 results["successful"].append(model)
                 results["data"][model] = {
                     "title": f"Product {full_model}",
@@ -318,26 +355,26 @@ async def run_scraper_job(job_id: str, models: List[str], prefix: str):
                 logger.info(f"🎭 Mock scraped: {full_model}")
         
         # Mark job as completed
-        for job in jobs_db:
-            if job["id"] == job_id:
-                job["status"] = "completed"
-                job["progress"] = 100
-                job["completed_at"] = datetime.now().isoformat()
-                job["results"] = results
-                await broadcast_job_update(job)
-                break
+        job = jobs_db.update(
+            job_id,
+            status="completed",
+            progress=100,
+            completed_at=datetime.now().isoformat(),
+            results=results
+        )
+        if job is not None:
+            await broadcast_job_update(job)
+        JOBS_COMPLETED.inc()
         
         logger.info(f"✅ Job {job_id} completed. Success: {len(results['successful'])}, Failed: {len(results['failed'])}")
                 
     except Exception as e:
         # Mark job as failed
         logger.error(f"❌ Job {job_id} failed: {e}")
-        for job in jobs_db:
-            if job["id"] == job_id:
-                job["status"] = "failed"
-                job["error"] = str(e)
-                await broadcast_job_update(job)
-                break
+        JOBS_FAILED.inc()
+        job = jobs_db.update(job_id, status="failed", error=str(e))
+        if job is not None:
+            await broadcast_job_update(job)
 
 # Startup event
 @app.on_event("startup")
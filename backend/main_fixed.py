@@ -1,5 +1,6 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import asyncpg
 import redis.asyncio as redis
 import os
@@ -7,26 +8,17 @@ from datetime import datetime
 # from backend.app.api import scraping
 import logging
 
+from scraper_service import get_scraper_service
+from app.api.metrics import router as metrics_router
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="MK Processor Backend")
-
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # Global connections
 db_pool = None
 redis_client = None
 
-@app.on_event("startup")
 async def startup():
     global db_pool, redis_client
     
@@ -65,14 +57,36 @@ async def startup():
         logger.error(f"? Startup error: {str(e)}")
         logger.exception("Full traceback:")
 
-@app.on_event("shutdown")
 async def shutdown():
     if db_pool:
         await db_pool.close()
     if redis_client:
         await redis_client.close()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    # Service singletons live on app.state; the scraper entry point is
+    # resolved in the background, so startup never waits on Selenium
+    app.state.scraper_service = get_scraper_service()
+    await app.state.scraper_service.start()
+    yield
+    await app.state.scraper_service.shutdown()
+    await shutdown()
+
+app = FastAPI(title="MK Processor Backend", lifespan=lifespan)
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
 # app.include_router(scraping.router)
+app.include_router(metrics_router)
 
 @app.get("/")
 async def root():
@@ -133,12 +147,6 @@ async def get_projects():
 
 
 # ULTRATHINK Integration
-try:
-    from main_scraper import *
-    print('? Main scraper loaded!')
-except Exception as e:
-    print(f'?? Scraper load error: {e}')
-
 jobs_storage = []
 
 @app.get('/jobs')
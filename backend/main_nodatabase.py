@@ -5,6 +5,8 @@ from typing import List, Dict
 import json
 import uuid
 
+from app.services.job_store import JobStore
+
 app = FastAPI(title="MK Processor Backend", version="4.2.0")
 
 # Enable CORS
@@ -17,7 +19,7 @@ app.add_middleware(
 )
 
 # In-memory storage (no database needed)
-jobs_store = []
+jobs_store = JobStore()
 active_connections = []
 
 @app.get("/")
@@ -49,7 +51,7 @@ async def create_job(job_data: dict):
         "total_models": len(job_data.get("models", [])),
         "created_at": datetime.utcnow().isoformat()
     }
-    jobs_store.append(job)
+    jobs_store.add(job)
     
     # Notify WebSocket clients
     await notify_clients({"type": "job_created", "job": job})
@@ -59,23 +61,20 @@ async def create_job(job_data: dict):
 @app.get("/api/jobs/")
 async def get_jobs():
     """Get all jobs"""
-    return jobs_store
+    return jobs_store.values()
 
 @app.get("/api/jobs/{job_id}")
 async def get_job(job_id: str):
     """Get specific job"""
-    for job in jobs_store:
-        if job["id"] == job_id:
-            return job
-    return {"error": "Job not found"}
+    return jobs_store.get(job_id) or {"error": "Job not found"}
 
 @app.get("/api/stats")
 async def get_stats():
     """Get system statistics"""
     return {
-        "total_jobs": len(jobs_store),
-        "running_jobs": len([j for j in jobs_store if j["status"] == "running"]),
-        "completed_jobs": len([j for j in jobs_store if j["status"] == "completed"]),
+        "total_jobs": jobs_store.count(),
+        "running_jobs": jobs_store.count("running"),
+        "completed_jobs": jobs_store.count("completed"),
         "active_connections": len(active_connections)
     }
 
@@ -112,9 +111,8 @@ async def notify_clients(message: dict):
 @app.post("/api/jobs/start/{job_id}")
 async def start_job(job_id: str):
     """Start a job (mock implementation)"""
-    for job in jobs_store:
-        if job["id"] == job_id:
-            job["status"] = "running"
-            await notify_clients({"type": "job_update", "job": job})
-            return job
-    return {"error": "Job not found"}
+    job = jobs_store.update(job_id, status="running")
+    if job is None:
+        return {"error": "Job not found"}
+    await notify_clients({"type": "job_update", "job": job})
+    return job
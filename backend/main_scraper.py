@@ -11,7 +11,6 @@ import os
 import pandas as pd
 import gspread
 import re
-import math
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
     QProgressBar, QScrollArea, QFrame, QMessageBox, QComboBox
@@ -29,13 +28,25 @@ from fake_useragent import UserAgent
 import threading
 import time
 import traceback
-import openpyxl
-from openpyxl.styles import Alignment
 import json
 import requests
 from io import BytesIO
 from PIL import Image
 
+from app.scraping.katom import KATOM_PROFILE
+from app.scraping.profiles import extract_numeric_price, process_weight_value
+from app.services.stage_timer import StageTimer, format_summary, summarize_timings
+from app.services.product_parquet import ProductParquetWriter, parquet_to_excel
+from app.utils.excel import write_excel
+
+# Output workbook formatting, applied as the file is written
+EXCEL_COLUMN_FORMATS = {"Description": {"text_wrap": True}}
+EXCEL_ROW_HEIGHT = 15
+
+# "xlsx" rewrites the workbook as rows come in; "parquet" appends typed row
+# groups to final_*.parquet and builds the workbook from it once at the end
+SCRAPER_OUTPUT_FORMAT = os.getenv("SCRAPER_OUTPUT_FORMAT", "xlsx").lower()
+
 # Simple class for better error handling
 class AppError(Exception):
     pass
@@ -57,6 +68,7 @@ class SheetRow(QFrame):
         self.output_df = None
         self.output_path = None
         self.selected_file = None
+        self.last_timings = {}
         self.worker_thread = None
         self.signals = WorkerSignals()
         
@@ -365,15 +377,7 @@ class SheetRow(QFrame):
     
     def process_weight_value(self, value):
         try:
-            number_match = re.search(r'(\d+(\.\d+)?)', str(value))
-            if number_match:
-                number = float(number_match.group(1))
-                rounded = math.ceil(number)
-                final = rounded + 5
-                units_match = re.search(r'[^\d.]+$', str(value))
-                units = units_match.group(0).strip() if units_match else ""
-                return f"{final}{' ' + units if units else ''}"
-            return value
+            return process_weight_value(value)
         except:
             return value
 
@@ -394,20 +398,7 @@ class SheetRow(QFrame):
     
     def extract_numeric_price(self, price_text):
         """Extract numeric price value from price text"""
-        if not price_text:
-            return ""
-            
-        # Try to find numeric price with decimal point
-        price_match = re.search(r'[\d,]+\.\d{2}', price_text)
-        if price_match:
-            return price_match.group(0).replace(',', '')
-            
-        # Try to find numeric price without decimal
-        price_match = re.search(r'[\d,]+', price_text)
-        if price_match:
-            return price_match.group(0).replace(',', '')
-            
-        return ""
+        return extract_numeric_price(price_text)
     
     def extract_table_data(self, driver):
         specs_dict = {}
@@ -487,6 +478,9 @@ class SheetRow(QFrame):
         return specs_dict, specs_html
     
     def scrape_katom(self, model_number, prefix, retries=2):
+        """Scrape one product; per-stage timings in ms are left in self.last_timings"""
+        timer = StageTimer()
+        check_image_size = timer.wrap("image_probe", self.check_image_size)
         model_number = ''.join(e for e in model_number if e.isalnum()).upper()
         if model_number.endswith("HC"):
             model_number = model_number[:-2]
@@ -511,24 +505,30 @@ class SheetRow(QFrame):
         try:
             driver = webdriver.Chrome(options=options)
             driver.set_page_load_timeout(30)
+            timer.lap("driver_startup")
             driver.get(url)
+            timer.lap("page_load")
             
             if "404" in driver.title or "not found" in driver.title.lower():
+                self.last_timings = timer.as_dict()
                 return title, description, specs_data, specs_html, video_links, numeric_price, main_image, additional_images
             
-            # Extract title
+            # Extract title; selectors come from the katom extraction profile
+            title_selectors = KATOM_PROFILE.selectors("title")
             try:
                 WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "h1.product-name.mb-0, h1"))
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(title_selectors)))
                 )
-                title_element = driver.find_element(By.CSS_SELECTOR, "h1.product-name.mb-0")
+                timer.lap("title_wait")
+                title_element = driver.find_element(By.CSS_SELECTOR, title_selectors[0])
                 title = title_element.text.strip()
                 if title:
                     item_found = True
             except TimeoutException:
+                timer.lap("title_wait")
                 # Try alternate title selectors
                 try:
-                    for selector in ["h1.product-title", "h1[itemprop='name']", "h1"]:
+                    for selector in title_selectors[1:]:
                         elements = driver.find_elements(By.CSS_SELECTOR, selector)
                         if elements:
                             title = elements[0].text.strip()
@@ -538,11 +538,13 @@ class SheetRow(QFrame):
                     print(f"Error with alternate title search: {e}")
             except Exception as e:
                 print(f"Error getting title: {e}")
+            timer.lap("title")
             
             if item_found:
                 # Extract price - First look specifically for price in <p class="product-price-text m-0">
+                price_selectors = KATOM_PROFILE.selectors("price")
                 try:
-                    price_elements = driver.find_elements(By.CSS_SELECTOR, "p.product-price-text.m-0")
+                    price_elements = driver.find_elements(By.CSS_SELECTOR, price_selectors[0])
                     if price_elements:
                         for element in price_elements:
                             price_text = element.text.strip()
@@ -553,8 +555,7 @@ class SheetRow(QFrame):
                     
                     # If price not found in the specific element, try other selectors
                     if not numeric_price:
-                        for selector in [".product-price", ".price", "[class*='price']", ".regular-price", 
-                                      ".our-price", ".sale-price", "span[itemprop='price']"]:
+                        for selector in price_selectors[1:]:
                             elements = driver.find_elements(By.CSS_SELECTOR, selector)
                             if elements:
                                 for element in elements:
@@ -568,16 +569,16 @@ class SheetRow(QFrame):
                     
                 except Exception as e:
                     print(f"Error extracting price: {e}")
+                timer.lap("price")
                 
                 # Extract main image
                 try:
-                    for selector in [".product-img img", ".main-product-image", "img.main-image", 
-                                  "img[itemprop='image']", ".product-image-container img"]:
+                    for selector in KATOM_PROFILE.selectors("main_image"):
                         elements = driver.find_elements(By.CSS_SELECTOR, selector)
                         if elements:
                             for element in elements:
                                 src = element.get_attribute("src")
-                                if src and self.check_image_size(src):
+                                if src and check_image_size(src):
                                     main_image = src
                                     break
                             if main_image:
@@ -589,16 +590,16 @@ class SheetRow(QFrame):
                             src = element.get_attribute("src")
                             if not src:
                                 continue
-                            if (model_number.lower() in src.lower() or "product" in src.lower()) and self.check_image_size(src):
+                            if (model_number.lower() in src.lower() or "product" in src.lower()) and check_image_size(src):
                                 main_image = src
                                 break
                 except Exception as e:
                     print(f"Error extracting main image: {e}")
+                timer.lap("main_image")
                 
                 # Extract additional images
                 try:
-                    for selector in [".additional-images img", ".product-thumbnails img", ".thumb-image", 
-                                  ".product-gallery img", "[class*='thumbnail'] img"]:
+                    for selector in KATOM_PROFILE.selectors("additional_images"):
                         elements = driver.find_elements(By.CSS_SELECTOR, selector)
                         if elements:
                             for element in elements:
@@ -609,7 +610,7 @@ class SheetRow(QFrame):
                                     full_size_src = src.replace("thumbnail", "full")
                                 
                                 if full_size_src and full_size_src != main_image and full_size_src not in additional_images:
-                                    if self.check_image_size(full_size_src):
+                                    if check_image_size(full_size_src):
                                         additional_images.append(full_size_src)
                                         if len(additional_images) >= 5:  # Limit to 5 additional images
                                             break
@@ -617,6 +618,7 @@ class SheetRow(QFrame):
                                 break
                 except Exception as e:
                     print(f"Error extracting additional images: {e}")
+                timer.lap("additional_images")
                 
                 # Get description
                 try:
@@ -640,8 +642,7 @@ class SheetRow(QFrame):
                 except NoSuchElementException:
                     try:
                         # Try alternative description selectors - same as original
-                        for selector in [".product-description", ".description", 
-                                      "[class*='description']", "#product-description", "#description"]:
+                        for selector in KATOM_PROFILE.field("description").fallback.selectors:
                             elements = driver.find_elements(By.CSS_SELECTOR, selector)
                             if elements:
                                 # Only change from original: use innerHTML instead of text
@@ -655,13 +656,15 @@ class SheetRow(QFrame):
                         print(f"Error getting alternate description: {e}")
                 except Exception as e:
                     print(f"Error getting description: {e}")
+                timer.lap("description")
                 
                 # Extract table data with improved fraction handling
                 specs_data, specs_html = self.extract_table_data(driver)
+                timer.lap("specs")
                 
                 # Extract video links
                 try:
-                    sources = driver.find_elements(By.CSS_SELECTOR, "source[src*='.mp4'], source[type*='video']")
+                    sources = driver.find_elements(By.CSS_SELECTOR, KATOM_PROFILE.selectors("video_links")[0])
                     for source in sources:
                         src = source.get_attribute("src")
                         if src and src not in video_links:
@@ -677,6 +680,7 @@ class SheetRow(QFrame):
                                     video_links += f"{src}\n"
                 except Exception as e:
                     print(f"Error extracting video links: {e}")
+                timer.lap("video_links")
         except Exception as e:
             print(f"Error in scrape_katom: {e}")
             print(traceback.format_exc())
@@ -695,6 +699,7 @@ class SheetRow(QFrame):
                 except:
                     pass
         
+        self.last_timings = timer.as_dict()
         return title, description, specs_data, specs_html, video_links, numeric_price, main_image, additional_images
 
     def load_file_data(self, file_info):
@@ -814,98 +819,125 @@ class SheetRow(QFrame):
             self.signals.update_progress.emit(0, total_rows)
             print(f"Processing {total_rows} rows")
             
-            # We'll collect rows in a list first, then add to DataFrame
+            parquet_writer = None
+            if SCRAPER_OUTPUT_FORMAT == "parquet":
+                parquet_path = os.path.splitext(self.output_path)[0] + ".parquet"
+                parquet_writer = ProductParquetWriter(parquet_path, columns)
+                print(f"Writing row groups to: {parquet_path}")
+            
+            # Excel output collects rows in a list first, then adds them to a DataFrame
             all_rows = []
             processed_count = 0
+            job_timings = []
             
-            for i, row_data in df.iterrows():
-                if not self.running:
-                    break
+            try:
+                for i, row_data in df.iterrows():
+                    if not self.running:
+                        break
+                        
+                    current_row = i + 1
                     
-                current_row = i + 1
-                
-                # Get model with error handling
-                try:
-                    model = str(row_data[model_col]).strip()
-                    if model.lower() == 'nan' or model.lower() == 'none':
+                    # Get model with error handling
+                    try:
+                        model = str(row_data[model_col]).strip()
+                        if model.lower() == 'nan' or model.lower() == 'none':
+                            model = ""
+                    except Exception as e:
+                        print(f"Error reading model in row {current_row}: {e}")
                         model = ""
-                except Exception as e:
-                    print(f"Error reading model in row {current_row}: {e}")
-                    model = ""
-                
-                if not model:
-                    print(f"Skipping row {current_row} - empty model")
-                    self.signals.update_progress.emit(current_row, total_rows)
-                    continue
                     
-                try:
-                    self.signals.update_status.emit(f"Processing model: {model}")
-                    print(f"Processing row {current_row}: {model}")
-                    
-                    # Scrape data
-                    title, desc, specs_dict, specs_html, video_links, numeric_price, main_image, additional_images = self.scrape_katom(model, prefix)
-                    
-                    if title != "Title not found" and "not found" not in title.lower():
-                        # Use the price as is (just numeric value)
-                        price_value = "Call for Price"
-                        if numeric_price:
-                            price_value = numeric_price
+                    if not model:
+                        print(f"Skipping row {current_row} - empty model")
+                        self.signals.update_progress.emit(current_row, total_rows)
+                        continue
                         
-                        combined_description = f'<div style="text-align: justify;">{desc}</div>'
-                        if specs_html:
-                            combined_description += f'<h3 style="margin-top: 15px;">Specifications</h3>{specs_html}'
-                            
-                        # Create a dictionary for this row
-                        new_row = {}
+                    try:
+                        self.signals.update_status.emit(f"Processing model: {model}")
+                        print(f"Processing row {current_row}: {model}")
                         
-                        # Initialize all columns to empty string
-                        for col in columns:
-                            new_row[col] = ""
-                            
-                        # Set the main values
-                        new_row["Mfr Model"] = model
-                        new_row["Title"] = title
-                        new_row["Description"] = combined_description
-                        new_row["Price"] = price_value
-                        new_row["Main Image"] = main_image
+                        # Scrape data
+                        title, desc, specs_dict, specs_html, video_links, numeric_price, main_image, additional_images = self.scrape_katom(model, prefix)
+                        job_timings.append(self.last_timings)
                         
-                        # Add additional images
-                        for idx, img_url in enumerate(additional_images[:5], 1):
-                            new_row[f"Additional Image {idx}"] = img_url
+                        if title != "Title not found" and "not found" not in title.lower():
+                            # Use the price as is (just numeric value)
+                            price_value = "Call for Price"
+                            if numeric_price:
+                                price_value = numeric_price
+                            
+                            combined_description = f'<div style="text-align: justify;">{desc}</div>'
+                            if specs_html:
+                                combined_description += f'<h3 style="margin-top: 15px;">Specifications</h3>{specs_html}'
                                 
-                        # Add specification data
-                        for key, value in specs_dict.items():
-                            for field in columns:
-                                if key.lower() == field.lower() or key.lower() in field.lower():
-                                    new_row[field] = value
-                                    break
+                            # Create a dictionary for this row
+                            new_row = {}
+                            
+                            # Initialize all columns to empty string
+                            for col in columns:
+                                new_row[col] = ""
+                                
+                            # Set the main values
+                            new_row["Mfr Model"] = model
+                            new_row["Title"] = title
+                            new_row["Description"] = combined_description
+                            new_row["Price"] = price_value
+                            new_row["Main Image"] = main_image
+                            
+                            # Add additional images
+                            for idx, img_url in enumerate(additional_images[:5], 1):
+                                new_row[f"Additional Image {idx}"] = img_url
                                     
-                        # Add video links
-                        video_list = [link.strip() for link in video_links.strip().split('\n') if link.strip()]
-                        for idx, link in enumerate(video_list[:5], 1):
-                            new_row[f"Video Link {idx}"] = link
+                            # Add specification data
+                            for key, value in specs_dict.items():
+                                for field in columns:
+                                    if key.lower() == field.lower() or key.lower() in field.lower():
+                                        new_row[field] = value
+                                        break
+                                        
+                            # Add video links
+                            video_list = [link.strip() for link in video_links.strip().split('\n') if link.strip()]
+                            for idx, link in enumerate(video_list[:5], 1):
+                                new_row[f"Video Link {idx}"] = link
+                                
+                            processed_count += 1
                             
-                        # Add to our list
-                        all_rows.append(new_row)
-                        processed_count += 1
-                        
-                        # Save periodically
-                        if processed_count % 5 == 0 or processed_count == 1:
-                            # Create DataFrame from collected rows 
-                            self.output_df = pd.DataFrame(all_rows, columns=columns)
-                            print(f"Saving after processing {processed_count} rows")
-                            self.save_results()
-                        
-                except Exception as e:
-                    print(f"Error processing row {current_row}: {e}")
-                    print(traceback.format_exc())
-                    # Continue with next row
-                    continue
-                
-                self.signals.update_progress.emit(current_row, total_rows)
+                            # Parquet output streams rows out; Excel output keeps them for the periodic saves
+                            if parquet_writer is not None:
+                                parquet_writer.append(new_row)
+                            else:
+                                all_rows.append(new_row)
+                                if processed_count % 5 == 0 or processed_count == 1:
+                                    # Create DataFrame from collected rows 
+                                    self.output_df = pd.DataFrame(all_rows, columns=columns)
+                                    print(f"Saving after processing {processed_count} rows")
+                                    self.save_results()
+                            
+                    except Exception as e:
+                        print(f"Error processing row {current_row}: {e}")
+                        print(traceback.format_exc())
+                        # Continue with next row
+                        continue
+                    
+                    self.signals.update_progress.emit(current_row, total_rows)
+            finally:
+                # The footer must be written even if the loop is interrupted, or the file is unreadable
+                if parquet_writer is not None:
+                    parquet_writer.close()
+            
+            timing_summary = summarize_timings(job_timings)
+            if timing_summary:
+                print(f"Stage timings over {len(job_timings)} models: {format_summary(timing_summary)}")
             
             # Final save
-            if processed_count > 0:
+            if parquet_writer is not None:
+                try:
+                    parquet_to_excel(parquet_writer.path, self.output_path, fill={"Price": "Call for Price"},
+                                     formats=EXCEL_COLUMN_FORMATS, row_height=EXCEL_ROW_HEIGHT)
+                    print(f"Workbook generated from {parquet_writer.path}: {self.output_path}")
+                except Exception as e:
+                    print(f"Error generating workbook from Parquet: {e}")
+                    print(traceback.format_exc())
+            elif processed_count > 0:
                 try:
                     # Create DataFrame from all collected rows
                     self.output_df = pd.DataFrame(all_rows, columns=columns)
@@ -969,32 +1001,9 @@ class SheetRow(QFrame):
                 if col in self.output_df.columns:
                     ordered_df[col] = self.output_df[col]
             
-            # Save to Excel file - without specifying engine
+            # Formatting is part of the write, so the file is generated once
             print(f"Saving DataFrame with {len(ordered_df)} rows to {output_path}")
-            ordered_df.to_excel(output_path, index=False)
-            
-            # Apply Excel formatting
-            try:
-                workbook = openpyxl.load_workbook(output_path)
-                worksheet = workbook.active
-                
-                # Set row heights
-                for row in worksheet.iter_rows():
-                    worksheet.row_dimensions[row[0].row].height = 15
-                
-                # Set text wrapping for description
-                for row in worksheet.iter_rows():
-                    for cell in row:
-                        col_name = worksheet.cell(row=1, column=cell.column).value
-                        if col_name == "Description":
-                            cell.alignment = Alignment(wrap_text=True)
-                
-                workbook.save(output_path)
-                workbook.close()
-                print(f"Excel formatting applied successfully to {output_path}")
-            except Exception as e:
-                print(f"Excel formatting error (non-critical): {e}")
-                print(traceback.format_exc())
+            write_excel(ordered_df, output_path, formats=EXCEL_COLUMN_FORMATS, row_height=EXCEL_ROW_HEIGHT)
                 
             print(f"File saved successfully: {output_path}")
             
@@ -5,6 +5,8 @@ import json
 import uuid
 import asyncio
 
+from app.services.job_store import JobStore
+
 app = FastAPI(title="MK Processor Backend", version="4.2.0")
 
 # Enable CORS
@@ -17,7 +19,7 @@ app.add_middleware(
 )
 
 # In-memory storage
-jobs_store = {}
+jobs_store = JobStore()
 active_connections = []
 
 @app.get("/")
@@ -48,7 +50,7 @@ async def create_job(job_data: dict, background_tasks: BackgroundTasks):
         "created_at": datetime.utcnow().isoformat()
     }
     
-    jobs_store[job_id] = job
+    jobs_store.add(job)
     
     # Start mock scraping in background
     background_tasks.add_task(mock_scrape, job_id)
@@ -57,33 +59,34 @@ async def create_job(job_data: dict, background_tasks: BackgroundTasks):
 
 @app.get("/api/jobs/")
 def get_jobs():
-    return list(jobs_store.values())
+    return jobs_store.values()
 
 @app.get("/api/jobs/{job_id}")
 def get_job(job_id: str):
-    return jobs_store.get(job_id, {"error": "Job not found"})
+    return jobs_store.get(job_id) or {"error": "Job not found"}
 
 @app.get("/api/stats")
 def get_stats():
-    jobs = list(jobs_store.values())
     return {
-        "total_jobs": len(jobs),
-        "running_jobs": len([j for j in jobs if j["status"] == "running"]),
-        "completed_jobs": len([j for j in jobs if j["status"] == "completed"]),
+        "total_jobs": jobs_store.count(),
+        "running_jobs": jobs_store.count("running"),
+        "completed_jobs": jobs_store.count("completed"),
         "active_connections": len(active_connections)
     }
 
 async def mock_scrape(job_id: str):
     """Simple mock scraping that won't crash"""
     if job_id in jobs_store:
-        job = jobs_store[job_id]
-        job["status"] = "running"
+        jobs_store.update(job_id, status="running")
         
         # Simulate progress
         for i in range(5):
             await asyncio.sleep(1)
-            job["progress"] = (i + 1) * 20
+            jobs_store.update(job_id, progress=(i + 1) * 20)
         
-        job["status"] = "completed"
-        job["progress"] = 100
-        job["completed_at"] = datetime.utcnow().isoformat()
+        jobs_store.update(
+            job_id,
+            status="completed",
+            progress=100,
+            completed_at=datetime.utcnow().isoformat()
+        )
@@ -1,29 +1,35 @@
 # backend/scraper_integration.py
 import sys
 import os
+import atexit
 import json
 import asyncio
-import pandas as pd
-import gspread
 from datetime import datetime
 from typing import List, Dict, Optional
-from oauth2client.service_account import ServiceAccountCredentials
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from fake_useragent import UserAgent
 import traceback
 
+from app.scraping.profiles import get_profile
+from app.services.sheets_sync import SheetSync, SheetSyncWorker
+from app.utils.excel import write_excel
+
+SHEET_HEADER = ["Timestamp", "Model", "Prefix", "Status", "Items Found", "Data"]
+
+# pandas, gspread, oauth2client, Selenium and fake_useragent are imported
+# inside the methods that need them so importing this module stays cheap.
+
 class ScraperIntegration:
     def __init__(self):
+        # Google auth happens on the first Sheets call, not at construction
         self.gc = None
-        self.setup_google_auth()
+        # One background sync per spreadsheet name
+        self.sheet_syncs: Dict[str, SheetSyncWorker] = {}
         
     def setup_google_auth(self):
         """Initialize Google Sheets authentication"""
         try:
+            import gspread
+            from oauth2client.service_account import ServiceAccountCredentials
+            
             # Update this path to your credentials
             creds_path = os.environ.get('GOOGLE_CREDS_PATH', '/app/credentials/google-creds.json')
             scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
@@ -39,6 +45,10 @@ class ScraperIntegration:
             
     def setup_selenium_driver(self):
         """Setup headless Chrome driver for scraping"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from fake_useragent import UserAgent
+        
         options = Options()
         options.add_argument('--headless')
         options.add_argument('--no-sandbox')
@@ -61,13 +71,14 @@ class ScraperIntegration:
         
     async def scrape_model(self, model_number: str, prefix: str = "") -> Dict:
         """Scrape data for a single model"""
+        profile = get_profile("google_shopping")
         driver = None
         try:
             driver = self.setup_selenium_driver()
             
             # Build search URL
             search_query = f"{prefix}{model_number}".strip()
-            url = f"https://www.google.com/search?q={search_query}"
+            url = profile.url(query=search_query)
             
             driver.get(url)
             await asyncio.sleep(2)  # Wait for page load
@@ -81,22 +92,14 @@ class ScraperIntegration:
                 "data": {}
             }
             
-            # Try to find product information
+            # Shopping results, extracted from one page snapshot by the google_shopping profile
             try:
-                # Look for shopping results or product info
-                product_elements = driver.find_elements(By.CSS_SELECTOR, "[data-docid]")
-                
-                for element in product_elements[:5]:  # Get first 5 results
-                    try:
-                        title = element.find_element(By.CSS_SELECTOR, "h3").text
-                        price = element.find_element(By.CSS_SELECTOR, "[aria-label*='price']").text
-                        
-                        results["data"][title] = {
-                            "price": price,
-                            "source": "Google Shopping"
-                        }
-                    except:
-                        continue
+                extracted = profile.extract(driver.page_source, url)
+                for product in extracted.get("products", []):
+                    results["data"][product["title"]] = {
+                        "price": product["price"],
+                        "source": "Google Shopping"
+                    }
                         
             except Exception as e:
                 print(f"Error extracting product data: {str(e)}")
@@ -154,43 +157,57 @@ class ScraperIntegration:
             "timestamp": datetime.now().isoformat()
         }
         
-    def save_to_sheets(self, results: Dict, sheet_name: str = "ULTRATHINK_Results"):
-        """Save results to Google Sheets"""
+    def _open_sheet_sync(self, sheet_name: str) -> SheetSync:
+        """Runs on the sync thread: authenticate, open or create the sheet"""
+        if not self.gc:
+            self.setup_google_auth()
+        if not self.gc:
+            raise Exception("Google Sheets not authenticated")
         try:
-            if not self.gc:
-                raise Exception("Google Sheets not authenticated")
-                
-            # Try to open existing sheet or create new one
-            try:
-                sheet = self.gc.open(sheet_name)
-                worksheet = sheet.sheet1
-            except:
-                # Create new spreadsheet
-                sheet = self.gc.create(sheet_name)
-                worksheet = sheet.sheet1
-                
-            # Prepare data for sheets
-            rows = [["Timestamp", "Model", "Prefix", "Status", "Items Found", "Data"]]
-            
-            for result in results.get("results", []):
-                row = [
-                    result.get("timestamp", ""),
-                    result.get("model", ""),
-                    result.get("prefix", ""),
-                    result.get("status", ""),
-                    result.get("items_found", 0),
-                    json.dumps(result.get("data", {}))
-                ]
-                rows.append(row)
-                
-            # Clear and update sheet
-            worksheet.clear()
-            worksheet.update(rows)
+            sheet = self.gc.open(sheet_name)
+        except Exception:
+            sheet = self.gc.create(sheet_name)
+        # Rows are identified by model and prefix
+        return SheetSync(sheet.sheet1, SHEET_HEADER, key=lambda row: (row[1], row[2]))
+
+    def save_to_sheets(self, results: Dict, sheet_name: str = "ULTRATHINK_Results", wait: bool = False):
+        """
+        Queue results for Google Sheets. Only new and changed rows are written,
+        in the background; wait=True blocks until this snapshot is in the sheet.
+        """
+        rows = [
+            [
+                result.get("timestamp", ""),
+                result.get("model", ""),
+                result.get("prefix", ""),
+                result.get("status", ""),
+                result.get("items_found", 0),
+                json.dumps(result.get("data", {}))
+            ]
+            for result in results.get("results", [])
+        ]
+        
+        try:
+            worker = self.sheet_syncs.get(sheet_name)
+            if worker is None:
+                if not self.sheet_syncs:
+                    # Queued rows would be lost with the daemon thread if the process just exited
+                    atexit.register(self.close_sheets)
+                worker = self.sheet_syncs[sheet_name] = SheetSyncWorker(
+                    lambda: self._open_sheet_sync(sheet_name), name=f"sheets-{sheet_name}"
+                )
+            worker.submit(rows)
+            if not wait:
+                return {"success": True, "queued": True, "rows": len(rows)}
             
+            worker.flush()
+            if worker.last_error:
+                return {"success": False, "error": worker.last_error}
             return {
                 "success": True,
-                "sheet_url": sheet.url,
-                "rows_written": len(rows) - 1
+                "sheet_url": worker.sheet.worksheet.spreadsheet.url,
+                "rows_written": worker.last_result["appended"] + worker.last_result["updated"],
+                **worker.last_result
             }
             
         except Exception as e:
@@ -198,10 +215,19 @@ class ScraperIntegration:
                 "success": False,
                 "error": str(e)
             }
+    
+    def close_sheets(self, timeout: float = 30):
+        """Finish pending Sheets writes; runs at interpreter exit if not called earlier"""
+        for worker in self.sheet_syncs.values():
+            worker.stop(timeout)
+        self.sheet_syncs.clear()
+        atexit.unregister(self.close_sheets)
             
     def export_to_excel(self, results: Dict, filename: str = "ultrathink_results.xlsx"):
         """Export results to Excel file"""
         try:
+            import pandas as pd
+            
             # Convert results to DataFrame
             data = []
             for result in results.get("results", []):
@@ -231,23 +257,9 @@ class ScraperIntegration:
             output_path = f"/app/outputs/{filename}"
             os.makedirs("/app/outputs", exist_ok=True)
             
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Results', index=False)
-                
-                # Auto-adjust columns
-                worksheet = writer.sheets['Results']
-                for column in worksheet.columns:
-                    max_length = 0
-                    column = [cell for cell in column]
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(cell.value)
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 50)
-                    worksheet.column_dimensions[column[0].column_letter].width = adjusted_width
-                    
+            # Widths come from the DataFrame, so the sheet is written in one pass
+            write_excel(df, output_path, sheet_name='Results')
+            
             return {
                 "success": True,
                 "path": output_path,
@@ -260,5 +272,12 @@ class ScraperIntegration:
                 "error": str(e)
             }
 
-# Global instance
-scraper_service = ScraperIntegration()
\ No newline at end of file
+# Global instance, created by the app lifespan (or on first use)
+scraper_service: Optional[ScraperIntegration] = None
+
+def get_scraper_service() -> ScraperIntegration:
+    """Return the process-wide ScraperIntegration, creating it if needed"""
+    global scraper_service
+    if scraper_service is None:
+        scraper_service = ScraperIntegration()
+    return scraper_service
\ No newline at end of file
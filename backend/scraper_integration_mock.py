@@ -75,7 +75,7 @@ class ScraperIntegrationMock:
             "note": "This is mock data for testing purposes"
         }
         
-    def save_to_sheets(self, results: Dict, sheet_name: str = "ULTRATHINK_Results"):
+    def save_to_sheets(self, results: Dict, sheet_name: str = "ULTRATHINK_Results", wait: bool = False):
         """Mock save to Google Sheets"""
         return {
             "success": True,
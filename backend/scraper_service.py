@@ -5,11 +5,18 @@ Integrates main.py scraper with FastAPI backend
 import sys
 import os
 import asyncio
-import json
+import importlib
+import importlib.util
 import traceback
-from typing import List, Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Dict, Optional, Any
 from datetime import datetime
 import logging
+import time
+
+from app.services.metrics import DRIVER_POOL_IN_USE, DRIVER_POOL_SIZE, MODELS_SCRAPED, SCRAPE_STAGE_SECONDS
+from app.services.stage_timer import format_summary, summarize_timings
 
 # Add current directory to path for scraper imports
 sys.path.append('/app')
@@ -18,225 +25,312 @@ sys.path.append('/app')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-try:
-    # Import the main scraper
-    from scraper_main import *
-    SCRAPER_AVAILABLE = True
-    logger.info("✅ Scraper imported successfully")
-except ImportError as e:
-    SCRAPER_AVAILABLE = False
-    logger.error(f"❌ Failed to import scraper: {e}")
+# Each scrape drives its own Chrome instance, so the pool is sized by how many
+# browsers the host can run rather than by CPU-bound work.
+SCRAPER_MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Pause after each model before its slot takes the next one, so the target site
+# sees at most SCRAPER_MAX_WORKERS requests per delay
+SCRAPER_MODEL_DELAY = float(os.getenv("SCRAPER_MODEL_DELAY", "0.5"))
+
+@dataclass(frozen=True)
+class ScraperEntry:
+    """An explicit scraper entry point, e.g. "KatomScraper.scrape_katom" in scraper_wrapper"""
+    name: str
+    module: str
+    target: str
+    # True: called as fn(model, prefix); False: called as fn(prefix + model)
+    takes_prefix: bool = True
+
+    @property
+    def path(self) -> str:
+        return f"{self.module}:{self.target}"
+
+# Tried in order; the first one that resolves is used for every model.
+# SCRAPER_ENTRY="module:Class.method" (or "module:function") puts a custom
+# entry in front of these.
+SCRAPER_REGISTRY: List[ScraperEntry] = [
+    ScraperEntry("katom", "scraper_wrapper", "KatomScraper.scrape_katom"),
+]
+
+def _configured_registry() -> List[ScraperEntry]:
+    registry = list(SCRAPER_REGISTRY)
+    custom = os.getenv("SCRAPER_ENTRY")
+    if custom and ":" in custom:
+        module, target = custom.split(":", 1)
+        registry.insert(0, ScraperEntry("custom", module, target))
+    return registry
+
+# Only locate the modules here; importing them pulls in Selenium and friends
+SCRAPER_AVAILABLE = any(importlib.util.find_spec(e.module) is not None for e in _configured_registry())
+
+class ScrapeFailed(Exception):
+    """The scraper ran but reported the product as not found or errored"""
+
+def _failure_reason(result: Any) -> Optional[str]:
+    # KatomScraper.scrape_katom always returns a dict; failures are flagged inside it
+    if isinstance(result, dict):
+        if result.get("error"):
+            return str(result["error"])
+        if result.get("found") is False:
+            return "Product not found"
+    return None
+
+def _record_timings(record: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    # Scrapers that time their stages put {stage: ms} under "timings" in the raw result
+    data = record.get("data")
+    return data.get("timings") if isinstance(data, dict) else None
+
+def resolve_entry(entry: ScraperEntry) -> Callable[..., Any]:
+    """Import the entry's module and return a bound callable for it"""
+    module = importlib.import_module(entry.module)
+    owner, _, attr = entry.target.rpartition(".")
+    if owner:
+        # Class-based scrapers are instantiated once and their method reused
+        instance = getattr(module, owner)()
+        return getattr(instance, attr)
+    return getattr(module, attr)
+
+def _public_callables(module_name: str) -> List[str]:
+    module = sys.modules.get(module_name)
+    if module is None:
+        return []
+    return sorted(name for name in dir(module)
+                  if not name.startswith('_') and callable(getattr(module, name)))
 
 class ScraperService:
-    def __init__(self):
-        self.scraper_available = SCRAPER_AVAILABLE
+    def __init__(self, registry: Optional[List[ScraperEntry]] = None, max_workers: int = SCRAPER_MAX_WORKERS,
+                 model_delay: float = SCRAPER_MODEL_DELAY):
+        self.registry = registry if registry is not None else _configured_registry()
+        self.scraper_available = SCRAPER_AVAILABLE if registry is None else bool(registry)
         self.active_jobs = {}
-        
+        self.max_workers = max_workers
+        self.model_delay = model_delay
+        self.entry: Optional[ScraperEntry] = None
+        self.startup_report: Dict[str, Any] = {}
+        self._scrape_fn: Optional[Callable[..., Any]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._resolve_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def start(self):
+        """Resolve the scraper entry point in the background (called from the app lifespan)"""
+        if self._closed:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scraper")
+            DRIVER_POOL_SIZE.labels(pool="scraper").set(self.max_workers)
+        if self._resolve_task is None:
+            self._resolve_task = asyncio.create_task(self._resolve())
+
+    async def shutdown(self):
+        self._closed = True
+        if self._resolve_task is not None and not self._resolve_task.done():
+            self._resolve_task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _resolve(self):
+        """Walk the registry once and keep the first callable that resolves"""
+        attempts = []
+        for entry in self.registry:
+            try:
+                fn = await asyncio.to_thread(resolve_entry, entry)
+            except Exception as e:
+                attempts.append({"entry": entry.path, "error": f"{type(e).__name__}: {e}"})
+                continue
+            self.entry, self._scrape_fn = entry, fn
+            attempts.append({"entry": entry.path, "resolved": True})
+            break
+
+        self.scraper_available = self._scrape_fn is not None
+        self.startup_report = {
+            "resolved": self.entry.path if self.entry else None,
+            "attempts": attempts,
+            "max_workers": self.max_workers,
+            # The old per-model dir() dump, produced once for diagnostics
+            "available_functions": {e.module: _public_callables(e.module)[:20] for e in self.registry
+                                    if e.module in sys.modules},
+        }
+        if self.entry:
+            logger.info(f"✅ Scraper entry point resolved: {self.entry.path} ({self.max_workers} workers)")
+        else:
+            logger.error(f"❌ No scraper entry point resolved: {self.startup_report}")
+
+    async def _get_scrape_fn(self) -> Optional[Callable[..., Any]]:
+        """The resolved callable, or None if nothing resolved or the service is shut down"""
+        if self._closed:
+            return None
+        if self._resolve_task is None:
+            await self.start()
+        try:
+            await asyncio.shield(self._resolve_task)
+        except asyncio.CancelledError:
+            # shutdown() cancelled resolution; only propagate our own cancellation
+            if not self._resolve_task.cancelled():
+                raise
+            return None
+        if self._closed:
+            return None
+        return self._scrape_fn
+
     async def scrape_models(self, job_id: str, models: List[str], prefix: str = "") -> Dict[str, Any]:
         """
         Scrape multiple models and return results
         """
-        if not self.scraper_available:
+        scrape_fn = await self._get_scrape_fn() if self.scraper_available else None
+        if scrape_fn is None:
             return {
                 "success": False,
                 "error": "Scraper not available",
                 "results": [],
                 "failed": len(models)
             }
-        
+
         results = []
         errors = []
-        
-        try:
-            # Mark job as running
-            self.active_jobs[job_id] = {
-                "status": "running",
-                "progress": 0,
-                "total": len(models),
-                "current_model": None
-            }
-            
-            for i, model in enumerate(models):
+
+        # Mark job as running
+        job_state = self.active_jobs[job_id] = {
+            "status": "running",
+            "progress": 0,
+            "total": len(models),
+            # Models being scraped right now, up to max_workers of them
+            "in_flight": []
+        }
+        # Only max_workers models are started at a time, each followed by the delay
+        slots = asyncio.Semaphore(self.max_workers)
+
+        async def scrape_slot(model: str):
+            async with slots:
+                job_state["in_flight"].append(model)
                 try:
-                    # Update progress
-                    self.active_jobs[job_id]["current_model"] = model
-                    self.active_jobs[job_id]["progress"] = i
-                    
-                    logger.info(f"🔍 Scraping model: {model}")
-                    
-                    # Call your actual scraper function here
-                    # This depends on what functions are available in your main.py
-                    # Common patterns:
-                    # result = scrape_model(model, prefix)
-                    # result = main_scraper(model)
-                    # result = process_model(model, prefix)
-                    
-                    # For now, create a placeholder that you can replace
-                    result = await self._scrape_single_model(model, prefix)
-                    
-                    if result:
-                        results.append({
-                            "model": model,
-                            "status": "success",
-                            "data": result,
-                            "timestamp": datetime.now().isoformat()
-                        })
-                        logger.info(f"✅ Successfully scraped: {model}")
-                    else:
-                        errors.append({
-                            "model": model,
-                            "error": "No data returned",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                        
-                except Exception as e:
-                    error_msg = f"Error scraping {model}: {str(e)}"
-                    logger.error(error_msg)
-                    errors.append({
-                        "model": model,
-                        "error": error_msg,
-                        "traceback": traceback.format_exc(),
-                        "timestamp": datetime.now().isoformat()
-                    })
-                
-                # Small delay between models
-                await asyncio.sleep(0.5)
-            
+                    return await scrape_one(model)
+                finally:
+                    job_state["in_flight"].remove(model)
+                    if self.model_delay:
+                        await asyncio.sleep(self.model_delay)
+
+        async def scrape_one(model: str):
+            logger.info(f"🔍 Scraping model: {model}")
+            try:
+                result = await self._scrape_single_model(scrape_fn, model, prefix)
+            except ScrapeFailed as e:
+                logger.warning(f"⚠️ {model}: {e}")
+                MODELS_SCRAPED.labels(result="failed").inc()
+                return None, {
+                    "model": model,
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat()
+                }
+            except Exception as e:
+                error_msg = f"Error scraping {model}: {str(e)}"
+                logger.error(error_msg)
+                MODELS_SCRAPED.labels(result="failed").inc()
+                return None, {
+                    "model": model,
+                    "error": error_msg,
+                    "traceback": traceback.format_exc(),
+                    "timestamp": datetime.now().isoformat()
+                }
+            finally:
+                job_state["progress"] += 1
+
+            MODELS_SCRAPED.labels(result="success" if result else "failed").inc()
+            if result:
+                logger.info(f"✅ Successfully scraped: {model}")
+                return {
+                    "model": model,
+                    "status": "success",
+                    "data": result,
+                    "timestamp": datetime.now().isoformat()
+                }, None
+            return None, {
+                "model": model,
+                "error": "No data returned",
+                "timestamp": datetime.now().isoformat()
+            }
+
+        try:
+            outcomes = await asyncio.gather(*(scrape_slot(model) for model in models))
+            for result, error in outcomes:
+                if result:
+                    results.append(result)
+                if error:
+                    errors.append(error)
+
             # Mark job as completed
-            self.active_jobs[job_id]["status"] = "completed"
-            self.active_jobs[job_id]["progress"] = len(models)
-            
+            job_state["status"] = "completed"
+            job_state["progress"] = len(models)
+
         except Exception as e:
             logger.error(f"❌ Job {job_id} failed: {e}")
-            self.active_jobs[job_id]["status"] = "failed"
-            self.active_jobs[job_id]["error"] = str(e)
-        
+            job_state["status"] = "failed"
+            job_state["error"] = str(e)
+
+        timings = summarize_timings(_record_timings(r["data"]) for r in results)
+        if timings:
+            logger.info(f"⏱️ Job {job_id} stage timings: {format_summary(timings)}")
+
         return {
             "success": len(errors) == 0,
             "successful": len(results),
             "failed": len(errors),
             "results": results,
             "errors": errors,
+            "timings": timings,
             "job_id": job_id
         }
-    
-        async def _scrape_single_model(self, model: str, prefix: str = "") -> Optional[Dict]:
+
+    async def _scrape_single_model(self, scrape_fn: Callable[..., Any], model: str, prefix: str = "") -> Optional[Dict]:
         """
-        Scrape a single model using your actual scraper - UPDATED FOR REAL SCRAPING
+        Run the resolved scraper for one model on the browser thread pool
         """
-        try:
-            logger.info(f"🔍 Starting real scrape for model: {model}")
-            
-            # METHOD 1: If your scraper has a main() function that takes arguments
-            if hasattr(sys.modules['scraper_main'], 'main'):
-                try:
-                    # Try calling main with model name
-                    result = sys.modules['scraper_main'].main(model_name=f"{prefix}{model}")
-                    if result:
-                        return {
-                            "model_name": f"{prefix}{model}",
-                            "scraped_at": datetime.now().isoformat(),
-                            "data": result,
-                            "source": "main_function",
-                            "method": "main(model_name)"
-                        }
-                except Exception as e:
-                    logger.warning(f"Method 1 failed: {e}")
-            
-            # METHOD 2: If your scraper has a specific scraping function
-            scraper_functions = ['scrape_model', 'process_model', 'download_model', 'fetch_model']
-            for func_name in scraper_functions:
-                if hasattr(sys.modules['scraper_main'], func_name):
-                    try:
-                        func = getattr(sys.modules['scraper_main'], func_name)
-                        result = func(f"{prefix}{model}")
-                        if result:
-                            return {
-                                "model_name": f"{prefix}{model}",
-                                "scraped_at": datetime.now().isoformat(),
-                                "data": result,
-                                "source": func_name,
-                                "method": f"{func_name}(model)"
-                            }
-                    except Exception as e:
-                        logger.warning(f"Method {func_name} failed: {e}")
-            
-            # METHOD 3: If your scraper uses a class-based approach
-            scraper_classes = ['Scraper', 'MKScraper', 'ModelScraper', 'Processor']
-            for class_name in scraper_classes:
-                if hasattr(sys.modules['scraper_main'], class_name):
-                    try:
-                        scraper_class = getattr(sys.modules['scraper_main'], class_name)
-                        scraper_instance = scraper_class()
-                        
-                        # Try common method names
-                        for method in ['scrape', 'process', 'run', 'execute']:
-                            if hasattr(scraper_instance, method):
-                                result = getattr(scraper_instance, method)(f"{prefix}{model}")
-                                if result:
-                                    return {
-                                        "model_name": f"{prefix}{model}",
-                                        "scraped_at": datetime.now().isoformat(),
-                                        "data": result,
-                                        "source": f"{class_name}.{method}",
-                                        "method": f"class_based"
-                                    }
-                    except Exception as e:
-                        logger.warning(f"Class method {class_name} failed: {e}")
-            
-            # METHOD 4: Try to call main() without parameters and see what happens
-            if hasattr(sys.modules['scraper_main'], 'main'):
-                try:
-                    # Some scrapers expect model name in a global variable or config
-                    result = sys.modules['scraper_main'].main()
-                    if result:
-                        return {
-                            "model_name": f"{prefix}{model}",
-                            "scraped_at": datetime.now().isoformat(),
-                            "data": result,
-                            "source": "main_no_params",
-                            "method": "main()"
-                        }
-                except Exception as e:
-                    logger.warning(f"Method main() no params failed: {e}")
-            
-            # If all methods fail, return diagnostic info
-            logger.error(f"❌ All scraping methods failed for {model}")
-            available_functions = [name for name in dir(sys.modules['scraper_main']) 
-                                 if callable(getattr(sys.modules['scraper_main'], name)) 
-                                 and not name.startswith('_')]
-            
-            return {
-                "model_name": f"{prefix}{model}",
-                "scraped_at": datetime.now().isoformat(),
-                "data": {
-                    "status": "scraper_integration_needed",
-                    "message": "Real scraper found but integration method unclear",
-                    "available_functions": available_functions[:10],  # Limit output
-                    "suggestion": "Check available_functions and update _scrape_single_model accordingly"
-                },
-                "source": "diagnostic",
-                "method": "auto_discovery"
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ Critical error in _scrape_single_model: {e}")
-            return {
-                "model_name": f"{prefix}{model}",
-                "scraped_at": datetime.now().isoformat(),
-                "data": {"error": str(e), "traceback": traceback.format_exc()},
-                "source": "error",
-                "method": "exception_handler"
-            }
-    
+        if self._executor is None:
+            raise RuntimeError("Scraper service is shut down")
+        loop = asyncio.get_running_loop()
+        args = (model, prefix) if self.entry.takes_prefix else (f"{prefix}{model}",)
+        submitted = time.perf_counter()
+
+        def run():
+            SCRAPE_STAGE_SECONDS.labels(stage="queue_wait").observe(time.perf_counter() - submitted)
+            with DRIVER_POOL_IN_USE.labels(pool="scraper").track_inprogress(), \
+                    SCRAPE_STAGE_SECONDS.labels(stage="model").time():
+                return scrape_fn(*args)
+
+        result = await loop.run_in_executor(self._executor, run)
+
+        if not result:
+            return None
+        reason = _failure_reason(result)
+        if reason:
+            raise ScrapeFailed(reason)
+        return {
+            "model_name": f"{prefix}{model}",
+            "scraped_at": datetime.now().isoformat(),
+            "data": result,
+            "source": self.entry.name,
+            "method": self.entry.target
+        }
+
     def get_job_status(self, job_id: str) -> Optional[Dict]:
         """Get status of a running job"""
         return self.active_jobs.get(job_id)
-    
+
     def is_available(self) -> bool:
         """Check if scraper is available"""
         return self.scraper_available
 
-# Global scraper service instance
-scraper_service = ScraperService()
+    def get_startup_report(self) -> Dict[str, Any]:
+        """One-time diagnostic report produced when the entry point was resolved"""
+        return self.startup_report
+
+# Global scraper service instance, created by the app lifespan (or on first use)
+scraper_service: Optional[ScraperService] = None
 
+def get_scraper_service() -> ScraperService:
+    """Return the process-wide ScraperService, creating it if needed"""
+    global scraper_service
+    if scraper_service is None:
+        scraper_service = ScraperService()
+    return scraper_service
@@ -5,23 +5,68 @@ Integrates the main.py scraper into the FastAPI backend
 """
 
 import asyncio
+import os
+import threading
 import time
 import traceback
-import re
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import TimeoutException
 from fake_useragent import UserAgent
 import logging
+import requests
+
+from app.scraping.katom import KATOM_PROFILE, extract_product
+from app.services.stage_timer import StageTimer, format_summary, summarize_timings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Point at a local fixture server (benchmarks/fixture_server.py) to scrape offline
+KATOM_BASE_URL = os.getenv("KATOM_BASE_URL", "https://www.katom.com").rstrip("/")
+HTTP_TIMEOUT = float(os.getenv("KATOM_HTTP_TIMEOUT", "15"))
+
+_http = threading.local()
+
+def _http_session() -> requests.Session:
+    """One keep-alive session per worker thread"""
+    session = getattr(_http, "session", None)
+    if session is None:
+        session = _http.session = requests.Session()
+        session.headers["User-Agent"] = UserAgent().random
+    return session
+
+def clean_model_number(model_number: str) -> str:
+    model_number = ''.join(e for e in model_number if e.isalnum()).upper()
+    if model_number.endswith("HC"):
+        model_number = model_number[:-2]
+    return model_number
+
+def katom_url(model_number: str, prefix: str = "") -> str:
+    return f"{KATOM_BASE_URL}/{prefix}-{model_number}.html"
+
+def empty_result(model_number: str, url: str) -> Dict:
+    return {
+        "model": model_number,
+        "url": url,
+        "title": "Title not found",
+        "description": "Description not found",
+        "specs": {},
+        "specs_html": "",
+        "price": "",
+        "main_image": "",
+        "additional_images": [],
+        "video_links": "",
+        "found": False,
+        "error": None,
+        "timings": {}
+    }
+
 class KatomScraper:
     """Katom.com product scraper"""
     
@@ -43,55 +88,8 @@ class KatomScraper:
             progress = int((current / total) * 100) if total > 0 else 0
             self.progress_callback(progress, status)
             
-    def extract_table_data(self, driver) -> Tuple[Dict, str]:
-        """Extract specifications table data"""
-        specs_dict = {}
-        specs_html = ""
-        
-        try:
-            # Find specs table
-            specs_tables = driver.find_elements(By.CSS_SELECTOR, "table.table.table-condensed.specs-table")
-            if not specs_tables:
-                specs_tables = driver.find_elements(By.TAG_NAME, "table")
-                
-            if specs_tables:
-                table = specs_tables[0]
-                rows = table.find_elements(By.TAG_NAME, "tr")
-                
-                specs_html = '<table class="specs-table" style="border-collapse:collapse;"><tbody>'
-                
-                for row in rows:
-                    cells = row.find_elements(By.TAG_NAME, "td")
-                    if len(cells) >= 2:
-                        key = cells[0].text.strip()
-                        value = cells[1].text.strip()
-                        
-                        if key and value:
-                            specs_dict[key] = value
-                            specs_html += f'<tr><td style="padding:5px;border:1px solid #ddd;"><b>{key}</b></td>'
-                            specs_html += f'<td style="padding:5px;border:1px solid #ddd;">{value}</td></tr>'
-                
-                specs_html += "</tbody></table>"
-                
-        except Exception as e:
-            logger.error(f"Error extracting table data: {e}")
-            
-        return specs_dict, specs_html
-    
-    def scrape_katom(self, model_number: str, prefix: str = "", retries: int = 2) -> Dict:
-        """
-        Scrape a single Katom product
-        Returns dict with all scraped data
-        """
-        # Clean model number
-        model_number = ''.join(e for e in model_number if e.isalnum()).upper()
-        if model_number.endswith("HC"):
-            model_number = model_number[:-2]
-            
-        url = f"https://www.katom.com/{prefix}-{model_number}.html"
-        logger.info(f"Scraping URL: {url}")
-        
-        # Setup Chrome options
+    def create_driver(self):
+        """A headless Chrome configured the way scrape_katom expects"""
         options = Options()
         options.add_argument('--headless')
         options.add_argument('--no-sandbox')
@@ -99,125 +97,51 @@ class KatomScraper:
         options.add_argument('--disable-gpu')
         options.add_argument('--window-size=1920,1080')
         options.add_argument(f'user-agent={UserAgent().random}')
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(30)
+        return driver
+
+    def scrape_katom(self, model_number: str, prefix: str = "", retries: int = 2, driver=None) -> Dict:
+        """
+        Scrape a single Katom product
+        Returns dict with all scraped data, including per-stage "timings" in ms.
+        A driver passed in is borrowed: it is reused as is and not quit.
+        """
+        timer = StageTimer()
+        model_number = clean_model_number(model_number)
+        url = katom_url(model_number, prefix)
+        logger.info(f"Scraping URL: {url}")
         
-        driver = None
-        result = {
-            "model": model_number,
-            "url": url,
-            "title": "Title not found",
-            "description": "Description not found",
-            "specs": {},
-            "specs_html": "",
-            "price": "",
-            "main_image": "",
-            "additional_images": [],
-            "video_links": "",
-            "found": False,
-            "error": None
-        }
+        borrowed = driver is not None
+        result = empty_result(model_number, url)
         
         try:
-            driver = webdriver.Chrome(options=options)
-            driver.set_page_load_timeout(30)
+            if not borrowed:
+                driver = self.create_driver()
+            timer.lap("driver_startup")
             driver.get(url)
+            timer.lap("page_load")
             
             # Check if product exists
             if "404" in driver.title or "not found" in driver.title.lower():
                 result["error"] = "Product not found"
+                result["timings"] = timer.as_dict()
                 return result
             
             # Wait for page to load
             try:
                 WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "h1.product-name.mb-0, h1"))
+                    EC.presence_of_element_located((By.CSS_SELECTOR, ", ".join(KATOM_PROFILE.selectors("title"))))
                 )
             except TimeoutException:
                 logger.warning("Timeout waiting for page load")
+            timer.lap("title_wait")
             
-            # Extract title
-            try:
-                title_selectors = ["h1.product-name.mb-0", "h1.product-title", "h1[itemprop='name']", "h1"]
-                for selector in title_selectors:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements and elements[0].text.strip():
-                        result["title"] = elements[0].text.strip()
-                        result["found"] = True
-                        break
-            except Exception as e:
-                logger.error(f"Error getting title: {e}")
-            
-            # Only continue if product was found
-            if result["found"]:
-                # Extract price
-                try:
-                    price_selectors = [".price-now", ".product-price", "[itemprop='price']", ".price"]
-                    for selector in price_selectors:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            price_text = elements[0].text.strip()
-                            # Extract numeric price
-                            price_match = re.search(r'[\d,]+\.\d{2}', price_text)
-                            if price_match:
-                                result["price"] = price_match.group(0).replace(',', '')
-                                break
-                except Exception as e:
-                    logger.error(f"Error extracting price: {e}")
-                
-                # Extract main image
-                try:
-                    img_selectors = [".main-image img", ".product-image img", "#product-image img", ".primary-image img"]
-                    for selector in img_selectors:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            src = elements[0].get_attribute("src")
-                            if src:
-                                result["main_image"] = src
-                                break
-                except Exception as e:
-                    logger.error(f"Error extracting main image: {e}")
-                
-                # Extract description
-                try:
-                    # Try to find tab content first
-                    tab_content = driver.find_elements(By.CLASS_NAME, "tab-content")
-                    if tab_content:
-                        paragraphs = tab_content[0].find_elements(By.TAG_NAME, "p")
-                        filtered = []
-                        for p in paragraphs:
-                            p_text = p.text.strip()
-                            if p_text and not p_text.lower().startswith("*free") and "video" not in p_text.lower():
-                                filtered.append(f"<p>{p_text}</p>")
-                        if filtered:
-                            result["description"] = "".join(filtered)
-                    else:
-                        # Try alternative selectors
-                        desc_selectors = [".product-description", ".description", "[class*='description']"]
-                        for selector in desc_selectors:
-                            elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                            if elements and elements[0].text.strip():
-                                result["description"] = f"<p>{elements[0].text.strip()}</p>"
-                                break
-                except Exception as e:
-                    logger.error(f"Error getting description: {e}")
-                
-                # Extract specifications
-                specs_dict, specs_html = self.extract_table_data(driver)
-                result["specs"] = specs_dict
-                result["specs_html"] = specs_html
-                
-                # Extract additional images
-                try:
-                    thumb_selectors = [".additional-images img", ".product-thumbnails img", ".thumb-image"]
-                    for selector in thumb_selectors:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            for element in elements[:5]:  # Limit to 5 images
-                                src = element.get_attribute("src")
-                                if src and src != result["main_image"]:
-                                    result["additional_images"].append(src)
-                            break
-                except Exception as e:
-                    logger.error(f"Error extracting additional images: {e}")
+            # Extract everything from one DOM snapshot with the compiled katom profile
+            product = extract_product(driver.page_source, driver.current_url)
+            timer.lap("extract")
+            if product["found"]:
+                result.update(product)
                 
         except Exception as e:
             logger.error(f"Error in scrape_katom: {e}")
@@ -225,21 +149,58 @@ class KatomScraper:
             result["error"] = str(e)
             
             if retries > 0 and self.running:
-                if driver:
+                if driver and not borrowed:
                     try:
                         driver.quit()
                     except:
                         pass
+                    driver = None
                 time.sleep(2)
-                return self.scrape_katom(model_number, prefix, retries - 1)
+                return self.scrape_katom(model_number, prefix, retries - 1, driver if borrowed else None)
                 
         finally:
-            if driver:
+            if driver and not borrowed:
                 try:
                     driver.quit()
                 except:
                     pass
         
+        result["timings"] = timer.as_dict()
+        return result
+
+    def scrape_katom_http(self, model_number: str, prefix: str = "", fallback: bool = True) -> Dict:
+        """
+        HTTP-first scrape: fetch the page without a browser and extract it from
+        the HTML, falling back to scrape_katom when that finds no product
+        (e.g. the page needs JavaScript). 404s are final either way.
+        """
+        timer = StageTimer()
+        model_number = clean_model_number(model_number)
+        url = katom_url(model_number, prefix)
+        result = empty_result(model_number, url)
+        
+        try:
+            response = _http_session().get(url, timeout=HTTP_TIMEOUT)
+            timer.lap("http_fetch")
+            if response.status_code == 404:
+                result["error"] = "Product not found"
+            else:
+                response.raise_for_status()
+                result.update(extract_product(response.text, url))
+                timer.lap("parse")
+        except requests.RequestException as e:
+            logger.warning(f"HTTP fetch failed for {url}: {e}")
+            result["error"] = str(e)
+        
+        if result["found"] or result["error"] == "Product not found" or not fallback:
+            result["timings"] = timer.as_dict()
+            return result
+        
+        # Charge the failed HTTP attempt to the browser scrape that replaces it
+        http_timings = timer.as_dict()
+        result = self.scrape_katom(model_number, prefix)
+        result["timings"]["http_attempt"] = http_timings["total"]
+        result["timings"]["total"] = round(result["timings"].get("total", 0) + http_timings["total"], 1)
         return result
     
     async def scrape_multiple(self, models: List[str], prefix: str = "") -> Dict:
@@ -248,6 +209,7 @@ class KatomScraper:
         """
         results = []
         errors = []
+        timings = []
         total = len(models)
         
         logger.info(f"Starting to scrape {total} models with prefix: {prefix}")
@@ -263,6 +225,7 @@ class KatomScraper:
                 # Run scraper in thread pool to avoid blocking
                 loop = asyncio.get_event_loop()
                 result = await loop.run_in_executor(None, self.scrape_katom, model, prefix)
+                timings.append(result.get("timings"))
                 
                 if result["found"]:
                     results.append(result)
@@ -286,12 +249,17 @@ class KatomScraper:
         
         self._update_progress(total, total, "Completed")
         
+        timing_summary = summarize_timings(timings)
+        if timing_summary:
+            logger.info(f"Stage timings: {format_summary(timing_summary)}")
+        
         return {
             "successful": len(results),
             "failed": len(errors),
             "total": total,
             "results": results,
-            "errors": errors
+            "errors": errors,
+            "timings": timing_summary
         }
 
 # Global scraper instance
@@ -0,0 +1,69 @@
+import re
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.database import Base, HtmlBlob, ScrapedData
+from app.services.blob_store import HtmlBlobStore, content_hash
+from app.utils import compression
+
+PAGE = "<html><body>" + "<p>Commercial fryer, 40 lb capacity</p>" * 500 + "</body></html>"
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield engine, session
+    session.close()
+    engine.dispose()
+
+def test_identical_pages_are_stored_once_and_compressed(db):
+    engine, session = db
+    store = HtmlBlobStore()
+    for week in range(3):
+        session.add(store.attach(session, ScrapedData(url=f"https://x/{week}", domain="x"), PAGE))
+    session.add(store.attach(session, ScrapedData(url="https://x/other", domain="x"), PAGE + "<!-- v2 -->"))
+    session.commit()
+
+    assert session.scalar(select(func.count()).select_from(HtmlBlob)) == 2
+    blob = session.get(HtmlBlob, content_hash(PAGE.encode()))
+    assert blob.codec == compression.default_codec()
+    assert blob.size == len(PAGE)
+    assert len(blob.data) * 10 < blob.size
+    assert store.get(session, blob.hash) == PAGE
+
+def test_raw_html_is_read_lazily(db):
+    engine, session = db
+    store = HtmlBlobStore()
+    session.add(store.attach(session, ScrapedData(url="https://x/1", domain="x"), PAGE))
+    session.add(ScrapedData(url="https://x/old", domain="x", legacy_raw_html="<p>inline</p>"))
+    session.commit()
+    session.expunge_all()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    records = session.scalars(select(ScrapedData).order_by(ScrapedData.id)).all()
+    assert not any("html_blobs" in s or re.search(r"raw_html(?!_hash)", s) for s in statements)
+
+    assert records[0].raw_html == PAGE
+    assert any("html_blobs" in s for s in statements)
+    assert records[1].raw_html == "<p>inline</p>"
+
+def test_inline_rows_migrate_into_the_store(db):
+    engine, session = db
+    for i in range(5):
+        session.add(ScrapedData(url=f"https://x/{i}", domain="x", legacy_raw_html=PAGE))
+    session.commit()
+
+    store = HtmlBlobStore(codec="zlib")
+    assert store.migrate_inline(session, batch_size=3) == 3
+    assert store.migrate_inline(session, batch_size=3) == 2
+    assert store.migrate_inline(session) == 0
+
+    session.expunge_all()
+    records = session.scalars(select(ScrapedData)).all()
+    assert {r.raw_html_hash for r in records} == {content_hash(PAGE.encode())}
+    assert all(r.legacy_raw_html is None and r.raw_html == PAGE for r in records)
+    assert session.scalar(select(func.count()).select_from(HtmlBlob)) == 1
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from app.services.broadcast import BroadcastHub
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+async def wait_until(predicate, timeout: float = 2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.005)
+
+@pytest_asyncio.fixture
+async def make_hub():
+    hubs = []
+
+    def factory(**kwargs):
+        hub = BroadcastHub(**kwargs)
+        hubs.append(hub)
+        return hub
+
+    try:
+        yield factory
+    finally:
+        for hub in hubs:
+            await hub.close_all()
+
+@pytest.mark.asyncio
+async def test_broadcast_reaches_all_clients_in_order(make_hub):
+    hub = make_hub()
+    a, b = FakeWebSocket(), FakeWebSocket()
+    await hub.connect(a, "a")
+    await hub.connect(b, "b")
+
+    for i in range(3):
+        assert await hub.broadcast({"n": i}) == 2
+    await wait_until(lambda: len(a.sent) == 3 and len(b.sent) == 3)
+
+    assert [json.loads(m)["n"] for m in a.sent] == [0, 1, 2]
+    assert a.sent == b.sent
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_delay_fast_client(make_hub):
+    hub = make_hub(send_timeout=5)
+    fast, slow = FakeWebSocket(), FakeWebSocket(delay=0.5)
+    await hub.connect(fast, "fast")
+    await hub.connect(slow, "slow")
+
+    for i in range(10):
+        await hub.broadcast({"n": i})
+    await wait_until(lambda: len(fast.sent) == 10, timeout=0.4)
+
+    assert len(slow.sent) < 10
+    assert hub.stats()["slow"]["lag_ms"] > 0
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_oldest(make_hub):
+    hub = make_hub(queue_size=4, send_timeout=5)
+    slow = FakeWebSocket(delay=1.0)
+    await hub.connect(slow, "slow")
+
+    for i in range(10):
+        await hub.broadcast({"n": i})
+
+    stats = hub.stats()["slow"]
+    assert stats["queued"] <= 4
+    assert stats["dropped"] > 0
+
+@pytest.mark.asyncio
+async def test_keyed_messages_coalesce_to_latest(make_hub):
+    hub = make_hub()
+    slow = FakeWebSocket(delay=0.05)
+    await hub.connect(slow, "slow")
+
+    await hub.broadcast({"n": "first"})
+    for i in range(5):
+        await hub.broadcast({"progress": i}, key=("progress", "job-1"))
+    await wait_until(lambda: slow.sent and json.loads(slow.sent[-1]) == {"progress": 4})
+
+    assert len(slow.sent) < 6
+
+@pytest.mark.asyncio
+async def test_stalled_client_is_disconnected(make_hub):
+    hub = make_hub(send_timeout=0.05)
+    stalled = FakeWebSocket(delay=10)
+    await hub.connect(stalled, "stalled")
+
+    await hub.broadcast({"n": 1})
+    await wait_until(lambda: "stalled" not in hub.active_connections)
+
+    assert stalled.closed_with == 1011
+
+@pytest.mark.asyncio
+async def test_stale_handler_cannot_evict_reconnected_client(make_hub):
+    hub = make_hub()
+    old = await hub.connect(FakeWebSocket(), "dash")
+    new = await hub.connect(FakeWebSocket(), "dash")
+
+    # The old handler sees its socket close and cleans up after itself
+    await hub.disconnect("dash", close=False, connection=old)
+
+    assert hub.active_connections["dash"] is new
+
+@pytest.mark.asyncio
+async def test_topic_routing_only_reaches_subscribers(make_hub):
+    hub = make_hub()
+    watcher, everything, system = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    await hub.connect(watcher, "watcher", topics=["job:1"])
+    await hub.connect(everything, "everything")
+    await hub.connect(system, "system", topics=["system"])
+
+    assert await hub.broadcast({"job": 1}, topic="job:1") == 2
+    assert await hub.broadcast({"job": 2}, topic="job:2") == 1
+    assert await hub.broadcast({"cpu": 5}, topic="system") == 2
+    await wait_until(lambda: len(everything.sent) == 3)
+
+    assert [json.loads(m) for m in watcher.sent] == [{"job": 1}]
+    assert [json.loads(m) for m in system.sent] == [{"cpu": 5}]
+
+@pytest.mark.asyncio
+async def test_batch_is_filtered_per_connection(make_hub):
+    hub = make_hub()
+    watcher, everything = FakeWebSocket(), FakeWebSocket()
+    await hub.connect(watcher, "watcher", topics=["job:a"])
+    await hub.connect(everything, "everything")
+    hub.subscribe("watcher", ["job:b"])
+    hub.unsubscribe("watcher", ["job:b"])
+
+    updates = [{"task_id": "a", "progress": 1}, {"task_id": "b", "progress": 2}]
+    await hub.broadcast_batch("progress_batch", updates, lambda u: f"job:{u['task_id']}")
+    await wait_until(lambda: watcher.sent and everything.sent)
+
+    assert json.loads(watcher.sent[0])["updates"] == updates[:1]
+    assert json.loads(everything.sent[0])["updates"] == updates
@@ -0,0 +1,167 @@
+import asyncio
+import itertools
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import scraping as scraping_api
+from app.services import metrics
+from app.services.browser_pool import BrowserPool, PoolTimeout
+
+class FakeScraper:
+    ids = itertools.count(1)
+
+    def __init__(self):
+        self.session_id = f"fake-{next(self.ids)}"
+        self.healthy = True
+        self.closed = False
+        self.pages = []
+        self.cookies = {}
+        self.resets = 0
+        self.reset_fails = False
+
+    async def is_healthy(self):
+        return self.healthy and not self.closed
+
+    async def scrape(self, url, **kwargs):
+        await asyncio.sleep(0.01)
+        self.pages.append(url)
+        self.cookies["session"] = url
+        return {"url": url, "title": "Fake", "session_id": self.session_id}
+
+    async def reset(self):
+        if self.reset_fails:
+            raise RuntimeError("browser gone")
+        self.resets += 1
+        self.cookies.clear()
+
+    async def cleanup(self):
+        self.closed = True
+
+def make_pool(**kwargs):
+    created = []
+
+    async def factory():
+        scraper = FakeScraper()
+        created.append(scraper)
+        return scraper
+
+    kwargs.setdefault("name", "test")
+    return BrowserPool(factory, **kwargs), created
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_sessions_are_warm_and_reused():
+    pool, created = make_pool(size=2)
+    await pool.start()
+    assert len(created) == 2 and metrics.sample("mk_driver_pool_size", pool="test") == 2
+
+    for _ in range(4):
+        async with pool.session() as session:
+            await session.scraper.scrape("https://example.test/")
+            assert metrics.sample("mk_driver_pool_in_use", pool="test") == 1
+    assert len(created) == 2
+    assert sum(len(s.pages) for s in created) == 4
+    assert pool.stats()["idle"] == 2 and pool.stats()["in_use"] == 0
+
+    await pool.stop()
+    assert all(s.closed for s in created)
+    assert metrics.sample("mk_driver_pool_size", pool="test") == 0
+
+@pytest.mark.asyncio
+async def test_sessions_recycle_after_max_pages():
+    pool, created = make_pool(size=1, max_pages=2)
+    await pool.start()
+    for _ in range(2):
+        async with pool.session() as session:
+            first = session
+    await settle()
+    assert created[0].closed and len(created) == 2
+    async with pool.session() as session:
+        assert session is not first and session.scraper is created[1]
+    assert pool.stats()["recycled"] == 1
+    await pool.stop()
+
+@pytest.mark.asyncio
+async def test_unhealthy_session_is_replaced_before_use():
+    pool, created = make_pool(size=1)
+    await pool.start()
+    created[0].healthy = False
+    async with pool.session() as session:
+        assert session.scraper is created[1]
+    assert pool.stats()["unhealthy"] == 1 and created[0].closed
+    await pool.stop()
+
+@pytest.mark.asyncio
+async def test_state_is_reset_between_borrowers():
+    pool, created = make_pool(size=1)
+    await pool.start()
+    async with pool.session() as session:
+        await session.scraper.scrape("https://shop.test/cart")
+    assert created[0].resets == 1 and created[0].cookies == {}
+
+    created[0].reset_fails = True
+    async with pool.session() as session:
+        await session.scraper.scrape("https://shop.test/cart")
+    await settle()
+    # A session that cannot be cleaned is not lent out again
+    assert created[0].closed and pool.stats()["unhealthy"] == 1
+    async with pool.session() as session:
+        assert session.scraper is created[1] and session.scraper.cookies == {}
+    await pool.stop()
+
+@pytest.mark.asyncio
+async def test_wait_time_is_reported_and_bounded():
+    pool, _ = make_pool(size=1, acquire_timeout=0.05)
+    await pool.start()
+    before = metrics.sample("mk_driver_pool_wait_seconds_count", pool="test")
+
+    async def hold():
+        async with pool.session():
+            await asyncio.sleep(0.03)
+
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    async with pool.session() as session:
+        assert session.wait_s >= 0.02
+    await holder
+
+    async with pool.session():
+        with pytest.raises(PoolTimeout):
+            async with pool.session():
+                pass
+    assert metrics.sample("mk_driver_pool_wait_seconds_count", pool="test") == before + 3
+    await pool.stop()
+
+@pytest.mark.asyncio
+async def test_start_fails_only_when_no_session_opens():
+    async def broken():
+        raise RuntimeError("no chrome")
+
+    with pytest.raises(RuntimeError):
+        await BrowserPool(broken, size=2, name="broken").start()
+
+def test_scrape_endpoint_borrows_from_the_pool():
+    pool, created = make_pool(size=1, name="api-test")
+    app = FastAPI()
+    app.include_router(scraping_api.router)
+
+    with TestClient(app) as client:
+        client.portal.call(pool.start)
+        scraping_api.browser_pool = pool
+        try:
+            responses = [client.post("/api/scraping/scrape", json={"url": "https://example.test/p"}).json()
+                         for _ in range(2)]
+            status = client.get("/api/scraping/status").json()
+        finally:
+            scraping_api.browser_pool = None
+            client.portal.call(pool.stop)
+
+    assert all(r["success"] and r["pool_wait_ms"] is not None for r in responses)
+    assert {r["session_id"] for r in responses} == {created[0].session_id}
+    assert status["features"]["concurrent_scraping"] is True
+    assert status["browser_pool"]["created"] == 1
@@ -0,0 +1,41 @@
+import openpyxl
+import pandas as pd
+import pytest
+
+from app.utils import excel
+
+def frame():
+    return pd.DataFrame({
+        "Model": ["A1", "B2", None],
+        "Price": [999.5, None, 123456.25],
+        "Description": ["short", "x" * 80, ""],
+    })
+
+def test_column_widths_from_dataframe():
+    # Header, longest value (NaN skipped), and the cap
+    assert excel.column_widths(frame()) == [7, 11, 50]
+    assert excel.column_widths(frame(), max_width=20) == [7, 11, 20]
+    assert excel.column_widths(pd.DataFrame(columns=["Mfr Model"])) == [11]
+
+@pytest.mark.parametrize("engine", ["xlsxwriter", "openpyxl"])
+def test_write_excel_applies_widths_and_formats(tmp_path, monkeypatch, engine):
+    if engine == "xlsxwriter":
+        pytest.importorskip("xlsxwriter")
+    else:
+        monkeypatch.setattr(excel, "xlsxwriter", None)
+    path = tmp_path / "out.xlsx"
+    excel.write_excel(frame(), str(path), sheet_name="Results",
+                      formats={"Description": {"text_wrap": True}}, row_height=15)
+
+    assert pd.read_excel(path, sheet_name="Results").shape == (3, 3)
+    worksheet = openpyxl.load_workbook(path)["Results"]
+    assert worksheet["A1"].value == "Model" and worksheet["A2"].value == "A1"
+    assert worksheet["B3"].value is None
+    widths = [worksheet.column_dimensions[c].width for c in "ABC"]
+    assert widths == pytest.approx([7, 11, 50], abs=1)
+    assert worksheet.sheet_format.defaultRowHeight == 15
+    if engine == "openpyxl":
+        assert worksheet["C3"].alignment.wrap_text
+    else:
+        # xlsxwriter stores the column format; Excel applies it to unformatted cells
+        assert worksheet.column_dimensions["C"].alignment.wrap_text
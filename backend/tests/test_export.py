@@ -0,0 +1,74 @@
+import csv
+import gzip
+import io
+import json
+import zipfile
+import xml.etree.ElementTree as ET
+import pytest
+from fastapi.testclient import TestClient
+
+import main_backup
+from app.services.export import export_stream, gzip_stream, iter_result_rows
+
+RESULTS = {
+    "successful": ["A1", "B2"],
+    "failed": [{"model": "C3", "error": "timeout"}],
+    "data": {
+        "A1": {"title": "Fryer <XL>", "price": 999.5, "specs": {"volts": 120}},
+        "B2": {"title": "Mixer", "in_stock": True},
+    },
+}
+
+def rows():
+    return iter_result_rows(RESULTS)
+
+def collect(stream):
+    return b"".join(stream)
+
+def test_ndjson_and_csv_rows():
+    lines = collect(export_stream("ndjson", rows)).decode().splitlines()
+    assert [json.loads(line)["model"] for line in lines] == ["A1", "B2", "C3"]
+
+    table = list(csv.DictReader(io.StringIO(collect(export_stream("csv", rows)).decode())))
+    assert list(table[0]) == ["model", "status", "error", "title", "price", "specs", "in_stock"]
+    assert table[0]["specs"] == '{"volts": 120}'
+    assert table[2] == {"model": "C3", "status": "failed", "error": "timeout",
+                        "title": "", "price": "", "specs": "", "in_stock": ""}
+
+def test_xlsx_is_a_valid_workbook():
+    workbook = zipfile.ZipFile(io.BytesIO(collect(export_stream("xlsx", rows))))
+    assert workbook.testzip() is None
+    ns = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+    sheet = ET.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+
+    sheet_rows = sheet.findall(".//s:row", ns)
+    assert len(sheet_rows) == 4
+    texts = [t.text for t in sheet_rows[1].findall(".//s:t", ns)]
+    assert "Fryer <XL>" in texts
+    assert sheet_rows[1].find("s:c[@r='E2']/s:v", ns).text == "999.5"
+
+def test_large_export_is_streamed_in_chunks():
+    big = {"data": {f"M{i}": {"title": "x" * 200} for i in range(5000)}}
+    chunks = list(export_stream("ndjson", lambda: iter_result_rows(big)))
+    assert len(chunks) > 1
+    assert len(gzip.decompress(collect(gzip_stream(iter(chunks)))).splitlines()) == 5000
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        export_stream("pdf", rows)
+
+def test_export_endpoint_negotiates_gzip(monkeypatch):
+    job = {"id": "job-1", "name": "n", "models": ["A1"], "prefix": "", "status": "completed", "progress": 100,
+           "created_at": "2024-01-01T00:00:00", "completed_at": None, "results": RESULTS, "error": None,
+           "total_models": 1}
+    store = main_backup.JobStore()
+    store.add(job)
+    monkeypatch.setattr(main_backup, "jobs_db", store)
+    client = TestClient(main_backup.app)
+
+    response = client.get("/jobs/job-1/export?format=csv", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.splitlines()[1].startswith("A1,success")
+
+    assert client.get("/jobs/job-1/export?format=pdf").status_code == 400
+    assert client.get("/jobs/missing/export").status_code == 404
@@ -0,0 +1,113 @@
+import asyncio
+import json
+
+import pytest
+
+from app.scraping import BaseScraper
+from app.scraping.dom import parse_html
+from app.scraping.profiles import (ExtractionProfile, ProfileError, extract_numeric_price, get_profile,
+                                   load_all_profiles, load_profile, process_weight_value, resolve_profile)
+
+PAGE = """
+<h1 class="product-name mb-0">Fryer 40 lb</h1>
+<div class="price">Was $1,499.00</div><p class="product-price-text m-0">Now $1,299.00</p>
+<div class="product-img"><img src="/img/main.png"></div>
+<div class="additional-images"><img src="/img/main.png"><img src="/img/1.png"><img src="/img/1.png"></div>
+<div class="tab-content"><p>Heavy duty</p><p>*Free shipping</p><p>Watch the video</p><p>Two baskets</p></div>
+<table><tr><td>Weight</td><td>84.2 lbs</td></tr><tr><td>Empty</td><td></td></tr></table>
+<ul>
+  <li data-docid="1"><h3>A</h3><span aria-label="price A">$10</span></li>
+  <li data-docid="2"><h3>No price</h3></li>
+  <li data-docid="3"><h3>B</h3><span aria-label="price B">$12</span></li>
+</ul>
+"""
+
+def test_katom_profile_on_a_page():
+    product = get_profile("katom").extract(PAGE, "https://shop.test/p.html")
+    assert product["found"] is True
+    assert product["title"] == "Fryer 40 lb"
+    # Selector order wins over document order
+    assert product["price"] == "1299.00"
+    assert product["main_image"] == "https://shop.test/img/main.png"
+    assert product["additional_images"] == ["https://shop.test/img/main.png", "https://shop.test/img/1.png"]
+    assert product["description"] == "<p>Heavy duty</p><p>Two baskets</p>"
+    assert product["specs"] == {"Weight": "84.2 lbs"}
+    assert product["video_links"] == []
+    assert get_profile("katom").extract("<p>404</p>") == {"found": False}
+
+def test_omitted_end_tags_are_implied():
+    page = """
+    <h1>Fryer</h1>
+    <div class=tab-content><p>one<p>*Free shipping<p>two</div>
+    <table><tr><td>Weight<td>84.2 lbs<tr><th>Width<td>20 in.</table>
+    <ul><li>a<li>b<ul><li>c</ul><li>d</ul>
+    <select><option>x<option>y<optgroup label=g><option>z</select>
+    """
+    root = parse_html(page)
+    assert [p.text for p in root.select(".tab-content p")] == ["one", "*Free shipping", "two"]
+    assert [[c.text for c in tr.select("td")] for tr in root.select("tr")] == [["Weight", "84.2 lbs"], ["20 in."]]
+    assert [li.children[0] for li in root.select("ul > li")] == ["a", "b", "c", "d"]
+    assert [li.parent.parent.tag for li in root.select("li")] == ["#document", "#document", "li", "#document"]
+    assert [o.text for o in root.select("option")] == ["x", "y", "z"]
+
+    product = get_profile("katom").extract(page)
+    assert product["description"] == "<p>one</p><p>two</p>"
+    assert product["specs"] == {"Weight": "84.2 lbs"}
+    # A <p> is closed by a block, but not across a table cell
+    assert [p.text for p in parse_html("<p>a<div>b</div>").select("p")] == ["a"]
+    assert parse_html("<p>a<table><tr><td><p>b<td>c</table>").select_one("td").text == "b"
+
+def test_items_fields_and_required():
+    products = get_profile("google_shopping").extract(PAGE)["products"]
+    assert products == [{"title": "A", "price": "$10"}, {"title": "B", "price": "$12"}]
+
+def test_inline_profiles_fallbacks_and_post_processors():
+    profile = ExtractionProfile({
+        "required": ["name"],
+        "fields": {
+            "name": {"selectors": "h1"},
+            "shipping": {"selectors": [".nothing"], "fallback": {"selectors": ["table td"], "many": True, "limit": 2,
+                                                                 "post": ["process_weight_value"], "join": "|"}},
+            "note": {"selectors": [".nothing"], "default": "n/a"},
+        },
+    })
+    assert profile.extract(PAGE) == {"found": True, "name": "Fryer 40 lb", "shipping": "Weight|90 lbs",
+                                     "note": "n/a"}
+    assert resolve_profile({"profile": "katom"}) is get_profile("katom")
+    assert resolve_profile(profile) is profile
+
+def test_bad_profiles_fail_at_compile_time(tmp_path):
+    with pytest.raises(ProfileError, match="post-processor"):
+        ExtractionProfile({"fields": {"x": {"selectors": ["h1"], "post": ["nope"]}}})
+    with pytest.raises(ProfileError, match="Unsupported"):
+        ExtractionProfile({"fields": {"x": {"selectors": ["h1:hover"]}}})
+    with pytest.raises(ProfileError, match="not defined"):
+        ExtractionProfile({"required": ["y"], "fields": {"x": {"selectors": ["h1"]}}})
+    with pytest.raises(ProfileError):
+        get_profile("no_such_site")
+
+    path = tmp_path / "site.json"
+    path.write_text(json.dumps({"fields": {"title": {"selectors": ["h1"]}}}))
+    assert load_profile(str(path)).name == "site"
+    assert {"katom", "google_shopping"} <= set(load_all_profiles())
+
+def test_shared_processors():
+    assert extract_numeric_price("$1,299.00") == "1299.00"
+    assert extract_numeric_price("Call 555") == "555"
+    assert process_weight_value("84.2 lbs") == "90 lbs"
+    assert process_weight_value("n/a") == "n/a"
+
+def test_base_scraper_drives_profiles():
+    class PageScraper(BaseScraper):
+        async def setup_driver(self):
+            pass
+
+        async def scrape(self, url, **kwargs):
+            return self.extract(kwargs["html"], url)
+
+    scraper = PageScraper({"profile": "katom"})
+    assert scraper.profile is get_profile("katom")
+    assert asyncio.run(scraper.scrape("https://shop.test/", html=PAGE))["title"] == "Fryer 40 lb"
+    assert scraper.extract(PAGE, profile="google_shopping")["products"][0]["title"] == "A"
+    with pytest.raises(ProfileError):
+        PageScraper({}).extract(PAGE)
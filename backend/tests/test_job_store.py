@@ -0,0 +1,71 @@
+import asyncio
+from datetime import datetime, timedelta
+from app.services.job_store import JobStore
+import jobs
+from jobs import Job, JobStatus
+
+def make_job(job_id, status="pending", created_at="2024-01-01T00:00:00"):
+    return {"id": job_id, "status": status, "progress": 0, "created_at": created_at}
+
+def test_lookup_counts_and_status_index_follow_updates():
+    store = JobStore()
+    for i in range(5):
+        store.add(make_job(f"job-{i}", created_at=f"2024-01-0{i + 1}T00:00:00"))
+
+    store.update("job-1", status="running", progress=40)
+    store.update("job-2", status="completed", progress=100)
+    store.update("job-3", status="running")
+    store.update("job-3", status="failed", error="boom")
+
+    assert store.get("job-1")["progress"] == 40
+    assert store.get("missing") is None
+    assert store.update("missing", status="running") is None
+    assert store.counts() == {"pending": 2, "running": 1, "completed": 1, "failed": 1}
+    assert store.count() == 5
+    assert [j["id"] for j in store.by_status("pending")] == ["job-0", "job-4"]
+
+def test_created_at_index_supports_ranges_and_recent():
+    store = JobStore()
+    for i in [3, 1, 2, 0]:
+        store.add(make_job(f"job-{i}", created_at=f"2024-01-0{i + 1}T00:00:00"))
+
+    window = store.created_between("2024-01-02", "2024-01-04")
+    assert [j["id"] for j in window] == ["job-1", "job-2"]
+    assert [j["id"] for j in store.recent(2)] == ["job-3", "job-2"]
+
+    store.remove("job-3")
+    assert [j["id"] for j in store.recent(1)] == ["job-2"]
+    assert store.count("pending") == 3
+
+def test_pydantic_jobs_with_enum_status():
+    store = JobStore()
+    now = datetime.utcnow()
+    for i in range(3):
+        store.add(Job(id=f"job-{i}", name="n", models=[], prefix="", status=JobStatus.PENDING,
+                      total_models=0, created_at=now + timedelta(seconds=i)))
+
+    job = store.update("job-0", status=JobStatus.RUNNING, progress=10)
+
+    assert job.status is JobStatus.RUNNING
+    assert store.count(JobStatus.RUNNING) == store.count("running") == 1
+    assert [j.id for j in store.created_between(now + timedelta(seconds=1))] == ["job-1", "job-2"]
+
+def test_failed_final_save_marks_the_job_failed(monkeypatch):
+    saved = []
+
+    async def save_job(job):
+        if job.status is JobStatus.COMPLETED:
+            raise ConnectionError("db down")
+        saved.append(job.status)
+
+    monkeypatch.setattr(jobs, "jobs_store", JobStore())
+    monkeypatch.setattr(jobs, "job_writer", save_job)
+    jobs.jobs_store.add(Job(id="job-1", name="n", models=[], prefix="", status=JobStatus.PENDING,
+                            total_models=0, created_at=datetime.utcnow()))
+
+    asyncio.run(jobs.run_scraping_job("job-1"))
+
+    job = jobs.jobs_store.get("job-1")
+    assert saved == [JobStatus.RUNNING]
+    assert job.status is JobStatus.FAILED
+    assert job.error == "Could not save job: db down"
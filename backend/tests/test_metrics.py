@@ -0,0 +1,59 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.metrics import router as metrics_router
+from app.models.database import Base
+from app.services import metrics
+from app.services.blob_store import HtmlBlobStore
+from app.services.broadcast import BroadcastHub
+from .test_broadcast import FakeWebSocket
+
+def test_labelled_metrics_are_exposed():
+    before = metrics.sample("mk_models_scraped_total", result="success")
+    metrics.MODELS_SCRAPED.labels(result="success").inc(2)
+    metrics.SCRAPE_STAGE_SECONDS.labels(stage="t_parse").observe(0.02)
+
+    text = metrics.render_latest().decode()
+    assert "# TYPE mk_models_scraped_total counter" in text
+    assert f'mk_models_scraped_total{{result="success"}} {before + 2}' in text
+    assert 'mk_scrape_stage_seconds_bucket{le="0.025",stage="t_parse"} 1.0' in text
+    assert metrics.sample("mk_scrape_stage_seconds_count", stage="t_parse") == 1
+
+def test_in_progress_gauge_returns_to_zero():
+    gauge = metrics.DRIVER_POOL_IN_USE.labels(pool="t_pool")
+    with gauge.track_inprogress():
+        assert metrics.sample("mk_driver_pool_in_use", pool="t_pool") == 1
+    assert metrics.sample("mk_driver_pool_in_use", pool="t_pool") == 0
+
+def test_blob_store_records_cache_hits():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    hits = metrics.sample("mk_cache_requests_total", cache="html_blob", result="hit")
+    misses = metrics.sample("mk_cache_requests_total", cache="html_blob", result="miss")
+    with sessionmaker(bind=engine)() as session:
+        store = HtmlBlobStore()
+        for html in ("<p>a</p>", "<p>a</p>", "<p>b</p>"):
+            store.put(session, html)
+    engine.dispose()
+    assert metrics.sample("mk_cache_requests_total", cache="html_blob", result="hit") == hits + 1
+    assert metrics.sample("mk_cache_requests_total", cache="html_blob", result="miss") == misses + 2
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_websockets():
+    hub = BroadcastHub()
+    await hub.connect(FakeWebSocket(), "dash")
+    app = FastAPI()
+    app.include_router(metrics_router)
+    try:
+        before = metrics.sample("mk_jobs_created_total")
+        metrics.JOBS_CREATED.inc()
+        response = TestClient(app).get("/metrics")
+    finally:
+        await hub.close_all()
+
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert f"mk_jobs_created_total {before + 1}" in response.text
+    assert "mk_websocket_connections 1.0" in response.text.splitlines()
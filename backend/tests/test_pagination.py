@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import jobs
+from jobs import Job, JobStatus
+from app.api.v1 import scraping as v1_scraping
+from app.database.database import create_async_db_engine, get_async_db
+from app.models.scraping_job import ScrapingJob as ScrapingJobModel
+from app.services.job_store import JobStore
+from app.utils.pagination import decode_cursor, encode_cursor
+
+def walk(client, url):
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={"cursor": cursor} if cursor else {})
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return pages
+
+def test_cursor_round_trip():
+    now = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(now, "abc")) == (now, "abc")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+@pytest.fixture
+def jobs_client(monkeypatch):
+    store = JobStore()
+    start = datetime(2024, 1, 1)
+    for i in range(25):
+        # Pairs of jobs share a timestamp so the id breaks the tie
+        store.add(Job(id=f"job-{i:02d}", name="n", models=["A"], prefix="", status=JobStatus.COMPLETED,
+                      total_models=1, created_at=start + timedelta(minutes=i // 2), results={"A": "x" * 100}))
+    monkeypatch.setattr(jobs, "jobs_store", store)
+    app = FastAPI()
+    app.include_router(jobs.router)
+    return TestClient(app)
+
+def test_jobs_listing_pages_newest_first_without_results(jobs_client):
+    pages = walk(jobs_client, "/api/jobs/?limit=10")
+
+    ids = [job["id"] for page in pages for job in page]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert ids == [f"job-{i:02d}" for i in reversed(range(25))]
+    assert "results" not in pages[0][0]
+
+    only = jobs_client.get("/api/jobs/?limit=1&fields=id,results").json()
+    assert only == [{"id": "job-24", "results": {"A": "x" * 100}}]
+    assert jobs_client.get("/api/jobs/?fields=bogus").status_code == 400
+
+@pytest.fixture
+def v1_client(tmp_path):
+    pytest.importorskip("aiosqlite")
+    path = tmp_path / "jobs.db"
+    engine = create_engine(f"sqlite:///{path}")
+    ScrapingJobModel.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        start = datetime(2024, 1, 1)
+        db.add_all([
+            ScrapingJobModel(url=f"https://example.com/{i}", status="completed",
+                             result_data={"html": "x" * 100}, created_at=start + timedelta(minutes=i // 3))
+            for i in range(12)
+        ])
+        db.commit()
+    engine.dispose()
+
+    # NullPool: each request opens its connection on the TestClient's event loop
+    AsyncSession = async_sessionmaker(create_async_db_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool))
+
+    async def override_get_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(v1_scraping.router)
+    app.dependency_overrides[get_async_db] = override_get_db
+    return TestClient(app)
+
+def test_v1_listing_uses_keyset_cursor(v1_client):
+    pages = walk(v1_client, "/scraping/jobs?limit=5")
+
+    ids = [job["id"] for page in pages for job in page]
+    assert ids == list(range(12, 0, -1))
+    assert "result_data" not in pages[0][0]
+    assert set(pages[0][0]) == set(v1_scraping.DEFAULT_JOB_FIELDS)
+
+def test_v1_job_status_runs_on_the_event_loop(v1_client):
+    # async def endpoints are awaited directly instead of taking a threadpool slot
+    assert asyncio.iscoroutinefunction(v1_scraping.get_job)
+    assert asyncio.iscoroutinefunction(v1_scraping.list_jobs)
+
+    response = v1_client.get("/scraping/jobs/3")
+    assert response.status_code == 200
+    assert response.json()["url"] == "https://example.com/2"
+    assert v1_client.get("/scraping/jobs/999").status_code == 404
@@ -0,0 +1,64 @@
+import pandas as pd
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from app.services.product_parquet import (ProductParquetWriter, parquet_to_excel, parse_price, parse_weight_lb,
+                                          product_schema, read_products)
+
+COLUMNS = (["Mfr Model", "Title", "Description", "Price", "Main Image"]
+           + [f"Additional Image {i}" for i in range(1, 4)]
+           + ["Weight", "Shipping Weight", "Voltage"]
+           + [f"Video Link {i}" for i in range(1, 3)])
+
+def row(i, **values):
+    new_row = dict.fromkeys(COLUMNS, "")
+    new_row.update({"Mfr Model": f"M{i}", "Title": f"Fryer {i}"}, **values)
+    return new_row
+
+def test_parsers():
+    assert parse_price("$1,234.50") == 1234.5
+    assert parse_price("Call for Price") is None
+    assert parse_price(99) == 99.0
+    assert parse_weight_lb("85 lbs") == 85.0
+    assert parse_weight_lb("10 kg") == pytest.approx(22.046)
+    assert parse_weight_lb("8 oz.") == 0.5
+    assert parse_weight_lb("120") == 120.0
+    assert parse_weight_lb("") is None
+
+def test_schema_types_and_list_columns():
+    schema = product_schema(COLUMNS)
+    assert schema.names == ["Mfr Model", "Title", "Description", "Price", "Main Image", "Additional Images",
+                            "Weight", "Shipping Weight", "Voltage", "Video Links"]
+    assert str(schema.field("Price").type) == "double"
+    assert str(schema.field("Additional Images").type) == "list<item: string>"
+
+def test_row_groups_are_appended(tmp_path):
+    path = str(tmp_path / "final.parquet")
+    with ProductParquetWriter(path, COLUMNS, row_group_rows=2) as writer:
+        for i in range(5):
+            writer.append(row(i, **{"Price": "1,299.00" if i else "Call for Price", "Weight": "85 lbs",
+                                   "Additional Image 1": "a.jpg", "Additional Image 3": "c.jpg",
+                                   "Video Link 1": "v.mp4"}))
+        assert writer.rows_written == 4
+    assert writer.rows_written == 5
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+
+    df = read_products(path, columns=["Mfr Model", "Price", "Weight", "Additional Images"])
+    assert df["Price"].isna().tolist() == [True, False, False, False, False]
+    assert df["Price"].iloc[1] == 1299.0 and df["Weight"].iloc[0] == 85.0
+    # Empty cells between images are dropped from the list
+    assert list(df["Additional Images"].iloc[0]) == ["a.jpg", "c.jpg"]
+
+def test_xlsx_from_parquet(tmp_path):
+    path, xlsx = str(tmp_path / "final.parquet"), str(tmp_path / "final.xlsx")
+    with ProductParquetWriter(path, COLUMNS) as writer:
+        writer.extend([row(1, Price="Call for Price", **{"Additional Image 1": "a.jpg", "Video Link 1": "v.mp4"}),
+                       row(2, Price="10.50")])
+    assert parquet_to_excel(path, xlsx, fill={"Price": "Call for Price"}) == 2
+
+    sheet = pd.read_excel(xlsx)
+    assert list(sheet.columns) == COLUMNS
+    assert sheet["Price"].tolist() == ["Call for Price", 10.5]
+    assert sheet["Additional Image 1"].iloc[0] == "a.jpg" and pd.isna(sheet["Additional Image 1"].iloc[1])
+    assert sheet["Video Link 1"].iloc[0] == "v.mp4" and pd.isna(sheet["Video Link 2"].iloc[0])
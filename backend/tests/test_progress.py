@@ -0,0 +1,50 @@
+import pytest
+from app.services.progress import ProgressAggregator
+
+class Recorder:
+    def __init__(self):
+        self.messages = []
+
+    async def __call__(self, message):
+        self.messages.append(message)
+
+@pytest.mark.asyncio
+async def test_updates_coalesce_into_one_batch_per_flush():
+    sink = Recorder()
+    aggregator = ProgressAggregator(sink, tick_hz=1000)
+
+    for i in range(50):
+        await aggregator.update("job-1", {"progress": i, "status": "processing"})
+        await aggregator.update("job-2", {"progress": i * 2, "status": "processing"})
+    assert sink.messages == []
+
+    assert await aggregator.flush() == 2
+    assert sink.messages == [{"type": "progress_batch", "updates": [
+        {"progress": 49, "status": "processing", "task_id": "job-1"},
+        {"progress": 98, "status": "processing", "task_id": "job-2"},
+    ]}]
+
+@pytest.mark.asyncio
+async def test_flush_sends_only_changed_fields():
+    sink = Recorder()
+    aggregator = ProgressAggregator(sink)
+
+    await aggregator.update("job-1", {"progress": 1, "status": "processing"})
+    await aggregator.flush()
+    await aggregator.update("job-1", {"progress": 2, "status": "processing"})
+    await aggregator.flush()
+    await aggregator.update("job-1", {"progress": 2, "status": "processing"})
+
+    assert await aggregator.flush() == 0
+    assert sink.messages[1]["updates"] == [{"progress": 2, "task_id": "job-1"}]
+
+@pytest.mark.asyncio
+async def test_terminal_update_bypasses_tick():
+    sink = Recorder()
+    aggregator = ProgressAggregator(sink)
+
+    await aggregator.update("job-1", {"progress": 99, "status": "processing"})
+    await aggregator.update("job-1", {"progress": 100, "status": "completed"})
+
+    assert sink.messages == [{"progress": 100, "status": "completed"}]
+    assert await aggregator.flush() == 0
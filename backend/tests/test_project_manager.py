@@ -0,0 +1,65 @@
+import random
+from main import ProjectManager, Task, TaskStatus, Priority
+
+def brute_force(pm):
+    tasks = list(pm.tasks.values())
+    completed = sum(1 for t in tasks if t.status == TaskStatus.COMPLETED)
+    in_progress = sum(t.progress for t in tasks if t.status == TaskStatus.IN_PROGRESS) / 100
+    ready = [t for t in tasks if t.status == TaskStatus.NOT_STARTED]
+    phase = 3
+    for p in (1, 2):
+        phase_tasks = [t for t in tasks if t.phase == p]
+        if any(t.status != TaskStatus.COMPLETED for t in phase_tasks):
+            phase = p
+            break
+    return {
+        "overall": min(100, int((completed + in_progress) / len(tasks) * 100)),
+        "completed": completed,
+        "phase": phase,
+        "next": ready[0].id if ready else None,
+    }
+
+def observed(pm):
+    next_task = pm.get_next_available_task()
+    return {
+        "overall": pm.get_overall_progress(),
+        "completed": pm.get_completed_tasks_count(),
+        "phase": pm.get_current_phase(),
+        "next": next_task.id if next_task else None,
+    }
+
+def test_aggregates_match_full_scan_through_random_operations():
+    random.seed(7)
+    pm = ProjectManager()
+    ids = list(pm.tasks)
+    assert observed(pm) == brute_force(pm)
+
+    for _ in range(500):
+        op = random.random()
+        if op < 0.5:
+            pm.simulate_progress()
+        elif op < 0.75:
+            pm.start_task(random.choice(ids))
+        else:
+            pm.complete_task(random.choice(ids))
+        assert observed(pm) == brute_force(pm)
+
+    counts = pm.get_status_counts()
+    assert sum(counts.values()) == len(ids)
+
+def test_thousands_of_tasks():
+    tasks = {
+        f"t{i}": Task(id=f"t{i}", name=f"Task {i}", description="", status=TaskStatus.NOT_STARTED,
+                      priority=Priority.MEDIUM, phase=1 + i * 3 // 5000)
+        for i in range(5000)
+    }
+    pm = ProjectManager(tasks)
+
+    for i in range(2000):
+        assert pm.start_task(f"t{i}")
+        assert pm.complete_task(f"t{i}")
+
+    assert pm.get_completed_tasks_count() == 2000
+    assert pm.get_overall_progress() == 40
+    assert pm.get_current_phase() == 2
+    assert pm.get_next_available_task().id == "t2000"
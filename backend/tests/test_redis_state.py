@@ -0,0 +1,94 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.main import ConnectionManager
+from app.services.redis_state import RedisJobState
+from .test_broadcast import FakeWebSocket, wait_until
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+def client_for(server):
+    return fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+
+@pytest_asyncio.fixture
+async def workers(server):
+    managers = []
+
+    async def factory():
+        manager = ConnectionManager()
+        await manager.attach_redis(client_for(server))
+        managers.append(manager)
+        return manager
+
+    try:
+        yield factory
+    finally:
+        for manager in managers:
+            await manager.detach_redis()
+            await manager.close_all()
+
+@pytest.mark.asyncio
+async def test_job_state_status_index(server):
+    state = RedisJobState(client_for(server), prefix="test")
+    await state.set_many({"a": {"status": "processing"}, "b": {"status": "processing"}})
+    await state.set("a", {"status": "completed", "progress": 100})
+
+    assert await state.get("a") == {"status": "completed", "progress": 100}
+    assert await state.get("missing") is None
+    assert await state.counts(["processing", "completed"]) == {"processing": 1, "completed": 1}
+    assert set(await state.get_many(["a", "b", "missing"])) == {"a", "b"}
+
+@pytest.mark.asyncio
+async def test_expired_jobs_leave_the_indexes(server):
+    client = client_for(server)
+    state = RedisJobState(client, prefix="test", ttl=1)
+    await state.set_many({"old": {"status": "processing"}, "done": {"status": "completed"}})
+    await asyncio.sleep(1.1)
+    assert await state.get("old") is None
+
+    await state.set("new", {"status": "processing"})
+    assert await state.recent_ids() == ["new"]
+    assert await state.counts(["processing", "completed"]) == {"processing": 1, "completed": 0}
+    assert await client.smembers("test:jobs:status:processing") == {"new"}
+
+    # Updating a job keeps it in the indexes past its creation time
+    await asyncio.sleep(0.6)
+    await state.set("new", {"status": "processing", "progress": 5})
+    await asyncio.sleep(0.6)
+    await state.set("other", {"status": "processing"})
+    assert await state.recent_ids() == ["other", "new"]
+
+@pytest.mark.asyncio
+async def test_progress_reaches_clients_of_another_worker(workers):
+    runner, other = await workers(), await workers()
+    dashboard = FakeWebSocket()
+    await other.connect(dashboard, "dash", topics=["job:job-1"])
+
+    await runner.update_progress("job-1", 40, 100)
+    await runner.progress.flush()
+    await wait_until(lambda: dashboard.sent)
+
+    batch = json.loads(dashboard.sent[0])
+    assert batch["type"] == "progress_batch"
+    assert batch["updates"][0]["task_id"] == "job-1"
+    assert (await other.get_progress_state("job-1"))["progress"] == 40
+    assert set(await other.get_progress_states()) == {"job-1"}
+
+@pytest.mark.asyncio
+async def test_events_are_delivered_once_locally(workers):
+    manager = await workers()
+    ws = FakeWebSocket()
+    await manager.connect(ws, "dash")
+
+    await manager.publish({"type": "job_completed", "job_id": "job-2"}, topic="job:job-2")
+    await wait_until(lambda: ws.sent)
+    await manager.publish({"type": "marker"})
+    await wait_until(lambda: len(ws.sent) == 2)
+
+    assert [json.loads(m)["type"] for m in ws.sent] == ["job_completed", "marker"]
@@ -0,0 +1,169 @@
+import asyncio
+import datetime
+import enum
+import gzip
+import json
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+import main_backup
+from app.core import middleware
+from app.core.middleware import CompressionMiddleware, accepts, negotiate_encoding
+from app.services.broadcast import BroadcastHub
+from app.utils import fast_json
+from app.utils.fast_json import FastJSONResponse, dumps
+
+class Status(str, enum.Enum):
+    DONE = "completed"
+
+class Item(BaseModel):
+    model: str
+    price: float
+
+PAYLOAD = {
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "status": Status.DONE,
+    "created_at": datetime.datetime(2024, 1, 2, 3, 4, 5, 678000),
+    "item": Item(model="A1", price=999.5),
+    "counts": {1: "one"},
+    "title": "Fryer – 40 lb",
+    "missing": None,
+}
+
+EXPECTED = {
+    "id": "12345678-1234-5678-1234-567812345678",
+    "status": "completed",
+    "created_at": "2024-01-02T03:04:05.678000",
+    "item": {"model": "A1", "price": 999.5},
+    "counts": {"1": "one"},
+    "title": "Fryer – 40 lb",
+    "missing": None,
+}
+
+def test_dumps_matches_with_and_without_orjson(monkeypatch):
+    fast = dumps(PAYLOAD)
+    assert json.loads(fast) == EXPECTED
+    monkeypatch.setattr(fast_json, "orjson", None)
+    assert dumps(PAYLOAD) == fast
+    # Beyond 64 bits orjson gives up and the stdlib encoder takes over
+    monkeypatch.undo()
+    assert dumps({"n": 2 ** 70}) == b'{"n":1180591620717411303424}'
+
+def test_negotiation_honours_q_values(monkeypatch):
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip;q=0, *;q=0.5") is None
+    assert negotiate_encoding("*") == "gzip"
+    assert accepts("zstd, gzip;q=0", "zstd") and not accepts("zstd, gzip;q=0", "gzip")
+
+    monkeypatch.setattr(middleware, "available_encodings", lambda: ("br", "gzip"))
+    assert negotiate_encoding("gzip, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+
+ROWS = [{"model": f"M{i}", "title": "Commercial deep fryer", "price": 1000 + i} for i in range(500)]
+
+@pytest.fixture
+def client():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/big")
+    def big():
+        return {"rows": ROWS}
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((dumps(row) + b"\n" for row in ROWS), media_type="application/x-ndjson")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(b"x" * 4096), media_type="text/plain",
+                        headers={"Content-Encoding": "gzip"})
+
+    @app.get("/image")
+    def image():
+        return Response(b"\x89PNG" * 1024, media_type="image/png")
+
+    return TestClient(app)
+
+def test_large_responses_are_gzipped_small_ones_are_not(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(dumps({"rows": ROWS})) / 5
+    assert response.json() == {"rows": ROWS}
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "gzip;q=0"}).headers
+
+def test_streams_are_compressed_as_they_go(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert [json.loads(line) for line in response.text.splitlines()] == ROWS
+
+def test_encoded_and_incompressible_responses_pass_through(client):
+    encoded = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert encoded.headers["content-encoding"] == "gzip" and encoded.text == "x" * 4096
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in image.headers and image.content == b"\x89PNG" * 1024
+
+def test_brotli_when_installed(client):
+    pytest.importorskip("brotli")
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.json() == {"rows": ROWS}
+
+def test_job_download_is_compressed(monkeypatch):
+    results = {"successful": [r["model"] for r in ROWS], "failed": [], "data": {r["model"]: r for r in ROWS}}
+    job = {"id": "job-1", "name": "n", "models": results["successful"], "prefix": "", "status": "completed",
+           "progress": 100, "created_at": "2024-01-01T00:00:00", "completed_at": None, "results": results,
+           "error": None, "total_models": len(ROWS)}
+    store = main_backup.JobStore()
+    store.add(job)
+    monkeypatch.setattr(main_backup, "jobs_db", store)
+
+    response = TestClient(main_backup.app).get("/jobs/job-1/download", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-disposition"] == "attachment; filename=job_job-1_results.json"
+    assert response.json()["results"] == results
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000):
+        pass
+
+@pytest.mark.asyncio
+async def test_pre_encoded_broadcast_is_shared():
+    hub = BroadcastHub()
+    sockets = [FakeWebSocket() for _ in range(3)]
+    for i, websocket in enumerate(sockets):
+        await hub.connect(websocket, f"c{i}")
+    try:
+        payload = dumps({"type": "job_update", "job": PAYLOAD})
+        assert await hub.broadcast(payload) == 3
+        while not all(websocket.sent for websocket in sockets):
+            await asyncio.sleep(0.005)
+        first = sockets[0].sent[0]
+        assert json.loads(first)["job"] == EXPECTED
+        assert all(websocket.sent[0] is first for websocket in sockets)
+    finally:
+        await hub.close_all()
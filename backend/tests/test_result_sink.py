@@ -0,0 +1,100 @@
+import asyncio
+import json
+import pytest
+from contextlib import asynccontextmanager
+from app.services.result_sink import ResultSink
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def copy_records_to_table(self, table, records, columns):
+        if self.pool.fail_next:
+            self.pool.fail_next = False
+            raise ConnectionError("database went away")
+        if self.pool.delay:
+            await asyncio.sleep(self.pool.delay)
+        self.pool.copies.append((table, list(records), columns))
+
+class FakePool:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.fail_next = False
+        self.copies = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConnection(self)
+
+    def rows(self):
+        return [row for _, records, _ in self.copies for row in records]
+
+@pytest.mark.asyncio
+async def test_flush_copies_in_bounded_batches():
+    pool = FakePool()
+    sink = ResultSink(pool, batch_size=100, max_pending=1000)
+
+    for i in range(250):
+        await sink.put("job-1", f"M{i}", {"n": i})
+    assert await sink.flush() == 250
+
+    assert [len(records) for _, records, _ in pool.copies] == [100, 100, 50]
+    table, records, columns = pool.copies[0]
+    assert table == "scraping_results"
+    assert columns == ("job_id", "model", "data", "scraped_at")
+    assert json.loads(records[0][2]) == {"n": 0}
+    assert sink.pending() == 0
+
+@pytest.mark.asyncio
+async def test_background_flush_on_size_and_time():
+    pool = FakePool()
+    sink = ResultSink(pool, batch_size=10, flush_interval=0.05)
+    await sink.start()
+    try:
+        for i in range(13):
+            await sink.put("job-1", f"M{i}", {})
+        for _ in range(100):
+            if len(pool.rows()) == 13:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await sink.stop()
+
+    assert len(pool.rows()) == 13
+
+@pytest.mark.asyncio
+async def test_put_waits_while_database_lags():
+    pool = FakePool(delay=0.2)
+    sink = ResultSink(pool, batch_size=5, flush_interval=0.01, max_pending=5)
+    await sink.start()
+    try:
+        for i in range(5):
+            await sink.put("job-1", f"M{i}", {})
+        await asyncio.sleep(0.02)  # flusher has taken the batch and is inside COPY
+        for i in range(5, 10):
+            await sink.put("job-1", f"M{i}", {})
+
+        blocked = asyncio.create_task(sink.put("job-1", "M10", {}))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+        await asyncio.wait_for(blocked, timeout=1)
+    finally:
+        await sink.stop()
+
+    assert len(pool.rows()) == 11
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_first():
+    pool = FakePool()
+    sink = ResultSink(pool, batch_size=2)
+    for i in range(3):
+        await sink.put("job-1", f"M{i}", {})
+
+    pool.fail_next = True
+    with pytest.raises(ConnectionError):
+        await sink.flush()
+    assert sink.pending() == 3
+
+    await sink.flush()
+    assert [row[1] for row in pool.rows()] == ["M0", "M1", "M2"]
+    assert sink.stats()["failed_batches"] == 1
@@ -0,0 +1,109 @@
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.api import scraping as scraping_api
+from app.models.database import Base, HtmlBlob
+from app.scraping.profiles import resolve_profile
+from app.services.browser_pool import BrowserPool
+
+PAGE = "<html><h1>Fryer</h1><p class='price'>$1,299.00</p>" + "<div>filler</div>" * 2000 + "</html>"
+
+class PageScraper:
+    session_id = "page-scraper"
+
+    async def scrape(self, url, **kwargs):
+        result = {"url": url, "title": "Fryer", "page_source": PAGE}
+        if kwargs.get("extract"):
+            result["extracted_data"] = resolve_profile(kwargs["extract"]).extract(PAGE, url)
+        return result
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'blobs.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    def blob_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def factory():
+        return PageScraper()
+
+    app = FastAPI()
+    app.include_router(scraping_api.router)
+    app.dependency_overrides[scraping_api.get_blob_db] = blob_db
+    pool = BrowserPool(factory, size=1, name="extract-test")
+    with TestClient(app) as test_client:
+        test_client.portal.call(pool.start)
+        scraping_api.browser_pool = pool
+        try:
+            yield test_client, Session
+        finally:
+            scraping_api.browser_pool = None
+            test_client.portal.call(pool.stop)
+    engine.dispose()
+
+RULES = {"fields": {"name": {"selectors": ["h1"]}, "price": {"selectors": [".price"], "post": ["decimal_price"]}}}
+
+def scrape(client, **body):
+    return client.post("/api/scraping/scrape", json={"url": "https://shop.test/fryer", **body})
+
+def test_full_mode_still_returns_the_page(client):
+    test_client, _ = client
+    data = scrape(test_client).json()["data"]
+    assert data["page_source"] == PAGE
+
+def test_extract_mode_returns_only_extracted_fields(client):
+    test_client, Session = client
+    response = scrape(test_client, mode="extract", extract=RULES)
+    data = response.json()["data"]
+    assert "page_source" not in data and "html" not in data
+    assert data["extracted_data"] == {"found": True, "name": "Fryer", "price": "1299.00"}
+    assert len(response.content) < len(PAGE) / 10
+    with Session() as db:
+        assert db.scalar(select(func.count()).select_from(HtmlBlob)) == 0
+
+    missing_rules = scrape(test_client, mode="extract")
+    assert missing_rules.status_code == 400
+    assert missing_rules.json()["detail"] == "Extract mode needs extract rules"
+    assert scrape(test_client, strategy="playwright", extract=RULES).status_code == 400
+    assert scrape(test_client, mode="everything", extract=RULES).status_code == 422
+
+def test_stored_html_behind_a_content_hash(client):
+    test_client, Session = client
+    links = [scrape(test_client, mode="extract", extract=RULES, html="store").json()["data"]["html"]
+             for _ in range(2)]
+    assert links[0] == links[1] and links[0]["size"] == len(PAGE)
+    with Session() as db:
+        assert db.scalar(select(func.count()).select_from(HtmlBlob)) == 1
+        codec = db.get(HtmlBlob, links[0]["hash"]).codec
+
+    href = links[0]["href"]
+    # requests-style clients decode gzip/deflate transparently
+    plain = test_client.get(href, headers={"Accept-Encoding": "identity"})
+    assert plain.text == PAGE and "content-encoding" not in plain.headers
+
+    gzipped = test_client.get(href, headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip" and gzipped.text == PAGE
+
+    stored = test_client.get(href, headers={"Accept-Encoding": "zstd, deflate, gzip;q=0"})
+    assert stored.headers["content-encoding"] == {"zstd": "zstd", "zlib": "deflate"}[codec]
+    if codec == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        assert zstandard.ZstdDecompressor().decompress(stored.content).decode() == PAGE
+    else:
+        assert stored.text == PAGE
+
+    etag = plain.headers["etag"]
+    assert test_client.get(href, headers={"If-None-Match": etag}).status_code == 304
+    assert test_client.get("/api/scraping/html/" + "0" * 64).status_code == 404
@@ -0,0 +1,60 @@
+import struct
+
+import requests
+
+from app.scraping.dom import compile_selector, parse_html
+from app.scraping.katom import extract_product
+from benchmarks.fixture_server import FixtureServer
+from benchmarks.scrape import compare, model_list
+
+def test_selectors_on_parsed_dom():
+    root = parse_html("""
+        <div class="tab-content main"><p>One <b>bold</b></p><p>Two<br>lines</p><img src="a.png"></div>
+        <ul id="list"><li><span class="x">nested</span></li></ul>
+        <video><source src="/v.mp4" type="video/mp4"></video>
+        <script>var hidden = 1;</script>
+    """)
+    assert [p.text for p in root.select(".tab-content p")] == ["One bold", "Two lines"]
+    assert root.select_one("div.main > img").get("src") == "a.png"
+    assert root.select("#list > span") == []
+    assert root.select_one("#list span.x").text == "nested"
+    assert len(root.select("source[src*='.mp4'], source[type*='video']")) == 1
+    assert len(root.select("[class^='tab'], li")) == 2
+    assert "hidden" not in root.text
+    assert compile_selector("h1.a") is compile_selector("h1.a")
+
+def test_fixture_pages_extract_like_the_browser_scraper():
+    with FixtureServer(page_kb=50) as server:
+        url = f"{server.base_url}/bench-ABC123.html"
+        response = requests.get(url, timeout=5)
+        missing = requests.get(f"{server.base_url}/bench-MISSING1.html", timeout=5)
+        image = requests.get(f"{server.base_url}/images/ABC123-1-640x480.png", timeout=5)
+        stats = server.stats()
+
+    assert len(response.content) >= 50 * 1024
+    product = extract_product(response.text, url)
+    assert product["found"] is True
+    assert product["title"] == "Bench Co ABC123 Commercial Fryer"
+    assert product["price"].replace(".", "").isdigit()
+    assert product["main_image"] == f"{server.base_url}/images/ABC123-main-800x800.png"
+    assert len(product["additional_images"]) == 4
+    assert product["description"].count("<p>") == 4
+    assert product["specs"]["Sku"] == "ABC123"
+    assert product["video_links"] == f"{server.base_url}/videos/ABC123.mp4\n"
+
+    assert missing.status_code == 404
+    assert extract_product(missing.text)["found"] is False
+    assert struct.unpack(">II", image.content[16:24]) == (640, 480)
+    assert stats["requests"] == {"page": 1, "not_found": 1, "image": 1, "other": 0}
+
+def test_baseline_comparison_flags_regressions():
+    baseline = {"modes": {"http_first": {"models_per_minute": 600, "latency_p95_s": 0.2},
+                          "pooled_drivers": {"models_per_minute": 60, "latency_p95_s": 4.0}}}
+    report = {"modes": {"http_first": {"models_per_minute": 500, "latency_p95_s": 0.21},
+                        "pooled_drivers": {"models_per_minute": 61, "latency_p95_s": 5.0},
+                        "concurrent": {"error": "no chrome"}}}
+
+    regressions = compare(report, baseline, tolerance=0.10)
+    assert [(r["mode"], r["metric"]) for r in regressions] == [
+        ("http_first", "models_per_minute"), ("pooled_drivers", "latency_p95_s")]
+    assert model_list(5, 2) == ["BENCH0001", "MISSING0002", "BENCH0003", "MISSING0004", "BENCH0005"]
@@ -0,0 +1,117 @@
+import asyncio
+import sys
+import types
+import threading
+import time
+import pytest
+from scraper_service import ScraperService, ScraperEntry
+
+@pytest.fixture
+def fake_scraper_module():
+    module = types.ModuleType("fake_scraper")
+    calls = []
+
+    class FakeScraper:
+        instances = 0
+
+        def __init__(self):
+            FakeScraper.instances += 1
+
+        def scrape(self, model, prefix):
+            calls.append((model, prefix, threading.current_thread().name))
+            if model.startswith("SLOW"):
+                time.sleep(0.03)
+            if model == "MISSING":
+                return None
+            if model == "NOTFOUND":
+                return {"model": model, "found": False, "error": None}
+            if model == "BROKEN":
+                return {"model": model, "found": False, "error": "timeout"}
+            return {"title": f"{prefix}-{model}", "found": True, "error": None,
+                    "timings": {"page_load": 10.0 * len(calls), "total": 50.0}}
+
+    module.FakeScraper = FakeScraper
+    sys.modules["fake_scraper"] = module
+    yield module, calls
+    del sys.modules["fake_scraper"]
+
+@pytest.mark.asyncio
+async def test_entry_resolved_once_and_run_on_pool(fake_scraper_module):
+    module, calls = fake_scraper_module
+    service = ScraperService(registry=[
+        ScraperEntry("broken", "does_not_exist_scraper", "scrape"),
+        ScraperEntry("fake", "fake_scraper", "FakeScraper.scrape"),
+    ], max_workers=2, model_delay=0)
+    await service.start()
+
+    result = await service.scrape_models("job-1", ["A1", "B2", "MISSING"], prefix="123")
+    await service.shutdown()
+
+    assert module.FakeScraper.instances == 1
+    assert result["successful"] == 2
+    assert result["failed"] == 1
+    assert result["results"][0]["data"]["source"] == "fake"
+    assert all(name.startswith("scraper") for _, _, name in calls)
+    assert service.get_job_status("job-1")["status"] == "completed"
+
+    report = service.get_startup_report()
+    assert report["resolved"] == "fake_scraper:FakeScraper.scrape"
+    assert "error" in report["attempts"][0]
+
+@pytest.mark.asyncio
+async def test_models_are_bounded_and_paced(fake_scraper_module):
+    service = ScraperService(registry=[ScraperEntry("fake", "fake_scraper", "FakeScraper.scrape")], max_workers=2,
+                             model_delay=0.05)
+    job = asyncio.ensure_future(service.scrape_models("job-6", [f"SLOW{i}" for i in range(6)]))
+    seen = []
+    while not job.done():
+        state = service.get_job_status("job-6")
+        if state:
+            seen.append(list(state["in_flight"]))
+        await asyncio.sleep(0.005)
+    result = await job
+    await service.shutdown()
+
+    assert result["successful"] == 6
+    assert max(len(models) for models in seen) == 2
+    # Three rounds of two, each followed by the delay
+    assert sum(1 for models in seen if not models) >= 10
+    assert service.get_job_status("job-6")["in_flight"] == []
+
+@pytest.mark.asyncio
+async def test_unresolvable_registry_reports_unavailable():
+    service = ScraperService(registry=[ScraperEntry("broken", "does_not_exist_scraper", "scrape")])
+    result = await service.scrape_models("job-2", ["A1"])
+    await service.shutdown()
+
+    assert result["success"] is False
+    assert result["error"] == "Scraper not available"
+    assert service.is_available() is False
+
+@pytest.mark.asyncio
+async def test_not_found_and_errored_results_count_as_failures(fake_scraper_module):
+    service = ScraperService(registry=[ScraperEntry("fake", "fake_scraper", "FakeScraper.scrape")], model_delay=0)
+    result = await service.scrape_models("job-3", ["A1", "NOTFOUND", "BROKEN"])
+    await service.shutdown()
+
+    assert result["successful"] == 1
+    assert sorted(e["error"] for e in result["errors"]) == ["Product not found", "timeout"]
+
+@pytest.mark.asyncio
+async def test_scrape_after_shutdown_reports_unavailable(fake_scraper_module):
+    service = ScraperService(registry=[ScraperEntry("fake", "fake_scraper", "FakeScraper.scrape")], model_delay=0)
+    await service.start()
+    await service.shutdown()
+
+    result = await service.scrape_models("job-4", ["A1"])
+    assert result["error"] == "Scraper not available"
+
+@pytest.mark.asyncio
+async def test_job_result_carries_stage_percentiles(fake_scraper_module):
+    service = ScraperService(registry=[ScraperEntry("fake", "fake_scraper", "FakeScraper.scrape")], max_workers=1,
+                             model_delay=0)
+    result = await service.scrape_models("job-5", [f"M{i}" for i in range(20)] + ["NOTFOUND"])
+    await service.shutdown()
+
+    assert result["timings"]["page_load"] == {"count": 20, "p50": 100.0, "p95": 190.0, "max": 200.0}
+    assert result["timings"]["total"]["p95"] == 50.0
@@ -0,0 +1,173 @@
+import re
+import threading
+
+import pytest
+
+from app.services.sheets_sync import SheetSync, SheetSyncWorker, column_letter
+
+HEADER = ["Model", "Prefix", "Price"]
+
+class QuotaError(Exception):
+    def __init__(self, status_code=429):
+        super().__init__(f"HTTP {status_code}")
+        self.response = type("Response", (), {"status_code": status_code})()
+
+class FakeWorksheet:
+    """Just enough of gspread.Worksheet: values live in a list of rows"""
+
+    def __init__(self, values=None):
+        self.values = [list(r) for r in values or []]
+        self.calls = []
+        self.fail_next = []
+        self.input_options = set()
+
+    def _record(self, name):
+        self.calls.append(name)
+        if self.fail_next:
+            raise self.fail_next.pop(0)
+
+    def get_all_values(self):
+        self._record("get_all_values")
+        return [list(r) for r in self.values]
+
+    def batch_update(self, data, value_input_option=None):
+        self._record("batch_update")
+        self.input_options.add(value_input_option)
+        for entry in data:
+            first, last = map(int, re.findall(r"[A-Z]+(\d+)", entry["range"]))
+            assert last - first + 1 == len(entry["values"])
+            for number, row in enumerate(entry["values"], start=first):
+                while len(self.values) < number:
+                    self.values.append([])
+                self.values[number - 1] = list(row)
+
+    def append_rows(self, rows, value_input_option=None, table_range=None):
+        self._record("append_rows")
+        self.input_options.add(value_input_option)
+        first = len(self.values) + 1
+        self.values.extend(list(r) for r in rows)
+        return {"updates": {"updatedRange": f"Sheet1!A{first}:C{len(self.values)}"}}
+
+def make_sync(worksheet, **kwargs):
+    kwargs.setdefault("min_interval", 0)
+    kwargs.setdefault("sleep", lambda s: None)
+    return SheetSync(worksheet, HEADER, key=lambda row: (row[0], row[1]), **kwargs)
+
+def test_column_letter():
+    assert [column_letter(i) for i in (1, 26, 27, 52, 703)] == ["A", "Z", "AA", "AZ", "AAA"]
+
+def test_empty_sheet_gets_header_then_appends():
+    ws = FakeWorksheet()
+    result = make_sync(ws).sync([["M1", "p", 10], ["M2", "p", 20]])
+    assert ws.values == [HEADER, ["M1", "p", "10"], ["M2", "p", "20"]]
+    assert result == {"updated": 0, "appended": 2, "unchanged": 0, "requests": 3}
+
+def test_only_changed_rows_are_written():
+    ws = FakeWorksheet([HEADER] + [[f"M{i}", "p", str(i)] for i in range(1, 7)])
+    sync = make_sync(ws)
+    rows = [[f"M{i}", "p", i] for i in range(1, 7)]
+    rows[1][2] = 99
+    rows[2][2] = 98
+    rows[4][2] = 97
+    rows.append(["M7", "p", 7])
+
+    result = sync.sync(rows)
+    assert result == {"updated": 3, "appended": 1, "unchanged": 3, "requests": 3}
+    assert ws.calls == ["get_all_values", "batch_update", "append_rows"]
+    assert [r[2] for r in ws.values[1:]] == ["1", "99", "98", "4", "97", "6", "7"]
+    # Consecutive rows 3-4 share a range
+    assert [r["range"] for r in sync._ranges(sync.diff([["M2", "p", 0], ["M3", "p", 0], ["M5", "p", 0]])[0])] == \
+        ["A3:C4", "A6:C6"]
+
+    # Nothing changed: no writes, and the sheet is not read again
+    ws.calls.clear()
+    assert sync.sync(rows)["requests"] == 0
+    assert ws.calls == []
+
+def test_large_batches_are_chunked():
+    ws = FakeWorksheet()
+    sync = make_sync(ws, chunk_rows=10)
+    sync.sync([[f"M{i}", "p", 1] for i in range(25)])
+    assert ws.calls.count("append_rows") == 3
+    ws.calls.clear()
+    sync.sync([[f"M{i}", "p", 2] for i in range(25)])
+    assert ws.calls == ["batch_update"] * 3
+    assert all(r[2] == "2" for r in ws.values[1:])
+
+def test_rate_limit_backoff():
+    ws = FakeWorksheet([HEADER])
+    ws.fail_next = [QuotaError(429), QuotaError(503)]
+    sleeps = []
+    sync = make_sync(ws, sleep=sleeps.append)
+    assert sync.sync([["M1", "p", 1]])["appended"] == 1
+    assert len(sleeps) == 2 and 1 <= sleeps[0] < 2 and 2 <= sleeps[1] < 3
+
+    ws.fail_next = [QuotaError(403)]
+    with pytest.raises(QuotaError):
+        sync.sync([["M1", "p", 2]])
+
+def test_worker_coalesces_snapshots_in_background():
+    ws = FakeWorksheet()
+    gate = threading.Event()
+    opened = []
+
+    def open_sync():
+        opened.append(1)
+        gate.wait(5)
+        return make_sync(ws)
+
+    worker = SheetSyncWorker(open_sync)
+    try:
+        worker.submit([["M1", "p", 1]])
+        # submit never waits on Sheets
+        assert not worker.flush(timeout=0.05)
+        worker.submit([["M1", "p", 2]])
+        worker.submit([["M1", "p", 3], ["M2", "p", 3]])
+        gate.set()
+        assert worker.flush(timeout=5)
+    finally:
+        worker.stop(timeout=5)
+    assert opened == [1]
+    assert worker.syncs <= 2
+    assert ws.values == [HEADER, ["M1", "p", "3"], ["M2", "p", "3"]]
+    with pytest.raises(RuntimeError):
+        worker.submit([])
+
+def test_worker_reloads_after_error():
+    ws = FakeWorksheet([HEADER])
+    worker = SheetSyncWorker(lambda: make_sync(ws, max_retries=0))
+    try:
+        ws.fail_next = [QuotaError(429)]
+        worker.submit([["M1", "p", 1]])
+        worker.flush(5)
+        assert worker.last_error and not worker.sheet.loaded
+        worker.submit([["M1", "p", 1]])
+        worker.flush(5)
+        assert worker.last_error is None and worker.last_result["appended"] == 1
+    finally:
+        worker.stop(5)
+
+def test_save_to_sheets_writes_incrementally(monkeypatch):
+    from scraper_integration import ScraperIntegration
+
+    ws = FakeWorksheet()
+    ws.spreadsheet = type("Spreadsheet", (), {"url": "https://sheets.test/1"})()
+    spreadsheet = type("Spreadsheet", (), {"sheet1": ws})()
+    integration = ScraperIntegration()
+    integration.gc = type("Client", (), {"open": lambda self, name: spreadsheet})()
+    monkeypatch.setattr("app.services.sheets_sync.SHEETS_MIN_INTERVAL", 0)
+
+    def results(status):
+        return {"results": [{"model": "M1", "prefix": "p", "status": status, "data": {}},
+                            {"model": "M2", "prefix": "p", "status": "success", "data": {}}]}
+
+    try:
+        assert integration.save_to_sheets(results("success")) == {"success": True, "queued": True, "rows": 2}
+        saved = integration.save_to_sheets(results("failed"), wait=True)
+        assert saved["success"] and saved["sheet_url"] == "https://sheets.test/1"
+        assert [r[3] for r in ws.values[1:]] == ["failed", "success"]
+        assert "clear" not in ws.calls
+        assert ws.input_options == {"RAW"}
+    finally:
+        integration.close_sheets()
+    assert not integration.sheet_syncs
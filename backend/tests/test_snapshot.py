@@ -0,0 +1,50 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from app.services.broadcast import BroadcastHub
+from app.services.snapshot import SnapshotPublisher
+from .test_broadcast import FakeWebSocket, wait_until
+
+@pytest_asyncio.fixture
+async def hub():
+    hub = BroadcastHub()
+    try:
+        yield hub
+    finally:
+        await hub.close_all()
+
+@pytest.mark.asyncio
+async def test_snapshot_built_once_per_tick_for_all_clients(hub):
+    builds = []
+    publisher = SnapshotPublisher(hub, lambda: builds.append(1) or {"progress": len(builds)})
+    sockets = [FakeWebSocket() for _ in range(5)]
+    for i, ws in enumerate(sockets):
+        await hub.connect(ws, f"dash-{i}")
+
+    assert await publisher.publish() == 5
+    await wait_until(lambda: all(ws.sent for ws in sockets))
+
+    assert len(builds) == 1
+    assert json.loads(sockets[0].sent[0])["data"]["progress"] == 1
+    assert len({ws.sent[0] for ws in sockets}) == 1
+
+@pytest.mark.asyncio
+async def test_notify_pushes_without_waiting_for_tick(hub):
+    publisher = SnapshotPublisher(hub, lambda: {"progress": 1}, interval=60)
+    ws = FakeWebSocket()
+    await hub.connect(ws, "dash")
+    await publisher.start()
+    try:
+        publisher.notify()
+        await wait_until(lambda: ws.sent)
+    finally:
+        await publisher.stop()
+
+    assert json.loads(ws.sent[0])["type"] == "progress_update"
+
+@pytest.mark.asyncio
+async def test_no_snapshot_without_connections(hub):
+    publisher = SnapshotPublisher(hub, lambda: {"progress": 1})
+    assert await publisher.publish() == 0
+    assert publisher.snapshots_built == 0
@@ -0,0 +1,37 @@
+import time
+
+from app.services import metrics
+from app.services.stage_timer import StageTimer, format_summary, percentile, summarize_timings
+
+def test_laps_and_nested_stages():
+    timer = StageTimer()
+    before = metrics.sample("mk_scrape_stage_seconds_count", stage="image_probe")
+    probe = timer.wrap("image_probe", lambda url: time.sleep(0.02) or url.endswith(".jpg"))
+
+    time.sleep(0.01)
+    timer.lap("page_load")
+    assert probe("a.jpg") and not probe("b.png")
+    timer.lap("main_image")
+
+    timings = timer.as_dict()
+    assert timings["page_load"] >= 10
+    assert timings["image_probe"] >= 40
+    # Nested stages overlap the lap that contains them
+    assert timings["main_image"] >= timings["image_probe"]
+    assert timings["total"] >= timings["page_load"] + timings["main_image"]
+    assert metrics.sample("mk_scrape_stage_seconds_count", stage="image_probe") == before + 2
+
+def test_percentiles_per_stage():
+    assert percentile([1.0], 95) == 1.0
+    assert percentile([float(v) for v in range(1, 101)], 50) == 50.0
+    assert percentile([float(v) for v in range(1, 101)], 95) == 95.0
+
+    records = [{"page_load": float(ms), "image_probe": float(ms * 10)} for ms in range(1, 11)]
+    records += [None, {}, {"video_links": 3.0}]
+    summary = summarize_timings(records)
+
+    assert summary["page_load"] == {"count": 10, "p50": 5.0, "p95": 10.0, "max": 10.0}
+    assert summary["image_probe"]["p50"] == 50.0
+    assert summary["video_links"]["count"] == 1
+    assert format_summary(summary).startswith("image_probe p50=50ms p95=100ms")
+    assert summarize_timings([]) == {}
@@ -0,0 +1,32 @@
+from fastapi.testclient import TestClient
+
+from app import main as app_main
+from app.services.broadcast import job_topic
+
+def update(task_id, progress):
+    return {"type": "progress_update", "task_id": task_id, "progress": progress, "total": 10}
+
+def test_legacy_job_subscription_only_receives_that_job():
+    client = TestClient(app_main.app)
+    with client.websocket_connect("/ws/watcher") as watcher, client.websocket_connect("/ws/dashboard") as dashboard:
+        assert watcher.receive_json()["type"] == "connection_established"
+        assert dashboard.receive_json()["type"] == "connection_established"
+
+        watcher.send_json({"type": "subscribe_updates", "task_id": "job-a"})
+        confirmed = watcher.receive_json()
+        assert confirmed["topics"] == ["job:job-a", "system"]
+        dashboard.send_json({"type": "subscribe_updates"})
+        assert dashboard.receive_json()["topics"] == ["jobs", "system"]
+
+        batch = [update("job-b", 3), update("job-a", 5)]
+        watcher.portal.call(app_main.manager.broadcast_batch, "progress_batch", batch,
+                            lambda u: job_topic(u["task_id"]))
+        assert watcher.receive_json()["updates"] == [update("job-a", 5)]
+        assert dashboard.receive_json()["updates"] == batch
+
+        # Nothing for job-b was queued for the watcher
+        watcher.portal.call(app_main.manager.broadcast, {"type": "job_completed", "job_id": "job-b"},
+                            None, job_topic("job-b"))
+        watcher.portal.call(app_main.manager.broadcast, {"type": "job_completed", "job_id": "job-a"},
+                            None, job_topic("job-a"))
+        assert watcher.receive_json()["job_id"] == "job-a"
@@ -206,6 +206,10 @@ class MKProcessorBackendIntegration {
                 this.handleProgressUpdate(data);
                 break;
                 
+            case 'progress_batch':
+                this.handleProgressBatch(data);
+                break;
+                
             case 'job_completed':
                 this.handleJobCompleted(data);
                 break;
@@ -268,6 +272,15 @@ class MKProcessorBackendIntegration {
         this.updateGlobalProgress(percentage);
     }
 
+    handleProgressBatch(data) {
+        // Updates arrive once per server tick and carry only the fields that changed,
+        // so each is merged into the cached state for its task
+        for (const update of data.updates || []) {
+            const previous = this.jobsCache.get(update.task_id) || {};
+            this.handleProgressUpdate({ ...previous, ...update, type: 'progress_update' });
+        }
+    }
+
     handleJobCompleted(data) {
         const { job_id, message, timestamp } = data;
         